@@ -2,61 +2,61 @@ from __future__ import annotations
 
 import json
 import os
-import re
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+from collections import Counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
 from langchain_core.messages import HumanMessage
 
-from app.config import get_confidence_threshold
+from app.config import (
+    get_confidence_threshold,
+    get_control_threshold,
+    get_fast_path_threshold,
+    get_tool_summary_mode,
+)
 from app.confidence import get_confidence_model
-from app.llm import build_langchain_tools, build_llm_messages, get_llm, parse_tool_call
+from app.context import build_context_messages
+from app.extraction import extract_parameters
+from app.intents import ControlIntent, classify_control
+from app.llm import get_llm, get_llm_with_tools, parse_tool_call
 from app.logging_utils import log_event
-from app.tools import TOOLS, get_tool
+from app.metrics import (
+    CONFIDENCE_SECONDS,
+    LLM_SECONDS,
+    TURN_SECONDS,
+    TURNS,
+    call_tool_handler,
+    count,
+    observe,
+    timed,
+)
+from app.tools import current_tools, get_tool
 from app.store import ConversationState, PendingTool
 
 
-APPROVAL_YES = {"yes", "y", "approve", "approved", "go ahead", "ok", "okay", "do it"}
-APPROVAL_NO = {"no", "n", "decline", "deny", "stop", "cancel"}
+_ROUTING_TIERS: Counter = Counter()
+_ROUTING_LOCK = threading.Lock()
 
 
-def _normalize(text: str) -> str:
-    return text.lower().strip()
-
-
-def _extract_kv(text: str) -> Dict[str, str]:
-    pairs = re.findall(r"(\w+)\s*[:=]\s*([^,\n]+)", text)
-    extracted = {k.strip(): v.strip() for k, v in pairs}
-    extracted.update(_extract_domain_params(text))
-    return extracted
-
-
-def _extract_domain_params(text: str) -> Dict[str, str]:
-    lowered = text.lower()
-    params: Dict[str, str] = {}
-
-    id_match = re.search(r"(?:apt|appt|appointment)\s*id\s*(?:is\s*)?([a-z0-9_-]+)", lowered)
-    if id_match:
-        params["appointment_id"] = id_match.group(1)
-
-    if "same time tomorrow" in lowered:
-        params["new_start_time"] = "tomorrow same time"
-    else:
-        time_match = re.search(r"tomorrow(?:\s+at)?\s+(\d{1,2}(:\d{2})?\s*(am|pm)?)", lowered)
-        if time_match:
-            params["new_start_time"] = f"tomorrow {time_match.group(1).strip()}"
-
-    return params
+def _select_tool(message: str) -> Tuple[Optional[str], float]:
+    tool_name, confidence, _ = _select_tool_with_scores(message)
+    return tool_name, confidence
 
 
-def _select_tool(message: str) -> Tuple[Optional[str], float]:
+def _select_tool_with_scores(message: str) -> Tuple[Optional[str], float, Dict[str, float]]:
     model = get_confidence_model()
-    result = model.score(message, TOOLS)
-    return result.tool_name, result.confidence
+    started = time.perf_counter()
+    result = model.score(message, current_tools())
+    observe(CONFIDENCE_SECONDS, time.perf_counter() - started, source=result.source)
+    return result.tool_name, result.confidence, result.scores
 
 
-def _select_tool_with_scores(message: str) -> Tuple[Optional[str], float, Dict[str, float]]:
+async def _aselect_tool_with_scores(message: str) -> Tuple[Optional[str], float, Dict[str, float]]:
     model = get_confidence_model()
-    result = model.score(message, TOOLS)
+    started = time.perf_counter()
+    result = await model.ascore(message, current_tools())
+    observe(CONFIDENCE_SECONDS, time.perf_counter() - started, source=result.source)
     return result.tool_name, result.confidence, result.scores
 
 
@@ -79,89 +79,215 @@ def _confidence_requires_approval(confidence: float) -> bool:
     return confidence < get_confidence_threshold()
 
 
-def _approval_decision(message: str) -> Optional[bool]:
-    text = _normalize(message)
-    if any(token == text or token in text for token in APPROVAL_YES):
-        return True
-    if any(token == text or token in text for token in APPROVAL_NO):
-        return False
-    return None
-
-
 def process_message(
     state: ConversationState,
     message: str,
     provided_parameters: Optional[Dict[str, Any]] = None,
     force_tool: Optional[str] = None,
 ) -> Dict[str, Any]:
+    started = time.perf_counter()
     provided_parameters = provided_parameters or {}
+    _record_user_message(state, message)
+
+    payload = _process_pending(state, message, provided_parameters)
+    if payload is not None:
+        _count_tier("pending")
+    elif _use_llm() and not force_tool:
+        payload = _process_with_llm(state, message, provided_parameters)
+    else:
+        _count_tier("direct")
+        selection = _forced_selection(force_tool) if force_tool else _select_tool_with_scores(message)
+        payload = _process_direct(state, message, provided_parameters, force_tool, selection)
+    return _observe_turn(_finish_turn(state, payload), started)
+
+
+async def aprocess_message(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Optional[Dict[str, Any]] = None,
+    force_tool: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Async twin of `process_message` for use inside an event loop.
+
+    LLM calls go through `ainvoke` and confidence scoring through `ascore`, so a slow
+    round-trip only suspends this turn instead of blocking the worker.
+    """
+    started = time.perf_counter()
+    payload = await _aroute(state, message, provided_parameters or {}, force_tool)
+    return _observe_turn(await _afinish_turn(state, payload), started)
+
+
+async def astream_message(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Optional[Dict[str, Any]] = None,
+    force_tool: Optional[str] = None,
+) -> AsyncIterator[Tuple[str, Any]]:
+    """Streaming twin of `aprocess_message`.
+
+    Yields `("decision", payload)` as soon as the tool decision is known, then
+    `("token", text)` pieces of the assistant reply, and finally `("done", payload)`.
+    When a tool ran and an LLM summary is wanted, it is streamed token by token
+    instead of being awaited whole.
+    """
+    started = time.perf_counter()
+    payload = await _aroute(state, message, provided_parameters or {}, force_tool)
+    yield "decision", payload
+
+    streamed: List[str] = []
+    if payload.get("action") == "executed":
+        if _wants_llm_summary(payload):
+            try:
+                llm = get_llm()
+            except RuntimeError:
+                llm = None
+            if llm is not None:
+                with timed(LLM_SECONDS, call="summary"):
+                    async for chunk in llm.astream(_summary_messages(state, payload)):
+                        if chunk.content:
+                            streamed.append(chunk.content)
+                            yield "token", chunk.content
+        if streamed:
+            payload["assistant_message"] = "".join(streamed)
+        _with_assistant(state, payload)
+    if not streamed and payload.get("assistant_message"):
+        yield "token", payload["assistant_message"]
+    yield "done", _observe_turn(payload, started)
+
+
+async def _aroute(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Dict[str, Any],
+    force_tool: Optional[str],
+) -> Dict[str, Any]:
+    _record_user_message(state, message)
+
+    payload = _process_pending(state, message, provided_parameters)
+    if payload is not None:
+        _count_tier("pending")
+    elif _use_llm() and not force_tool:
+        payload = await _aprocess_with_llm(state, message, provided_parameters)
+    else:
+        _count_tier("direct")
+        selection = _forced_selection(force_tool) if force_tool else await _aselect_tool_with_scores(message)
+        payload = _process_direct(state, message, provided_parameters, force_tool, selection)
+    return payload
+
+
+def _record_user_message(state: ConversationState, message: str) -> None:
     state.messages.append({"role": "user", "content": message})
     log_event("user_message", {"session_id": state.session_id, "message": message})
 
-    if state.awaiting_approval and state.pending_tool:
-        approval = _approval_decision(message)
-        if approval is True:
+
+def _process_pending(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Dict[str, Any],
+) -> Optional[Dict[str, Any]]:
+    """Handle approval replies and parameter collection; None means route the message afresh."""
+    if not state.pending_tool:
+        return None
+    control = classify_control(message)
+    confident = control.confidence >= get_control_threshold()
+    log_event(
+        "control_intent",
+        {
+            "session_id": state.session_id,
+            "tool": state.pending_tool.name,
+            "intent": control.intent,
+            "confidence": control.confidence,
+            "awaiting_approval": state.awaiting_approval,
+        },
+    )
+
+    if state.awaiting_approval:
+        if confident and control.intent == "approve":
             log_event(
                 "approval_received",
                 {"session_id": state.session_id, "tool": state.pending_tool.name, "approved": True},
             )
-            return _execute_pending(state)
-        if approval is False:
+            return _with_control(_execute_pending(state), control)
+        if confident and control.negative:
             state.awaiting_approval = False
             state.pending_tool = None
             log_event(
                 "approval_received",
                 {"session_id": state.session_id, "tool": None, "approved": False},
             )
-            return _with_assistant(state, {
+            return _with_control(_with_assistant(state, {
                 "action": "no_tool",
                 "assistant_message": "Understood. I won't run that tool. What would you like to do next?",
-            })
-        return _with_assistant(state, {
+            }), control)
+        # Ambiguous: ask again and report how sure we were so a client can escalate.
+        return _with_control(_with_assistant(state, {
             "action": "need_approval",
             "assistant_message": "Please confirm: should I proceed with the tool call? (yes/no)",
-        })
+            "tool_name": state.pending_tool.name,
+            "collected_parameters": state.pending_tool.parameters,
+        }), control)
 
-    if state.pending_tool:
-        tool = get_tool(state.pending_tool.name)
-        if tool:
-            extracted = _extract_kv(message)
-            log_event(
-                "extracted_parameters",
-                {"session_id": state.session_id, "source": "pending_tool", "extracted": extracted},
-            )
-            merged = {**state.pending_tool.parameters, **extracted, **provided_parameters}
-            missing = _missing_params(tool.required, merged)
-            state.pending_tool.parameters = merged
-            state.pending_tool.missing = missing
-            log_event(
-                "collect_parameters",
-                {
-                    "session_id": state.session_id,
-                    "tool": tool.name,
-                    "missing": missing,
-                    "collected": merged,
-                },
-            )
-            if missing:
-                return {
-                    "action": "need_parameters",
-                    "assistant_message": _format_missing_prompt(tool.name, missing),
-                    "tool_name": tool.name,
-                    "missing_parameters": missing,
-                    "collected_parameters": merged,
-                }
-            return _decide_or_execute(state, tool, merged, confidence=state.pending_tool.confidence)
-
-    if _use_llm() and not force_tool:
-        return _process_with_llm(state, message, provided_parameters)
-
-    confidence = 1.0
-    scores: Dict[str, float] = {}
-    if force_tool:
-        tool_name = force_tool
-    else:
-        tool_name, confidence, scores = _select_tool_with_scores(message)
+    # Extract first: "cancel apt_12" for appointment_cancel is an answer, not a cancel.
+    # A confident control word is never taken as a bare answer itself.
+    tool = get_tool(state.pending_tool.name)
+    extracted = (
+        extract_parameters(tool, message, targets=state.pending_tool.missing, bare_answer=not confident)
+        if tool
+        else {}
+    )
+    if confident and control.intent == "cancel" and not extracted:
+        tool_name = state.pending_tool.name
+        state.pending_tool = None
+        log_event("pending_tool_cancelled", {"session_id": state.session_id, "tool": tool_name})
+        return _with_control(_with_assistant(state, {
+            "action": "no_tool",
+            "assistant_message": f"Okay, I've dropped the {tool_name} request. What would you like to do next?",
+        }), control)
+
+    if tool:
+        log_event(
+            "extracted_parameters",
+            {"session_id": state.session_id, "source": "pending_tool", "extracted": extracted},
+        )
+        merged = {**state.pending_tool.parameters, **extracted, **provided_parameters}
+        missing = _missing_params(tool.required, merged)
+        state.pending_tool.parameters = merged
+        state.pending_tool.missing = missing
+        log_event(
+            "collect_parameters",
+            {
+                "session_id": state.session_id,
+                "tool": tool.name,
+                "missing": missing,
+                "collected": merged,
+            },
+        )
+        if missing:
+            return _with_control({
+                "action": "need_parameters",
+                "assistant_message": _format_missing_prompt(tool.name, missing),
+                "tool_name": tool.name,
+                "missing_parameters": missing,
+                "collected_parameters": merged,
+            }, control)
+        return _with_control(_decide_or_execute(state, tool, merged, confidence=state.pending_tool.confidence), control)
+
+    return None
+
+
+def _forced_selection(force_tool: str) -> Tuple[Optional[str], float, Dict[str, float]]:
+    return force_tool, 1.0, {}
+
+
+def _process_direct(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Dict[str, Any],
+    force_tool: Optional[str],
+    selection: Tuple[Optional[str], float, Dict[str, float]],
+    source: str = "selector",
+) -> Dict[str, Any]:
+    tool_name, confidence, scores = selection
     log_event(
         "tool_selection",
         {
@@ -170,6 +296,7 @@ def process_message(
             "confidence": confidence,
             "scores": scores,
             "force_tool": force_tool,
+            "source": source,
         },
     )
 
@@ -186,7 +313,7 @@ def process_message(
             "assistant_message": "That tool isn't available. Please try a different request.",
         })
 
-    extracted = _extract_kv(message)
+    extracted = extract_parameters(tool, message)
     log_event(
         "extracted_parameters",
         {"session_id": state.session_id, "source": "initial", "extracted": extracted},
@@ -224,26 +351,109 @@ def _process_with_llm(
 ) -> Dict[str, Any]:
     provided_parameters = provided_parameters or {}
 
+    selection = _select_tool_with_scores(message)
+    if _clears_fast_path(message, provided_parameters, selection):
+        _count_tier("fast_path")
+        return _process_direct(state, message, provided_parameters, None, selection, source="fast_path")
+
     try:
-        llm = get_llm()
+        llm_with_tools = get_llm_with_tools()
     except RuntimeError:
-        tool_name, confidence, scores = _select_tool_with_scores(message)
-        log_event(
-            "tool_selection",
-            {
-                "session_id": state.session_id,
-                "tool": tool_name,
-                "confidence": confidence,
-                "scores": scores,
-                "source": "fallback",
-            },
-        )
-        return _process_with_selector(state, tool_name, confidence, provided_parameters, {})
+        _count_tier("fallback")
+        return _process_fallback(state, provided_parameters, selection)
+
+    _count_tier("llm")
+    messages = build_context_messages(state)
+    with timed(LLM_SECONDS, call="tool_selection"):
+        ai_message = llm_with_tools.invoke(messages)
+    tool_call = _parse_llm_response(state, ai_message)
+    if not tool_call:
+        return _reply_without_tool(state, ai_message)
+    return _process_llm_tool_call(state, tool_call, selection, provided_parameters)
+
+
+async def _aprocess_with_llm(
+    state: ConversationState,
+    message: str,
+    provided_parameters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    provided_parameters = provided_parameters or {}
+
+    selection = await _aselect_tool_with_scores(message)
+    if _clears_fast_path(message, provided_parameters, selection):
+        _count_tier("fast_path")
+        return _process_direct(state, message, provided_parameters, None, selection, source="fast_path")
+
+    try:
+        llm_with_tools = get_llm_with_tools()
+    except RuntimeError:
+        _count_tier("fallback")
+        return _process_fallback(state, provided_parameters, selection)
+
+    _count_tier("llm")
+    messages = build_context_messages(state)
+    with timed(LLM_SECONDS, call="tool_selection"):
+        ai_message = await llm_with_tools.ainvoke(messages)
+    tool_call = _parse_llm_response(state, ai_message)
+    if not tool_call:
+        return _reply_without_tool(state, ai_message)
+    return _process_llm_tool_call(state, tool_call, selection, provided_parameters)
+
+
+def _clears_fast_path(
+    message: str,
+    provided_parameters: Dict[str, Any],
+    selection: Tuple[Optional[str], float, Dict[str, float]],
+) -> bool:
+    """Selector result is trusted without the LLM: confident enough and nothing left to ask for."""
+    threshold = get_fast_path_threshold()
+    tool_name, confidence, _ = selection
+    if threshold is None or not tool_name or confidence < threshold:
+        return False
+    tool = get_tool(tool_name)
+    if tool is None:
+        return False
+    return not _missing_params(tool.required, {**extract_parameters(tool, message), **provided_parameters})
+
+
+def _count_tier(tier: str) -> None:
+    with _ROUTING_LOCK:
+        _ROUTING_TIERS[tier] += 1
+
+
+def _observe_turn(payload: Dict[str, Any], started: float) -> Dict[str, Any]:
+    action = payload.get("action", "none")
+    observe(TURN_SECONDS, time.perf_counter() - started, action=action)
+    count(TURNS, action=action, tool=payload.get("tool_name") or "")
+    return payload
+
+
+def routing_stats() -> Dict[str, int]:
+    """How many turns each routing tier decided since start-up."""
+    with _ROUTING_LOCK:
+        return dict(_ROUTING_TIERS)
+
+
+def _process_fallback(
+    state: ConversationState,
+    provided_parameters: Dict[str, Any],
+    selection: Tuple[Optional[str], float, Dict[str, float]],
+) -> Dict[str, Any]:
+    tool_name, confidence, scores = selection
+    log_event(
+        "tool_selection",
+        {
+            "session_id": state.session_id,
+            "tool": tool_name,
+            "confidence": confidence,
+            "scores": scores,
+            "source": "fallback",
+        },
+    )
+    return _process_with_selector(state, tool_name, confidence, provided_parameters, {})
+
 
-    tools = build_langchain_tools(TOOLS)
-    llm_with_tools = llm.bind_tools(tools)
-    messages = build_llm_messages(state.messages)
-    ai_message = llm_with_tools.invoke(messages)
+def _parse_llm_response(state: ConversationState, ai_message: Any) -> Optional[Tuple[str, Dict[str, Any]]]:
     log_event(
         "llm_response",
         {
@@ -252,17 +462,25 @@ def _process_with_llm(
             "tool_calls": getattr(ai_message, "tool_calls", None),
         },
     )
+    return parse_tool_call(ai_message)
 
-    tool_call = parse_tool_call(ai_message)
-    if not tool_call:
-        assistant_message = ai_message.content or "How can I help you today?"
-        return _with_assistant(state, {
-            "action": "none",
-            "assistant_message": assistant_message,
-        })
 
+def _reply_without_tool(state: ConversationState, ai_message: Any) -> Dict[str, Any]:
+    assistant_message = ai_message.content or "How can I help you today?"
+    return _with_assistant(state, {
+        "action": "none",
+        "assistant_message": assistant_message,
+    })
+
+
+def _process_llm_tool_call(
+    state: ConversationState,
+    tool_call: Tuple[str, Dict[str, Any]],
+    selection: Tuple[Optional[str], float, Dict[str, float]],
+    provided_parameters: Dict[str, Any],
+) -> Dict[str, Any]:
     tool_name, args = tool_call
-    _, selector_confidence, scores = _select_tool_with_scores(message)
+    _, selector_confidence, scores = selection
     confidence = _blend_confidence(selector_confidence, llm_used=True, llm_args=args)
     log_event(
         "tool_selection",
@@ -299,7 +517,7 @@ def _process_with_selector(
             "assistant_message": "That tool isn't available. Please try a different request.",
         })
 
-    extracted = _extract_kv(state.messages[-1]["content"])
+    extracted = extract_parameters(tool, state.messages[-1]["content"])
     log_event(
         "extracted_parameters",
         {"session_id": state.session_id, "source": "llm_selector", "extracted": extracted},
@@ -364,6 +582,8 @@ def _decide_or_execute(
 
 
 def _execute_pending(state: ConversationState, confidence: float | None = None) -> Dict[str, Any]:
+    # An executed payload is recorded in the history by `_finish_turn`, after the
+    # optional LLM summary has replaced the default assistant message.
     if not state.pending_tool:
         return _with_assistant(state, {
             "action": "no_tool",
@@ -379,7 +599,7 @@ def _execute_pending(state: ConversationState, confidence: float | None = None)
         })
 
     parameters = dict(state.pending_tool.parameters)
-    result = tool.handler(parameters)
+    result = call_tool_handler(tool.name, tool.handler, parameters)
     state.awaiting_approval = False
     state.pending_tool = None
     log_event(
@@ -392,34 +612,81 @@ def _execute_pending(state: ConversationState, confidence: float | None = None)
         },
     )
 
-    assistant_message = f"Tool `{tool.name}` executed successfully."
-    if _use_llm():
+    return {
+        "action": "executed",
+        "assistant_message": tool.render_response(parameters, result),
+        "tool_name": tool.name,
+        "tool_parameters": parameters,
+        "tool_result": result,
+        "confidence": confidence,
+    }
+
+
+def _wants_llm_summary(payload: Dict[str, Any]) -> bool:
+    """Whether an executed turn gets an LLM-phrased reply instead of its rendered template."""
+    if not _use_llm():
+        return False
+    mode = get_tool_summary_mode()
+    if mode == "llm":
+        return True
+    if mode == "off":
+        return False
+    tool = get_tool(payload.get("tool_name") or "")
+    return bool(tool and tool.summarize)
+
+
+def _finish_turn(state: ConversationState, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get("action") != "executed":
+        return payload
+    if _wants_llm_summary(payload):
         try:
             llm = get_llm()
-            messages = build_llm_messages(state.messages)
-            tool_payload = json.dumps(result, ensure_ascii=False)
-            messages.append(
-                HumanMessage(
-                    content=(
-                        f"Tool `{tool.name}` returned: {tool_payload}. "
-                        "Respond to the user with a concise update and next steps if needed."
-                    )
-                )
-            )
-            ai_message = llm.invoke(messages)
+            messages = _summary_messages(state, payload)
+            with timed(LLM_SECONDS, call="summary"):
+                ai_message = llm.invoke(messages)
+        except RuntimeError:
+            pass
+        else:
             if ai_message.content:
-                assistant_message = ai_message.content
+                payload["assistant_message"] = ai_message.content
+    return _with_assistant(state, payload)
+
+
+async def _afinish_turn(state: ConversationState, payload: Dict[str, Any]) -> Dict[str, Any]:
+    if payload.get("action") != "executed":
+        return payload
+    if _wants_llm_summary(payload):
+        try:
+            llm = get_llm()
+            messages = _summary_messages(state, payload)
+            with timed(LLM_SECONDS, call="summary"):
+                ai_message = await llm.ainvoke(messages)
         except RuntimeError:
             pass
+        else:
+            if ai_message.content:
+                payload["assistant_message"] = ai_message.content
+    return _with_assistant(state, payload)
+
+
+def _summary_messages(state: ConversationState, payload: Dict[str, Any]) -> List[Any]:
+    messages = build_context_messages(state)
+    tool_payload = json.dumps(payload["tool_result"], ensure_ascii=False)
+    messages.append(
+        HumanMessage(
+            content=(
+                f"Tool `{payload['tool_name']}` returned: {tool_payload}. "
+                "Respond to the user with a concise update and next steps if needed."
+            )
+        )
+    )
+    return messages
 
-    return _with_assistant(state, {
-        "action": "executed",
-        "assistant_message": assistant_message,
-        "tool_name": tool.name,
-        "tool_parameters": parameters,
-        "tool_result": result,
-        "confidence": confidence,
-    })
+
+def _with_control(payload: Dict[str, Any], control: ControlIntent) -> Dict[str, Any]:
+    payload["control_intent"] = control.intent
+    payload["control_confidence"] = control.confidence
+    return payload
 
 
 def _format_missing_prompt(tool_name: str, missing: List[str]) -> str:
@@ -1,67 +1,236 @@
 from __future__ import annotations
 
+import asyncio
 import json
+import time
 import uuid
-from fastapi import FastAPI
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
 
 from app.mcp_server import mcp
-from app.agent import process_message
+from app.agent import aprocess_message, astream_message, routing_stats
+from app.confidence import get_confidence_model
+from app.llm import get_llm
+from app.logging_utils import flush_logs, logging_stats
+from app.metrics import CONTENT_TYPE, metrics_enabled, register_collector, render
 from app.models import ChatRequest, ChatResponse, ToolDecision
+from app.profiling import (
+    RequestDiagnosticsMiddleware,
+    add_timing,
+    current_timings,
+    profiler_from_env,
+    server_timing_enabled,
+)
+from app.settings import install_reload_signal, load_settings
 from app.store import SESSION_STORE
-from app.tools import openai_tools_schema
+from app.tools import tools_schema_payload
 
 mcp_app = mcp.http_app(path="/", json_response=True, stateless_http=True)
-app = FastAPI(title="swiss-army-knife", lifespan=mcp_app.lifespan)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    install_reload_signal()
+    if load_settings().llm_provider == "local":
+        get_llm()  # a malformed SAK_LOCAL_LLM_* setting fails start-up, not the first request
+    async with mcp_app.lifespan(app):
+        yield
+    # Drain queued events before the worker exits.
+    await asyncio.to_thread(flush_logs)
+
+
+PROFILER = profiler_from_env()
+
+app = FastAPI(title="swiss-army-knife", lifespan=lifespan)
+app.add_middleware(RequestDiagnosticsMiddleware, profiler=PROFILER, server_timing=server_timing_enabled())
 app.mount("/mcp", mcp_app)
 
+# Turns for one session must not interleave once they await I/O; locks vanish with their last holder.
+_SESSION_LOCKS: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
 
 @app.get("/healthz")
 async def healthz():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "sessions": SESSION_STORE.stats(),
+        "logging": logging_stats(),
+        "routing": routing_stats(),
+        "profiling": PROFILER.stats() if PROFILER is not None else None,
+    }
+
+
+@app.get("/metrics")
+async def metrics() -> Response:
+    if not metrics_enabled():
+        return Response(status_code=404)
+    return Response(content=render(), media_type=CONTENT_TYPE)
+
 
+def _runtime_families() -> Iterator[tuple]:
+    """The counters behind /healthz, as metric families read at scrape time."""
+    sessions = SESSION_STORE.stats()
+    yield "sak_sessions_active", "gauge", "Sessions held in memory.", [({}, sessions["sessions"])]
+    yield "sak_session_bytes", "gauge", "Approximate bytes of session history in memory.", [({}, sessions["bytes"])]
+    yield "sak_session_turns_in_flight", "gauge", "Sessions with a turn running or waiting for its lock.", [
+        ({}, sum(1 for lock in list(_SESSION_LOCKS.values()) if lock.locked()))
+    ]
+    yield "sak_sessions_created_total", "counter", "Sessions created.", [({}, sessions["created"])]
+    yield "sak_session_evictions_total", "counter", "Sessions dropped from memory by reason.", [
+        ({"reason": reason}, sessions[f"evicted_{reason}"]) for reason in ("idle", "lru", "bytes")
+    ]
+    yield "sak_session_trimmed_messages_total", "counter", "Messages trimmed from over-size sessions.", [
+        ({}, sessions["trimmed_messages"])
+    ]
+    yield "sak_routing_turns_total", "counter", "Turns decided by each routing tier.", [
+        ({"tier": tier}, value) for tier, value in sorted(routing_stats().items())
+    ]
+    logging = logging_stats()
+    yield "sak_log_queue_depth", "gauge", "Events waiting for the log writer.", [({}, logging.get("queued", 0))]
+    yield "sak_log_events_total", "counter", "Logged events by outcome.", [
+        ({"outcome": outcome}, logging.get(outcome, 0)) for outcome in ("written", "dropped", "sampled_out", "errors")
+    ]
+    model = get_confidence_model()
+    if hasattr(model, "stats"):
+        cache = model.stats()
+        yield "sak_confidence_cache_entries", "gauge", "Entries in the confidence result cache.", [({}, cache["size"])]
+        yield "sak_confidence_cache_lookups_total", "counter", "Confidence cache lookups by result.", [
+            ({"result": result}, cache[key])
+            for result, key in (("hit", "hits"), ("shared_hit", "shared_hits"), ("miss", "misses"))
+        ]
+
+
+register_collector(_runtime_families)
+
+
+@app.get("/v1/tools")
+async def list_tools(request: Request) -> Response:
+    schema, etag = tools_schema_payload()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=schema, media_type="application/json", headers={"ETag": etag})
 
-@app.post("/v1/chat/completions")
-async def chat_completions(payload: ChatRequest) -> ChatResponse:
-    state = SESSION_STORE.get(payload.session_id)
+
+@app.post("/v1/chat/completions", response_model=ChatResponse)
+async def chat_completions(payload: ChatRequest) -> Response:
+    session_id = payload.session_id or str(uuid.uuid4())
     last_message = payload.messages[-1].content if payload.messages else ""
+    lock = _SESSION_LOCKS.setdefault(session_id, asyncio.Lock())
 
-    result = process_message(
-        state,
-        last_message,
-        provided_parameters=payload.provided_parameters,
-        force_tool=payload.force_tool,
-    )
+    if payload.stream:
+        return StreamingResponse(
+            _stream_turn(payload, session_id, last_message, lock),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
 
-    tool_decision = ToolDecision(
-        tool_name=result.get("tool_name"),
-        confidence=result.get("confidence", 0.0),
-        require_approval=result.get("action") == "need_approval",
-        missing_parameters=result.get("missing_parameters", []),
-        collected_parameters=result.get("collected_parameters", {}),
-        action=result.get("action", "none"),
-    )
+    waited = time.perf_counter()
+    async with lock:
+        add_timing("lock", time.perf_counter() - waited)
+        state = SESSION_STORE.get(session_id)
+        result = await aprocess_message(
+            state,
+            last_message,
+            provided_parameters=payload.provided_parameters,
+            force_tool=payload.force_tool,
+        )
+        SESSION_STORE.save(state)
 
     content = result.get("assistant_message", "")
     message: dict = {"role": "assistant", "content": content}
 
     if result.get("action") == "executed":
-        message["tool_calls"] = [
-            {
-                "id": f"call_{uuid.uuid4().hex[:8]}",
-                "type": "function",
-                "function": {
-                    "name": result.get("tool_name"),
-                    "arguments": json.dumps(result.get("tool_parameters", {})),
-                },
-            }
-        ]
+        message["tool_calls"] = [_tool_call(result)]
 
+    started = time.perf_counter()
+    schema, etag = tools_schema_payload()
     response = ChatResponse(
         id=f"chatcmpl_{uuid.uuid4().hex}",
         object="chat.completion",
         session_id=state.session_id,
         choices=[{"index": 0, "message": message, "finish_reason": "stop"}],
-        tool_decision=tool_decision,
-        tools=openai_tools_schema(),
+        tool_decision=_tool_decision(result),
+        tools_etag=etag,
+    )
+    # `tools` is appended as the cached, pre-serialized schema instead of being re-encoded.
+    tools = schema if payload.include_tools and payload.tools_etag != etag else b"null"
+    body = response.model_dump_json(exclude={"tools"}).encode("utf-8")
+    body = body[:-1] + b',"tools":' + tools + b"}"
+    add_timing("serialize", time.perf_counter() - started)
+    return Response(content=body, media_type="application/json", headers={"X-Tools-ETag": etag})
+
+
+async def _stream_turn(
+    payload: ChatRequest,
+    session_id: str,
+    last_message: str,
+    lock: asyncio.Lock,
+) -> AsyncIterator[str]:
+    """OpenAI-style `chat.completion.chunk` events; the first one carries `tool_decision`."""
+    completion_id = f"chatcmpl_{uuid.uuid4().hex}"
+    created = int(time.time())
+
+    def chunk(delta: dict, finish_reason: str | None = None, **extra) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "session_id": session_id,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            **extra,
+        }
+        return f"data: {json.dumps(body, ensure_ascii=False)}\n\n"
+
+    # The lock is taken here, not in the handler, because the body is produced after it returns.
+    waited = time.perf_counter()
+    async with lock:
+        add_timing("lock", time.perf_counter() - waited)
+        state = SESSION_STORE.get(session_id)
+        try:
+            async for kind, value in astream_message(
+                state,
+                last_message,
+                provided_parameters=payload.provided_parameters,
+                force_tool=payload.force_tool,
+            ):
+                if kind == "decision":
+                    delta: dict = {"role": "assistant", "content": ""}
+                    if value.get("action") == "executed":
+                        delta["tool_calls"] = [{"index": 0, **_tool_call(value)}]
+                    yield chunk(delta, tool_decision=_tool_decision(value).model_dump())
+                elif kind == "token":
+                    yield chunk({"content": value})
+        finally:
+            SESSION_STORE.save(state)
+    # Headers went out before the turn ran, so the stage breakdown rides on the last chunk.
+    timings = {name: round(seconds * 1000, 3) for name, seconds in current_timings().items()}
+    yield chunk({}, finish_reason="stop", server_timing=timings)
+    yield "data: [DONE]\n\n"
+
+
+def _tool_decision(result: dict) -> ToolDecision:
+    return ToolDecision(
+        tool_name=result.get("tool_name"),
+        confidence=result.get("confidence", 0.0),
+        require_approval=result.get("action") == "need_approval",
+        missing_parameters=result.get("missing_parameters", []),
+        collected_parameters=result.get("collected_parameters", {}),
+        action=result.get("action", "none"),
+        control_intent=result.get("control_intent"),
+        control_confidence=result.get("control_confidence"),
     )
-    return response
+
+
+def _tool_call(result: dict) -> dict:
+    return {
+        "id": f"call_{uuid.uuid4().hex[:8]}",
+        "type": "function",
+        "function": {
+            "name": result.get("tool_name"),
+            "arguments": json.dumps(result.get("tool_parameters", {})),
+        },
+    }
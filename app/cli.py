@@ -29,13 +29,15 @@ def main():
 
         result = process_message(state, user_input)
         _handle_result(state, result)
+        SESSION_STORE.save(state)
 
 
 def _handle_result(state, result):
     action = result.get("action")
     if action == "need_parameters":
         missing = result.get("missing_parameters", [])
-        collected = result.get("collected_parameters", {})
+        # The result dict is also referenced by queued log events; don't mutate it.
+        collected = dict(result.get("collected_parameters", {}))
         typer.echo(result.get("assistant_message", ""))
         for param in missing:
             value = typer.prompt(f"provide {param}")
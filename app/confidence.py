@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-import math
 import os
-import urllib.request
-import urllib.error
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
-from app.tools import ToolDefinition
+import numpy as np
+
+from app.profiling import run_profiled
+from app.remote_client import CircuitBreaker, RemoteScoringClient
+from app.tools import ToolDefinition, ToolSnapshot, build_keyword_index, tool_set_fingerprint
 
 
 @dataclass
@@ -16,87 +24,646 @@ class ConfidenceResult:
     tool_name: Optional[str]
     confidence: float
     scores: Dict[str, float]
+    # Where the score came from: keyword, remote, fallback (remote failed) or cache.
+    source: str = "keyword"
 
 
 class ConfidenceModel:
     def score(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
         raise NotImplementedError
 
+    def score_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        return [self.score(message, tools) for message in messages]
+
+    async def ascore(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
+        # Default: run the blocking scorer on a worker thread so the event loop stays free.
+        return await asyncio.to_thread(run_profiled, self.score, message, tools)
+
+    async def ascore_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        return await asyncio.to_thread(run_profiled, self.score_batch, messages, tools)
+
 
 class KeywordConfidenceModel(ConfidenceModel):
     def __init__(self, temperature: float = 1.0) -> None:
         self.temperature = max(0.1, temperature)
 
     def score(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
-        text = message.lower()
-        raw_scores: Dict[str, float] = {}
+        index = keyword_index(tools)
+        return self.score_matches(index, index.matches(message.lower()))
+
+    def score_matches(self, index: "KeywordIndex", matched: Set[int]) -> ConfidenceResult:
+        """Turn a set of matched keyword positions from `index` into a result."""
+        names = index.names
+        if not matched:
+            return ConfidenceResult(tool_name=None, confidence=0.0, scores=dict.fromkeys(names, 0.0))
+
+        # Weight by keyword density to reduce long keyword lists bias.
+        probabilities = _softmax(index.densities_for(matched), temperature=self.temperature)
+        scores = dict(zip(names, probabilities.tolist()))
+        tool_name = names[int(np.argmax(probabilities))]
+        return ConfidenceResult(tool_name=tool_name, confidence=scores[tool_name], scores=scores)
+
+    def score_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        """Score many messages at once as a messages x tools density matrix."""
+        index = keyword_index(tools)
+        names = index.names
+        if not names:
+            return [ConfidenceResult(tool_name=None, confidence=0.0, scores={}) for _ in messages]
+        matched = [index.matches(message.lower()) for message in messages]
+        probabilities = _softmax_rows(index.density_matrix(matched), temperature=self.temperature)
+        best = np.argmax(probabilities, axis=1).tolist()
 
-        for tool in tools:
-            matches = sum(1 for kw in tool.keywords if kw in text)
-            if matches == 0:
-                raw_scores[tool.name] = 0.0
+        results: List[ConfidenceResult] = []
+        for hits, row, column in zip(matched, probabilities.tolist(), best):
+            if not hits:
+                results.append(ConfidenceResult(tool_name=None, confidence=0.0, scores=dict.fromkeys(names, 0.0)))
                 continue
-            # Weight by keyword density to reduce long keyword lists bias.
-            raw_scores[tool.name] = matches / max(1, len(tool.keywords))
+            scores = dict(zip(names, row))
+            results.append(ConfidenceResult(tool_name=names[column], confidence=row[column], scores=scores))
+        return results
 
-        if all(score == 0.0 for score in raw_scores.values()):
-            return ConfidenceResult(tool_name=None, confidence=0.0, scores=raw_scores)
+    async def ascore(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
+        # Pure CPU work measured in microseconds; a thread hop would cost more than it saves.
+        return self.score(message, tools)
 
-        scores = _softmax(raw_scores, temperature=self.temperature)
-        tool_name = max(scores, key=scores.get)
-        return ConfidenceResult(tool_name=tool_name, confidence=scores[tool_name], scores=scores)
+    async def ascore_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        return self.score_batch(messages, tools)
 
 
 class RemoteConfidenceModel(ConfidenceModel):
-    def __init__(self, endpoint: str, timeout: float, fallback: ConfidenceModel) -> None:
+    """Scores through a remote endpoint, falling back when it fails or its breaker is open."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        timeout: float,
+        fallback: ConfidenceModel,
+        client: Optional[RemoteScoringClient] = None,
+    ) -> None:
         self.endpoint = endpoint
         self.timeout = timeout
         self.fallback = fallback
+        self.client = client or RemoteScoringClient(endpoint, timeout)
 
     def score(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
-        payload = {
-            "message": message,
-            "tools": [
-                {"name": tool.name, "description": tool.description, "keywords": tool.keywords}
-                for tool in tools
-            ],
+        body = self.client.post({"message": message, "tools": _tools_payload(tools)})
+        return self._single_result(body, message, tools)
+
+    async def ascore(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
+        body = await self.client.apost({"message": message, "tools": _tools_payload(tools)})
+        return self._single_result(body, message, tools)
+
+    def score_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        """Score all messages with a single request; the response carries one result per message."""
+        if not messages:
+            return []
+        body = self.client.post({"messages": list(messages), "tools": _tools_payload(tools)})
+        return self._batch_results(body, messages, tools)
+
+    async def ascore_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        if not messages:
+            return []
+        body = await self.client.apost({"messages": list(messages), "tools": _tools_payload(tools)})
+        return self._batch_results(body, messages, tools)
+
+    def _single_result(
+        self, body: Optional[Dict[str, object]], message: str, tools: List[ToolDefinition]
+    ) -> ConfidenceResult:
+        result = _parse_remote_result(body, tools)
+        if result is None:
+            return replace(self.fallback.score(message, tools), source="fallback")
+        return result
+
+    def _batch_results(
+        self, body: Optional[Dict[str, object]], messages: Sequence[str], tools: List[ToolDefinition]
+    ) -> List[ConfidenceResult]:
+        items = body.get("results") if isinstance(body, dict) else None
+        if not isinstance(items, list) or len(items) != len(messages):
+            return [replace(result, source="fallback") for result in self.fallback.score_batch(messages, tools)]
+
+        results: List[ConfidenceResult] = []
+        for message, item in zip(messages, items):
+            result = _parse_remote_result(item, tools)
+            if result is None:
+                result = replace(self.fallback.score(message, tools), source="fallback")
+            results.append(result)
+        return results
+
+
+class CachedConfidenceModel(ConfidenceModel):
+    """LRU/TTL memo in front of another model.
+
+    Entries are keyed on the lower-cased, stripped message plus the tool-set fingerprint,
+    so a catalog change never serves stale scores. With `shared_path` set, results are
+    also written to a SQLite file that other processes on the host read from. Cached
+    results are handed to every caller; treat them as read-only. Fallback results
+    (the remote model was unreachable) are passed through but never cached. Hits are
+    returned with `source="cache"`; stored records, shared ones included, keep the
+    source that produced them.
+    """
+
+    def __init__(
+        self,
+        inner: ConfidenceModel,
+        max_size: int = 1024,
+        ttl: float = 300.0,
+        shared_path: Optional[str] = None,
+    ) -> None:
+        self.inner = inner
+        self.max_size = max(1, max_size)
+        self.ttl = ttl
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, ConfidenceResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._shared = _SharedResultCache(shared_path) if shared_path else None
+
+    def score(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
+        key = _cache_key(message, tools)
+        result = self._lookup(key)
+        if result is None:
+            result = self.inner.score(message, tools)
+            self._store(key, result)
+        return result
+
+    async def ascore(self, message: str, tools: List[ToolDefinition]) -> ConfidenceResult:
+        key = _cache_key(message, tools)
+        result = self._lookup(key)
+        if result is None:
+            result = await self.inner.ascore(message, tools)
+            self._store(key, result)
+        return result
+
+    def score_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        keys, results, missing = self._batch_lookup(messages, tools)
+        if missing:
+            fresh = self.inner.score_batch([messages[i] for i in missing], tools)
+            self._batch_store(keys, results, missing, fresh)
+        return results  # type: ignore[return-value]
+
+    async def ascore_batch(self, messages: Sequence[str], tools: List[ToolDefinition]) -> List[ConfidenceResult]:
+        keys, results, missing = self._batch_lookup(messages, tools)
+        if missing:
+            fresh = await self.inner.ascore_batch([messages[i] for i in missing], tools)
+            self._batch_store(keys, results, missing, fresh)
+        return results  # type: ignore[return-value]
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
         }
-        data = json.dumps(payload).encode("utf-8")
-        req = urllib.request.Request(self.endpoint, data=data, headers={"Content-Type": "application/json"})
 
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _batch_lookup(
+        self, messages: Sequence[str], tools: List[ToolDefinition]
+    ) -> Tuple[List[Tuple[str, str]], List[Optional[ConfidenceResult]], List[int]]:
+        keys = [_cache_key(message, tools) for message in messages]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+        return keys, results, missing
+
+    def _batch_store(
+        self,
+        keys: List[Tuple[str, str]],
+        results: List[Optional[ConfidenceResult]],
+        missing: List[int],
+        fresh: List[ConfidenceResult],
+    ) -> None:
+        for i, result in zip(missing, fresh):
+            results[i] = result
+            self._store(keys[i], result)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[ConfidenceResult]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return replace(entry[1], source="cache")
+                del self._entries[key]
+
+        if self._shared is not None:
+            result = self._shared.get(key)
+            if result is not None:
+                self._store(key, result, share=False)
+                with self._lock:
+                    self.shared_hits += 1
+                return replace(result, source="cache")
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _store(self, key: Tuple[str, str], result: ConfidenceResult, share: bool = True) -> None:
+        if result.source == "fallback":
+            # Degraded scores from an unreachable remote model must not outlive the outage.
+            return
+        expires = time.monotonic() + self.ttl if self.ttl > 0 else float("inf")
+        with self._lock:
+            self._entries[key] = (expires, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        if share and self._shared is not None:
+            self._shared.put(key, result, self.ttl)
+
+
+class _SharedResultCache:
+    """Best-effort cross-process result store in a SQLite file; errors are treated as misses."""
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=0.5, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS confidence_cache "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def get(self, key: Tuple[str, str]) -> Optional[ConfidenceResult]:
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value FROM confidence_cache WHERE key = ? AND expires >= ?",
+                    (_shared_key(key), time.time()),
+                ).fetchone()
+        except sqlite3.Error:
+            return None
+        if row is None:
+            return None
+        data = json.loads(row[0])
+        return ConfidenceResult(
+            tool_name=data["tool_name"],
+            confidence=data["confidence"],
+            scores=data["scores"],
+            source=data.get("source", "keyword"),
+        )
+
+    def put(self, key: Tuple[str, str], result: ConfidenceResult, ttl: float) -> None:
+        expires = time.time() + ttl if ttl > 0 else float("inf")
+        value = json.dumps(
+            {
+                "tool_name": result.tool_name,
+                "confidence": result.confidence,
+                "scores": result.scores,
+                "source": result.source,
+            },
+            separators=(",", ":"),
+        )
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout) as response:
-                body = json.loads(response.read().decode("utf-8"))
-        except (urllib.error.URLError, json.JSONDecodeError):
-            return self.fallback.score(message, tools)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO confidence_cache (key, value, expires) VALUES (?, ?, ?)",
+                    (_shared_key(key), value, expires),
+                )
+        except sqlite3.Error:
+            pass
+
+
+def _cache_key(message: str, tools: Sequence[ToolDefinition]) -> Tuple[str, str]:
+    return tool_set_fingerprint(tools), message.lower().strip()
+
+
+def _shared_key(key: Tuple[str, str]) -> str:
+    fingerprint, text = key
+    return f"{fingerprint}:{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+
+
+def _tools_payload(tools: Sequence[ToolDefinition]) -> List[Dict[str, object]]:
+    return [
+        {"name": tool.name, "description": tool.description, "keywords": tool.keywords}
+        for tool in tools
+    ]
+
 
-        scores = body.get("scores")
-        if isinstance(scores, dict):
-            normalized = {k: float(v) for k, v in scores.items() if k in {t.name for t in tools}}
-            if normalized:
-                tool_name = max(normalized, key=normalized.get)
-                return ConfidenceResult(tool_name=tool_name, confidence=normalized[tool_name], scores=normalized)
+def _parse_remote_result(body: object, tools: Sequence[ToolDefinition]) -> Optional[ConfidenceResult]:
+    """Read one remote result; None means the caller should use its fallback."""
+    if not isinstance(body, dict):
+        return None
+    names = {t.name for t in tools}
 
-        tool_name = body.get("tool_name")
-        confidence = float(body.get("confidence", 0.0))
-        if tool_name not in {t.name for t in tools}:
-            return self.fallback.score(message, tools)
+    scores = body.get("scores")
+    if isinstance(scores, dict):
+        normalized = {k: float(v) for k, v in scores.items() if k in names}
+        if normalized:
+            tool_name = max(normalized, key=normalized.get)
+            return ConfidenceResult(
+                tool_name=tool_name, confidence=normalized[tool_name], scores=normalized, source="remote"
+            )
 
-        return ConfidenceResult(tool_name=tool_name, confidence=confidence, scores={tool_name: confidence})
+    tool_name = body.get("tool_name")
+    confidence = float(body.get("confidence", 0.0))
+    if tool_name not in names:
+        return None
+
+    return ConfidenceResult(tool_name=tool_name, confidence=confidence, scores={tool_name: confidence}, source="remote")
+
+
+class KeywordIndex:
+    """Keyword matcher compiled once per tool set.
+
+    All keywords are folded into one trie-shaped regex that is tried at every offset of
+    the text, so a scan costs one pass in the regex engine instead of one substring
+    search per keyword. At each offset the trie yields the longest keyword starting
+    there; keywords that are prefixes of it match at the same offset, which `_implied`
+    accounts for, so `matches(text)` equals `{kw for kw in keywords if kw in text}`.
+    """
+
+    def __init__(self, tools: Sequence[ToolDefinition]) -> None:
+        self.tools = tuple(tools)
+        self.names = [tool.name for tool in self.tools]
+        self.keyword_counts = np.array([max(1, len(tool.keywords)) for tool in self.tools], dtype=np.float64)
+
+        inverted = tools.keyword_tools if isinstance(tools, ToolSnapshot) else build_keyword_index(self.tools)
+        self.keywords = list(inverted)
+        positions = {keyword: position for position, keyword in enumerate(self.keywords)}
+        # columns[k] lists the tools whose keyword list contains keyword k, once per occurrence.
+        self.columns: List[Tuple[int, ...]] = list(inverted.values())
+
+        trie: Dict[str, dict] = {}
+        for keyword in filter(None, self.keywords):
+            node = trie
+            for char in keyword:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self._always = frozenset([positions[""]] if "" in positions else [])
+        self._implied: Dict[str, Tuple[int, ...]] = {
+            keyword: _prefix_positions(trie, keyword, positions) for keyword in self.keywords if keyword
+        }
+        self._pattern = re.compile(f"(?=({_trie_pattern(trie)}))") if self._implied else None
+
+    def matches(self, text: str) -> Set[int]:
+        """Positions in `keywords` of every keyword that occurs in `text`."""
+        found = set(self._always)
+        if self._pattern is not None:
+            implied = self._implied
+            for matched in set(self._pattern.findall(text)):
+                found.update(implied[matched])
+        return found
+
+    def densities(self, text: str) -> np.ndarray:
+        """Per-tool share of keywords found in `text` (already lower-cased)."""
+        return self.densities_for(self.matches(text))
+
+    def density_matrix(self, matched: Sequence[Iterable[int]]) -> np.ndarray:
+        """Stack `densities_for` over many messages into a (messages, tools) array."""
+        width = len(self.tools)
+        columns = self.columns
+        cells = [
+            row * width + column
+            for row, positions in enumerate(matched)
+            for position in positions
+            for column in columns[position]
+        ]
+        densities = np.zeros(len(matched) * width)
+        if cells:
+            densities += np.bincount(cells, minlength=len(matched) * width)
+        densities = densities.reshape(len(matched), width)
+        densities /= self.keyword_counts
+        return densities
+
+    def densities_for(self, matched: Iterable[int]) -> np.ndarray:
+        columns = self.columns
+        hit_columns = [column for position in matched for column in columns[position]]
+        densities = np.zeros(len(self.tools))
+        if hit_columns:
+            densities += np.bincount(hit_columns, minlength=len(self.tools))
+            densities /= self.keyword_counts
+        return densities
+
+
+_INDEX_CACHE: "OrderedDict[Tuple[int, ...], KeywordIndex]" = OrderedDict()
+_INDEX_CACHE_SIZE = 8
+_INDEX_LOCK = threading.Lock()
+
+
+def keyword_index(tools: Sequence[ToolDefinition]) -> KeywordIndex:
+    """Return the compiled index for this exact sequence of tool objects."""
+    if isinstance(tools, ToolSnapshot):
+        return tools.derive("keyword_index", KeywordIndex)
+    key = tuple(map(id, tools))
+    index = _INDEX_CACHE.get(key)
+    if index is not None:
+        return index
+    index = KeywordIndex(tools)
+    with _INDEX_LOCK:
+        # The index keeps the tools alive, so their ids in the key can't be reused.
+        _INDEX_CACHE[key] = index
+        while len(_INDEX_CACHE) > _INDEX_CACHE_SIZE:
+            _INDEX_CACHE.popitem(last=False)
+    return index
+
+
+def _prefix_positions(trie: Dict[str, dict], keyword: str, positions: Dict[str, int]) -> Tuple[int, ...]:
+    """Positions of every non-empty keyword that is a prefix of `keyword` (itself included)."""
+    found: List[int] = []
+    node = trie
+    for end, char in enumerate(keyword, start=1):
+        node = node[char]
+        if "" in node:
+            found.append(positions[keyword[:end]])
+    return tuple(found)
+
+
+def _trie_pattern(node: Dict[str, dict]) -> str:
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in node.items() if char]
+    if not branches:
+        return ""
+    if "" in node:
+        # Greedy optional group: prefer the longer keyword, fall back to the one ending here.
+        return f"(?:{'|'.join(branches)})?"
+    if len(branches) == 1:
+        return branches[0]
+    return f"(?:{'|'.join(branches)})"
+
+
+@dataclass
+class _ConversationHits:
+    fingerprint: str
+    count: int
+    last_digest: bytes
+    matched: Set[int]
+
+
+class IncrementalConversationScorer:
+    """Keyword scoring of a growing transcript that only scans messages it hasn't seen.
+
+    Scoring `"role: content"` lines joined by newlines matches the same keywords as
+    scoring each line on its own (keywords never span a newline), so the running set
+    of matched keywords can be carried from turn to turn. State is found by session id
+    and checked against the digest of the last message it covered. Without a session
+    id nothing identifies the conversation short of reading all of it, so the whole
+    transcript is scanned and no state is kept.
+    """
+
+    def __init__(self, model: KeywordConfidenceModel, max_sessions: int = 10000) -> None:
+        self.model = model
+        self.max_sessions = max(1, max_sessions)
+        self._states: "OrderedDict[str, _ConversationHits]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def score(
+        self,
+        messages: Sequence[Dict[str, str]],
+        tools: List[ToolDefinition],
+        session_id: Optional[str] = None,
+    ) -> ConfidenceResult:
+        index = keyword_index(tools)
+        fingerprint = tool_set_fingerprint(tools)
+        state = self._get(session_id) if session_id else None
+        if not self._extends(state, fingerprint, messages):
+            state = None
+
+        start = state.count if state is not None else 0
+        matched = set(state.matched) if state is not None else set()
+        for message in messages[start:]:
+            matched |= index.matches(f"{message.get('role')}: {message.get('content', '')}".lower())
+
+        if session_id and messages:
+            self._put(session_id, _ConversationHits(fingerprint, len(messages), _message_digest(messages[-1]), matched))
+        return self.model.score_matches(index, matched)
+
+    def _extends(
+        self, state: Optional[_ConversationHits], fingerprint: str, messages: Sequence[Dict[str, str]]
+    ) -> bool:
+        if state is None or state.fingerprint != fingerprint or state.count > len(messages):
+            return False
+        return state.count == 0 or _message_digest(messages[state.count - 1]) == state.last_digest
+
+    def _get(self, key: str) -> Optional[_ConversationHits]:
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+            return state
+
+    def _put(self, key: str, state: _ConversationHits) -> None:
+        with self._lock:
+            self._states[key] = state
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+
+
+_SCORERS: Dict[int, Tuple[KeywordConfidenceModel, IncrementalConversationScorer]] = {}
+_SCORERS_LOCK = threading.Lock()
+
+
+def get_conversation_scorer() -> Optional[IncrementalConversationScorer]:
+    """Incremental scorer for the configured model, or None if it isn't keyword-based."""
+    model = get_confidence_model()
+    if isinstance(model, CachedConfidenceModel):
+        model = model.inner
+    if not isinstance(model, KeywordConfidenceModel):
+        return None
+    cached = _SCORERS.get(id(model))
+    if cached is not None:
+        return cached[1]
+    with _SCORERS_LOCK:
+        cached = _SCORERS.get(id(model))
+        if cached is None:
+            max_sessions = int(_env_float("SAK_CONVERSATION_SCORER_SESSIONS", 10000))
+            cached = (model, IncrementalConversationScorer(model, max_sessions=max_sessions))
+            _SCORERS[id(model)] = cached
+    return cached[1]
+
+
+def _message_digest(message: Dict[str, str]) -> bytes:
+    material = f"{message.get('role')}\0{message.get('content', '')}".encode("utf-8")
+    return hashlib.blake2b(material, digest_size=16).digest()
+
+
+@dataclass(frozen=True)
+class _ModelConfig:
+    temperature: float
+    endpoint: str = ""
+    timeout: float = 3.0
+    max_connections: int = 10
+    retries: int = 1
+    hedge_delay: float = 0.0
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+    cache_size: int = 0
+    cache_ttl: float = 0.0
+    cache_path: str = ""
+
+
+_MODEL_CACHE: Dict[_ModelConfig, ConfidenceModel] = {}
+_MODEL_LOCK = threading.Lock()
 
 
 def get_confidence_model() -> ConfidenceModel:
+    """Return the configured model; instances (and their pools and caches) are reused per config."""
+    config = _model_config()
+    model = _MODEL_CACHE.get(config)
+    if model is not None:
+        return model
+    with _MODEL_LOCK:
+        model = _MODEL_CACHE.get(config)
+        if model is None:
+            model = _build_confidence_model(config)
+            _MODEL_CACHE[config] = model
+    return model
+
+
+def _model_config() -> _ModelConfig:
     mode = os.getenv("SAK_CONFIDENCE_MODEL", "keyword").lower()
     temperature = _env_float("SAK_CONFIDENCE_TEMPERATURE", 1.0)
-    keyword_model = KeywordConfidenceModel(temperature=temperature)
+    endpoint = os.getenv("SAK_MODEL_ENDPOINT", "").strip() if mode == "remote" else ""
+    # The keyword model costs microseconds, less than hashing and locking a cache entry.
+    cache = {
+        "cache_size": int(_env_float("SAK_CONFIDENCE_CACHE_SIZE", 1024 if endpoint else 0)),
+        "cache_ttl": _env_float("SAK_CONFIDENCE_CACHE_TTL", 300.0),
+        "cache_path": os.getenv("SAK_CONFIDENCE_CACHE_PATH", "").strip(),
+    }
+    if not endpoint:
+        return _ModelConfig(temperature=temperature, **cache)
+    return _ModelConfig(
+        temperature=temperature,
+        endpoint=endpoint,
+        timeout=_env_float("SAK_MODEL_TIMEOUT", 3.0),
+        max_connections=int(_env_float("SAK_MODEL_MAX_CONNECTIONS", 10)),
+        retries=int(_env_float("SAK_MODEL_RETRIES", 1)),
+        hedge_delay=_env_float("SAK_MODEL_HEDGE_DELAY", 0.0),
+        breaker_threshold=int(_env_float("SAK_MODEL_BREAKER_THRESHOLD", 5)),
+        breaker_reset=_env_float("SAK_MODEL_BREAKER_RESET", 30.0),
+        **cache,
+    )
 
-    if mode == "remote":
-        endpoint = os.getenv("SAK_MODEL_ENDPOINT", "").strip()
-        timeout = _env_float("SAK_MODEL_TIMEOUT", 3.0)
-        if endpoint:
-            return RemoteConfidenceModel(endpoint=endpoint, timeout=timeout, fallback=keyword_model)
 
-    return keyword_model
+def _build_confidence_model(config: _ModelConfig) -> ConfidenceModel:
+    model: ConfidenceModel = KeywordConfidenceModel(temperature=config.temperature)
+    if config.endpoint:
+        client = RemoteScoringClient(
+            config.endpoint,
+            timeout=config.timeout,
+            max_connections=config.max_connections,
+            retries=config.retries,
+            hedge_delay=config.hedge_delay,
+            breaker=CircuitBreaker(failure_threshold=config.breaker_threshold, reset_timeout=config.breaker_reset),
+        )
+        model = RemoteConfidenceModel(endpoint=config.endpoint, timeout=config.timeout, fallback=model, client=client)
+    if config.cache_size > 0:
+        model = CachedConfidenceModel(
+            model,
+            max_size=config.cache_size,
+            ttl=config.cache_ttl,
+            shared_path=config.cache_path or None,
+        )
+    return model
 
 
 def _env_float(name: str, default: float) -> float:
@@ -109,16 +676,17 @@ def _env_float(name: str, default: float) -> float:
         return default
 
 
-def _softmax(scores: Dict[str, float], temperature: float) -> Dict[str, float]:
-    if not scores:
-        return {}
-    exp_values: Dict[str, float] = {}
-    max_score = max(scores.values())
+def _softmax(scores: np.ndarray, temperature: float) -> np.ndarray:
+    exp_values = scores - scores.max()
+    exp_values /= temperature
+    np.exp(exp_values, out=exp_values)
+    exp_values /= exp_values.sum()
+    return exp_values
 
-    for key, score in scores.items():
-        exp_values[key] = math.exp((score - max_score) / temperature)
 
-    total = sum(exp_values.values())
-    if total == 0:
-        return {key: 0.0 for key in scores}
-    return {key: value / total for key, value in exp_values.items()}
+def _softmax_rows(scores: np.ndarray, temperature: float) -> np.ndarray:
+    exp_values = scores - scores.max(axis=1, keepdims=True)
+    exp_values /= temperature
+    np.exp(exp_values, out=exp_values)
+    exp_values /= exp_values.sum(axis=1, keepdims=True)
+    return exp_values
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 
 def get_confidence_threshold() -> float:
@@ -10,5 +11,54 @@ def get_confidence_threshold() -> float:
     return max(0.0, min(1.0, value))
 
 
+def get_fast_path_threshold() -> Optional[float]:
+    """Selector confidence at which routing skips the LLM; None (unset) keeps the fast path off."""
+    raw = os.getenv("SAK_FAST_PATH_THRESHOLD", "").strip()
+    if not raw:
+        return None
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return None
+
+
 def get_debug() -> bool:
     return os.getenv("SAK_DEBUG", "").lower() in {"1", "true", "yes", "on"}
+
+
+def get_context_max_tokens() -> int:
+    raw = os.getenv("SAK_CONTEXT_MAX_TOKENS", "4000").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 4000
+    return max(1, value)
+
+
+def get_context_max_messages() -> int:
+    raw = os.getenv("SAK_CONTEXT_MAX_MESSAGES", "30").strip()
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 30
+    return max(1, value)
+
+
+def get_context_summary_enabled() -> bool:
+    return os.getenv("SAK_CONTEXT_SUMMARY", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def get_tool_summary_mode() -> str:
+    """How executed turns are phrased: template (per-tool opt-in LLM), llm (always) or off (never)."""
+    value = os.getenv("SAK_TOOL_SUMMARY", "template").strip().lower()
+    return value if value in {"template", "llm", "off"} else "template"
+
+
+def get_control_threshold() -> float:
+    """Confidence a control reply (yes/no/cancel) needs before it acts on a pending tool."""
+    raw = os.getenv("SAK_CONTROL_THRESHOLD", "0.5").strip()
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0.5
+    return max(0.0, min(1.0, value))
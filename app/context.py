@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.config import get_context_max_messages, get_context_max_tokens, get_context_summary_enabled
+from app.llm import get_llm
+from app.logging_utils import log_event
+from app.metrics import LLM_SECONDS, timed
+from app.settings import load_settings
+from app.store import ConversationState
+
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and an assistant "
+    "that can call tools. Merge the new messages into the existing summary. Keep names, "
+    "identifiers, dates, parameter values and unresolved requests; drop pleasantries. "
+    "Reply with the updated summary only."
+)
+
+_SUMMARIZER = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sak-context")
+
+
+class ConversationContext:
+    """LLM view of one session's history, kept in step with `state.messages`.
+
+    New history entries are converted once and their token estimates cached. Each
+    turn sends the system prompt, the rolling summary (if any) and the newest
+    messages that fit both the token budget and the message cap. Messages that fall
+    out of that window are folded into the summary on a background thread; until the
+    summary lands, the prompt simply omits them.
+    """
+
+    def __init__(self) -> None:
+        # Reentrant: a summary that is already finished runs its callback inside `build`.
+        self._lock = threading.RLock()
+        self._messages: List[Any] = []
+        self._tokens: List[int] = []
+        self._last: Optional[Dict[str, str]] = None
+        self._summary = ""
+        self._summarized = 0
+        self._generation = 0
+        self._future: Optional[Future] = None
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    def build(
+        self,
+        session_id: str,
+        history: List[Dict[str, str]],
+        system_prompt: str,
+        max_tokens: int,
+        max_messages: int,
+        summarize: bool,
+    ) -> List[Any]:
+        with self._lock:
+            self._sync(history)
+            summary_message = None
+            if self._summary:
+                summary_message = SystemMessage(content=f"Summary of the earlier conversation: {self._summary}")
+            budget = max_tokens - estimate_tokens(system_prompt) - (
+                estimate_tokens(summary_message.content) if summary_message else 0
+            )
+            start = max(self._window_start(budget, max_messages), self._summarized)
+            if summarize and start > self._summarized and (self._future is None or self._future.done()):
+                self._schedule(session_id, start)
+
+            messages: List[Any] = [SystemMessage(content=system_prompt)]
+            if summary_message is not None:
+                messages.append(summary_message)
+            messages.extend(message for message in self._messages[start:] if message is not None)
+        return messages
+
+    def _sync(self, history: List[Dict[str, str]]) -> None:
+        seen = len(self._messages)
+        if seen and (len(history) < seen or history[seen - 1] is not self._last):
+            dropped = self._trimmed_count(history)
+            # A summary in flight covers positions that no longer line up; let it go.
+            self._generation += 1
+            if dropped is None:
+                # Reloaded underneath us: the summary may describe a different history.
+                self._messages, self._tokens = [], []
+                self._summary = ""
+                self._summarized = 0
+            else:
+                # Trimmed from the front (the store's byte limit): shift our view along.
+                del self._messages[:dropped], self._tokens[:dropped]
+                self._summarized = max(0, self._summarized - dropped)
+            seen = len(self._messages)
+        for item in history[seen:]:
+            self._messages.append(_convert(item))
+            self._tokens.append(estimate_tokens(item.get("content", "")))
+        if history:
+            self._last = history[-1]
+
+    def _trimmed_count(self, history: List[Dict[str, str]]) -> Optional[int]:
+        """How many messages were cut from the front, if `history` is our tail plus new ones."""
+        seen = len(self._messages)
+        for index in range(min(seen, len(history)) - 1, -1, -1):
+            if history[index] is self._last:
+                return seen - 1 - index
+        return None
+
+    def _window_start(self, budget: int, max_messages: int) -> int:
+        start = len(self._messages)
+        used = 0
+        while start > 0:
+            cost = self._tokens[start - 1]
+            if start < len(self._messages) and (used + cost > budget or len(self._messages) - start >= max_messages):
+                break
+            used += cost
+            start -= 1
+        return start
+
+    def _schedule(self, session_id: str, upto: int) -> None:
+        evicted = [message for message in self._messages[self._summarized:upto] if message is not None]
+        previous, generation = self._summary, self._generation
+
+        def _done(future: Future) -> None:
+            try:
+                summary = future.result()
+            except Exception as exc:  # the summary is best-effort; the window still bounds the prompt
+                log_event("context_summary_failed", {"session_id": session_id, "error": str(exc)})
+                return
+            with self._lock:
+                if generation == self._generation and summary:
+                    self._summary = summary
+                    self._summarized = max(self._summarized, upto)
+
+        self._future = _SUMMARIZER.submit(_summarize, previous, evicted)
+        self._future.add_done_callback(_done)
+
+
+def build_context_messages(state: ConversationState) -> List[Any]:
+    """LangChain messages for the next LLM call on this session, within the configured budget."""
+    if state.context is None:
+        state.context = ConversationContext()
+    return state.context.build(
+        state.session_id,
+        state.messages,
+        load_settings().system_prompt,
+        max_tokens=get_context_max_tokens(),
+        max_messages=get_context_max_messages(),
+        summarize=get_context_summary_enabled(),
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly four characters per token plus per-message framing; no tokenizer download needed.
+    return len(text) // 4 + 4
+
+
+def _convert(item: Dict[str, str]) -> Any:
+    role = item.get("role")
+    content = item.get("content", "")
+    if role == "user":
+        return HumanMessage(content=content)
+    if role == "assistant":
+        return AIMessage(content=content)
+    return None
+
+
+def _summarize(previous: str, messages: List[Any]) -> str:
+    transcript = "\n".join(
+        f"{'User' if isinstance(message, HumanMessage) else 'Assistant'}: {message.content}" for message in messages
+    )
+    request = f"Existing summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}"
+    llm = get_llm()
+    with timed(LLM_SECONDS, call="context_summary"):
+        reply = llm.invoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=request)])
+    return (reply.content or "").strip()
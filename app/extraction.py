@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+from app.confidence import keyword_index
+from app.metrics import EXTRACTION_SECONDS, observe
+from app.tools import ToolDefinition, current_tools
+
+
+# Extra spellings users reach for; keys are words taken from parameter names.
+ALIASES: Dict[str, Tuple[str, ...]] = {
+    "appointment": ("apt", "appt"),
+    "prescription": ("rx",),
+    "rx": ("prescription",),
+    "dob": ("date of birth", "birth date", "birthday"),
+}
+
+_TIME = r"\d{1,2}(?::\d{2})?\s*(?:am|pm)"
+_ISO_DATE = r"\d{4}-\d{2}-\d{2}"
+_ISO_DATETIME = r"\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}(?::\d{2})?"
+# A labeled value runs until a comma, semicolon, newline or the next `key:` pair.
+_VALUE_END = r"(?=\s*(?:[,;\n]|$)|\s+[a-z_]\w*\s*[:=])"
+_BARE_ANSWER_MAX = 80
+# A bare reply is only an identifier if it looks like one: "12345", "apt_12".
+_BARE_ID = re.compile(r"\d+|[a-z]+[_-]\d+", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class FieldSpec:
+    name: str
+    kind: str  # id|date|datetime|enum|text
+    values: Tuple[str, ...] = ()
+
+
+class ToolExtractor:
+    """Parameter extractor compiled once from a tool's JSON schema.
+
+    Every pattern for every field is folded into one alternation, so extraction is a
+    single `finditer` over the message. Labeled values (`patient_id: p1`, `appointment
+    id is apt_9`, `appointment apt_9`, `apt_9`) fill their own field. Unlabeled ISO
+    dates, datetimes, relative times ("tomorrow at 3pm") and bare enum words fill the
+    first target field of that kind that is still empty.
+
+    A reply that is nothing but a short value answers the one field being asked for,
+    if it fits that field: ID-shaped for identifiers, an allowed word for enums. Free
+    text is never a bare answer for a destructive tool, nor when it names another
+    tool's keywords ("book a doctor instead"); the caller asks again.
+    """
+
+    def __init__(self, tool: ToolDefinition) -> None:
+        self.tool_name = tool.name
+        self.destructive = tool.destructive
+        properties = (tool.parameters or {}).get("properties", {})
+        self.fields = [_field_spec(name, schema or {}) for name, schema in properties.items()]
+
+        alternatives: List[str] = []
+        # Group name -> (field, decoder); field None means "first free target of this kind".
+        self._handlers: Dict[str, Tuple[Optional[FieldSpec], str, Callable[[re.Match], str]]] = {}
+
+        def add(pattern: str, field: Optional[FieldSpec], kind: str, decode: Callable[[re.Match], str]) -> None:
+            group = f"a{len(alternatives)}"
+            alternatives.append(f"(?P<{group}>{pattern.replace('<v>', f'<{group}v>')})")
+            self._handlers[group] = (field, kind, decode)
+
+        for field in self.fields:
+            value = _value_decoder(field)
+            labels = "|".join(_label_variants(field.name))
+            add(rf"\b(?:{labels})\s*[:=]\s*(?P<v>[^,;\n]+?){_VALUE_END}", field, "labeled", value)
+            if field.kind == "id":
+                words = "|".join(_id_words(field.name))
+                add(rf"\b(?:{words})[\s_]*(?:id|number|no\.?|#)\s*(?:is\s+|[:=#]\s*)?(?P<v>[\w-]+)", field, "labeled", value)
+                add(rf"\b(?:{words})\s+(?P<v>[a-z]*[_-]?\d[\w-]*)", field, "labeled", value)
+                add(rf"\b(?P<v>(?:{words})[_-]\w*\d[\w-]*)", field, "labeled", value)
+
+        add(rf"\b(?P<v>{_ISO_DATETIME})\b", None, "datetime", lambda m: m.group(m.lastgroup + "v"))
+        add(r"\bsame time tomorrow\b", None, "datetime", lambda m: "tomorrow same time")
+        add(
+            rf"\b(?P<v>(?:today|tomorrow)(?:\s+at)?\s+\d{{1,2}}(?::\d{{2}})?(?:\s*(?:am|pm))?)",
+            None,
+            "datetime",
+            lambda m: _relative(m.group(m.lastgroup + "v")),
+        )
+        add(rf"\b(?P<v>{_TIME}\s+(?:today|tomorrow))\b", None, "datetime", lambda m: _relative(m.group(m.lastgroup + "v")))
+        add(rf"\b(?P<v>{_ISO_DATE})\b", None, "date", lambda m: m.group(m.lastgroup + "v"))
+        for field in self.fields:
+            if field.kind == "enum":
+                words = "|".join(re.escape(value) for value in field.values)
+                add(rf"\b(?P<v>{words})\b", field, "enum", _value_decoder(field))
+
+        self._pattern = re.compile("|".join(alternatives), re.IGNORECASE) if alternatives else None
+
+    def extract(
+        self,
+        text: str,
+        targets: Optional[Collection[str]] = None,
+        bare_answer: bool = True,
+    ) -> Dict[str, str]:
+        """Parameters found in `text`.
+
+        With `targets` (the pending tool's missing fields) unlabeled values, bare enum
+        words and a short bare answer only fill those fields; explicit `name: value`
+        pairs are still honoured for any declared field. Without it, every field is a
+        target but bare enum words and bare answers are ignored. `bare_answer=False`
+        also ignores bare answers, e.g. when the reply is a control word like "cancel".
+        """
+        targeted = targets is not None
+        wanted = set(targets) if targeted else {field.name for field in self.fields}
+        found: Dict[str, str] = {}
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                field, kind, decode = self._handlers[match.lastgroup]
+                if kind == "labeled":
+                    if field.name not in found:
+                        found[field.name] = decode(match)
+                    continue
+                if kind == "enum":
+                    if targeted and field.name in wanted and field.name not in found:
+                        found[field.name] = decode(match)
+                    continue
+                for candidate in self.fields:
+                    if candidate.kind == kind and candidate.name in wanted and candidate.name not in found:
+                        found[candidate.name] = decode(match)
+                        break
+
+        if bare_answer and targeted and len(wanted) == 1 and not found:
+            field = self._field(next(iter(wanted)))
+            answer = _bare_answer(field, text)
+            if answer is not None and field.kind == "text" and (self.destructive or _names_a_tool(text)):
+                answer = None
+            if answer is not None:
+                found[field.name] = answer
+        return found
+
+    def _field(self, name: str) -> Optional[FieldSpec]:
+        for field in self.fields:
+            if field.name == name:
+                return field
+        return None
+
+
+def get_extractor(tool: ToolDefinition) -> ToolExtractor:
+    """Compiled extractor for `tool`, cached on the current registry snapshot."""
+    snapshot = current_tools()
+    if snapshot.get(tool.name) is tool:
+        return snapshot.derive(f"extractor:{tool.name}", lambda _: ToolExtractor(tool))
+    return ToolExtractor(tool)
+
+
+def extract_parameters(
+    tool: ToolDefinition,
+    text: str,
+    targets: Optional[Collection[str]] = None,
+    bare_answer: bool = True,
+) -> Dict[str, str]:
+    started = time.perf_counter()
+    extracted = get_extractor(tool).extract(text, targets, bare_answer)
+    observe(EXTRACTION_SECONDS, time.perf_counter() - started)
+    return extracted
+
+
+def _field_spec(name: str, schema: Dict[str, Any]) -> FieldSpec:
+    description = str(schema.get("description", ""))
+    enum = schema.get("enum")
+    if isinstance(enum, list) and enum:
+        return FieldSpec(name, "enum", tuple(str(value) for value in enum))
+    if re.fullmatch(r"[a-z]+(?:/[a-z]+)+", description.strip()):
+        return FieldSpec(name, "enum", tuple(description.strip().split("/")))
+    fmt = schema.get("format")
+    if fmt == "date-time" or "ISO 8601" in description:
+        return FieldSpec(name, "datetime")
+    if fmt == "date" or "YYYY-MM-DD" in description:
+        return FieldSpec(name, "date")
+    if name.endswith("_id") or name.endswith("_number"):
+        return FieldSpec(name, "id")
+    return FieldSpec(name, "text")
+
+
+def _label_variants(name: str) -> List[str]:
+    spaced = name.replace("_", " ")
+    variants = [re.escape(name), re.escape(spaced).replace(r"\ ", r"\s+")]
+    for alias in ALIASES.get(name, ()):
+        variants.append(re.escape(alias).replace(r"\ ", r"\s+"))
+    return variants
+
+
+def _id_words(name: str) -> List[str]:
+    stem = re.sub(r"_(?:id|number)$", "", name)
+    words = [re.escape(stem).replace("_", r"[\s_]+")]
+    for alias in ALIASES.get(stem, ()):
+        words.append(re.escape(alias).replace(r"\ ", r"\s+"))
+    return words
+
+
+def _value_decoder(field: FieldSpec) -> Callable[[re.Match], str]:
+    def decode(match: re.Match) -> str:
+        value = match.group(match.lastgroup + "v").strip()
+        if field.kind == "enum":
+            for allowed in field.values:
+                if allowed.lower() == value.lower():
+                    return allowed
+        return value
+
+    return decode
+
+
+def _names_a_tool(text: str) -> bool:
+    """Whether `text` reads like a request (it contains a tool keyword) rather than a value."""
+    return bool(keyword_index(current_tools()).matches(text.lower()))
+
+
+def _relative(text: str) -> str:
+    """Normalize "tomorrow at 3pm" / "3pm tomorrow" to "tomorrow 3pm"."""
+    lowered = " ".join(text.lower().split())
+    day = "today" if "today" in lowered else "tomorrow"
+    time = lowered.replace(day, "").replace(" at ", " ").strip()
+    if time.startswith("at "):
+        time = time[3:]
+    return f"{day} {time.strip()}"
+
+
+def _bare_answer(field: Optional[FieldSpec], text: str) -> Optional[str]:
+    """Treat a short reply as the value of the one field the assistant asked for."""
+    answer = text.strip().strip(".!")
+    if field is None or not answer or len(answer) > _BARE_ANSWER_MAX or "?" in answer:
+        return None
+    if field.kind == "id":
+        return answer if _BARE_ID.fullmatch(answer) else None
+    if field.kind == "enum":
+        for allowed in field.values:
+            if allowed.lower() == answer.lower():
+                return allowed
+        return None
+    if field.kind in {"date", "datetime"}:
+        return None
+    return answer
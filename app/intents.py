@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Tuple
+
+
+APPROVE_PHRASES = (
+    "yes", "y", "yep", "yeah", "yup", "sure", "ok", "okay", "approve", "approved", "confirm",
+    "confirmed", "proceed", "go ahead", "do it", "please do", "sounds good", "correct", "affirmative",
+)
+DENY_PHRASES = (
+    "no", "n", "nope", "nah", "decline", "declined", "deny", "denied", "reject", "negative",
+    "not now", "not yet", "hold off", "don't", "dont", "do not",
+)
+CANCEL_PHRASES = (
+    "cancel", "cancel that", "stop", "abort", "quit", "never mind", "nevermind", "forget it", "forget about it",
+)
+# Hesitation: the user hasn't decided, so the reply must not act either way.
+UNSURE_PHRASES = (
+    "not sure", "not really sure", "i'm not sure", "im not sure", "unsure", "not certain", "maybe",
+    "i don't know", "i dont know", "i do not know", "don't know", "dont know", "no idea", "let me think",
+    "hmm", "hmmm", "wait", "hold on", "hang on", "one moment", "one sec", "let me check",
+)
+# Words that don't change the meaning of a control reply ("yes please", "no thanks").
+FILLER_WORDS = frozenset({"please", "thanks", "thank", "you", "it", "that", "just", "then", "so", "oh", "well", "um", "uh"})
+NEGATORS = ("don't", "dont", "do not", "not", "never")
+
+
+@dataclass(frozen=True)
+class ControlIntent:
+    """A short reply's control meaning.
+
+    `intent` is approve, deny, cancel, unsure or none. `confidence` is the share of
+    the reply's words that are control phrases or filler, discounted when approve and
+    deny/cancel phrases both appear; "yes" scores 1.0, "yes but use 3pm" far less.
+    Hesitation ("not sure", "I don't know") and negated cancels ("don't cancel") are
+    unsure, which neither approves nor drops a pending tool.
+    """
+
+    intent: str
+    confidence: float
+
+    @property
+    def negative(self) -> bool:
+        return self.intent in {"deny", "cancel"}
+
+
+NO_INTENT = ControlIntent("none", 0.0)
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Longest first so "go ahead" wins over a shorter phrase at the same position.
+    ordered = sorted(set(phrases), key=len, reverse=True)
+    return "|".join(re.escape(phrase).replace(r"\ ", r"\s+") for phrase in ordered)
+
+
+_CONTROL = re.compile(
+    rf"(?<![\w'])(?:"
+    rf"(?P<unsure>{_alternation(UNSURE_PHRASES)}|(?:{_alternation(NEGATORS)})\s+(?:{_alternation(CANCEL_PHRASES)}))"
+    rf"|(?P<negated>(?:{_alternation(NEGATORS)})\s+(?:{_alternation(APPROVE_PHRASES)}))"
+    rf"|(?P<cancel>{_alternation(CANCEL_PHRASES)})"
+    rf"|(?P<deny>{_alternation(DENY_PHRASES)})"
+    rf"|(?P<approve>{_alternation(APPROVE_PHRASES)})"
+    rf")(?![\w'])"
+)
+
+
+def classify_control(text: str) -> ControlIntent:
+    """Match `text` against the precompiled control phrases in one pass."""
+    lowered = text.lower().replace("’", "'")
+    words = list(_WORD.finditer(lowered))
+    if not words:
+        return NO_INTENT
+
+    hits: Dict[str, int] = {"approve": 0, "deny": 0, "cancel": 0, "unsure": 0}
+    spans = []
+    for match in _CONTROL.finditer(lowered):
+        group = match.lastgroup
+        hits["deny" if group == "negated" else group] += 1
+        spans.append(match.span())
+    if not any(hits.values()):
+        return NO_INTENT
+
+    # Each word counts once, so the "it" in "forget it" isn't also counted as filler.
+    covered = sum(
+        1
+        for word in words
+        if word.group(0) in FILLER_WORDS or any(start <= word.start() and word.end() <= end for start, end in spans)
+    )
+    coverage = covered / len(words)
+    negative = hits["deny"] + hits["cancel"]
+    if hits["unsure"]:
+        # Any hesitation outweighs the rest: "yes, not sure" should be asked again.
+        if hits["approve"] and negative:  # "yes, no wait" is as muddled as any mixed reply
+            return ControlIntent("unsure", round(coverage * hits["unsure"] / sum(hits.values()) / 2, 4))
+        return ControlIntent("unsure", round(coverage, 4))
+    if hits["approve"] and negative:
+        # Mixed signals ("yes, no wait"): report the stronger side, heavily discounted.
+        intent, agreeing = _stronger(hits)
+        return ControlIntent(intent, round(coverage * agreeing / (hits["approve"] + negative) / 2, 4))
+    intent = "approve" if hits["approve"] else ("cancel" if hits["cancel"] else "deny")
+    return ControlIntent(intent, round(coverage, 4))
+
+
+def _stronger(hits: Dict[str, int]) -> Tuple[str, int]:
+    negative = hits["deny"] + hits["cancel"]
+    if hits["approve"] > negative:
+        return "approve", hits["approve"]
+    return ("cancel" if hits["cancel"] else "deny"), negative
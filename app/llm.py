@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import threading
 from typing import Any, Dict, List, Optional, Tuple, Type
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -7,14 +8,63 @@ from langchain_core.tools import StructuredTool
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field, create_model
 
-from app.settings import load_settings
-from app.tools import ToolDefinition
+from app.local_llm import build_local_llm
+from app.settings import AppSettings, load_settings, settings_version
+from app.tools import ToolDefinition, current_tools
+
+
+# Process-wide client and tool bindings. ChatOpenAI owns an HTTP connection pool and
+# bind_tools() re-derives every args schema, so both are built once and reused until
+# the settings or the registered tool set change.
+_CACHE_LOCK = threading.RLock()
+_LLM_CACHE: Dict[str, Any] = {}
 
 
 def get_llm() -> ChatOpenAI:
+    """Shared chat model: ChatOpenAI, or the offline `LocalChatModel` when `llm_provider` is local."""
+    version = settings_version()
     settings = load_settings()
-    if not settings.openai_api_key:
+    if settings.llm_provider != "local" and not settings.openai_api_key:
         raise RuntimeError("Missing OpenAI API key.")
+    cached = _LLM_CACHE.get("llm")
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _CACHE_LOCK:
+        cached = _LLM_CACHE.get("llm")
+        if cached is None or cached[0] != version:
+            cached = (version, _build_llm(settings))
+            _LLM_CACHE["llm"] = cached
+    return cached[1]
+
+
+def get_llm_with_tools() -> Any:
+    """Return the cached client bound to the current tools; raises RuntimeError like `get_llm`."""
+    llm = get_llm()
+    tools = current_tools()
+    key = (id(llm), tools.version)
+    cached = _LLM_CACHE.get("bound")
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with _CACHE_LOCK:
+        cached = _LLM_CACHE.get("bound")
+        if cached is None or cached[0] != key:
+            cached = (key, llm.bind_tools(tools.derive("langchain_tools", build_langchain_tools)))
+            _LLM_CACHE["bound"] = cached
+    return cached[1]
+
+
+def get_langchain_tools() -> List[StructuredTool]:
+    return current_tools().derive("langchain_tools", build_langchain_tools)
+
+
+def clear_llm_cache() -> None:
+    with _CACHE_LOCK:
+        _LLM_CACHE.clear()
+
+
+def _build_llm(settings: AppSettings) -> ChatOpenAI:
+    if settings.llm_provider == "local":
+        return build_local_llm(settings)
     return ChatOpenAI(
         api_key=settings.openai_api_key,
         model=settings.openai_model,
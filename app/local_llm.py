@@ -0,0 +1,270 @@
+"""Offline chat model for load and latency testing (`SAK_LLM_PROVIDER=local`).
+
+`LocalChatModel` is a LangChain chat model that never touches the network. Replies
+come from an optional JSON script of rules, then from built-in behaviour:
+
+* with tools bound, the best keyword match is returned as a tool call whose
+  arguments come from the parameter extractor;
+* tool-result prompts ("Tool `x` returned: ...") get a one-line summary;
+* evaluation judge prompts get an all-true JSON verdict;
+* anything else gets a short canned reply.
+
+Every call sleeps for a delay drawn from a latency distribution, and streamed replies
+add a per-chunk delay, so the API can be load-tested under realistic LLM timings.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import ConfigDict, Field, PrivateAttr
+
+from app.confidence import KeywordConfidenceModel
+from app.extraction import extract_parameters
+from app.tools import current_tools
+
+
+DEFAULT_REPLY = "Happy to help. Could you tell me a bit more about what you need?"
+JUDGE_VERDICT = {
+    "tool_selection_correct": True,
+    "parameters_correct": True,
+    "task_completed": True,
+    "comments": "local model verdict",
+}
+
+
+_ARITY = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+
+@dataclass(frozen=True)
+class Latency:
+    """Delay distribution in seconds, parsed from `kind:a,b`.
+
+    `fixed:0.4`, `uniform:0.2,1.2`, `normal:0.8,0.2` (mean, stddev) and
+    `lognormal:0.8,0.5` (median, sigma; long right tail like real model latency).
+    A bare number means `fixed`. Samples are clamped at zero; a malformed spec
+    raises `ValueError` so a typo can't silently turn into zero latency.
+    """
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str | None) -> "Latency":
+        spec = (spec or "").strip().lower()
+        if not spec:
+            return cls()
+        kind, _, raw = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+        if kind not in _ARITY:
+            raise ValueError(f"unknown latency distribution {kind!r} in {spec!r}; use {'|'.join(_ARITY)}")
+        try:
+            values = [float(part) for part in raw.split(",") if part.strip()]
+        except ValueError:
+            raise ValueError(f"latency {spec!r} has a non-numeric value") from None
+        if len(values) != _ARITY[kind]:
+            raise ValueError(f"{kind} latency takes {_ARITY[kind]} value(s), got {spec!r}")
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        else:
+            value = self.a
+        return max(0.0, value)
+
+
+@dataclass(frozen=True)
+class Rule:
+    pattern: re.Pattern
+    reply: Optional[str] = None
+    tool: Optional[str] = None
+    args: Optional[Dict[str, Any]] = None
+
+
+def load_script(path: str | None) -> List[Rule]:
+    """Rules from a JSON file: `{"rules": [{"match": regex, "reply": str} | {"match": regex, "tool": name, "args": {...}}]}`.
+
+    `match` is searched (case-insensitive) in the last user message; the first hit wins.
+    """
+    if not path:
+        return []
+    data = json.loads(Path(path).expanduser().read_text(encoding="utf-8"))
+    rules = []
+    for item in data.get("rules", []):
+        rules.append(
+            Rule(
+                pattern=re.compile(item.get("match", ""), re.IGNORECASE),
+                reply=item.get("reply"),
+                tool=item.get("tool"),
+                args=item.get("args"),
+            )
+        )
+    return rules
+
+
+class LocalChatModel(BaseChatModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    rules: List[Rule] = Field(default_factory=list)
+    latency: Latency = Field(default_factory=Latency)
+    token_latency: Latency = Field(default_factory=Latency)
+    tool_names: Optional[List[str]] = None
+    seed: Optional[int] = None
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "sak-local"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any) -> "LocalChatModel":
+        names = [getattr(tool, "name", None) or tool.get("function", {}).get("name") for tool in tools]
+        bound = self.model_copy(update={"tool_names": [name for name in names if name]})
+        bound._rng, bound._rng_lock = self._rng, self._rng_lock
+        return bound
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._delay(self.latency))
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._delay(self.latency))
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages))])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._delay(self.latency))
+        for chunk in _chunks(self._reply(messages)):
+            yield chunk
+            time.sleep(self._delay(self.token_latency))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._delay(self.latency))
+        for chunk in _chunks(self._reply(messages)):
+            yield chunk
+            await asyncio.sleep(self._delay(self.token_latency))
+
+    def _delay(self, latency: Latency) -> float:
+        if latency.kind == "fixed":
+            return max(0.0, latency.a)
+        with self._rng_lock:
+            return latency.sample(self._rng)
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        last = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        text = last if isinstance(last, str) else str(last)
+        for rule in self.rules:
+            if not rule.pattern.search(text):
+                continue
+            # A tool rule only applies when that tool is bound; otherwise (e.g. a summary
+            # call) the rule's reply, if any, is used.
+            if rule.tool and self.tool_names and rule.tool in self.tool_names:
+                return _tool_call_message(rule.tool, dict(rule.args or {}))
+            if rule.reply is not None:
+                return AIMessage(content=rule.reply)
+
+        if "returned:" in text and text.startswith("Tool `"):
+            name = text[len("Tool `"):].split("`", 1)[0]
+            return AIMessage(content=f"All set: {name.replace('_', ' ')} completed.")
+        if '"tool_selection_correct"' in text:
+            return AIMessage(content=json.dumps(JUDGE_VERDICT))
+        if self.tool_names:
+            call = _keyword_tool_call(text, self.tool_names)
+            if call is not None:
+                return call
+        return AIMessage(content=DEFAULT_REPLY)
+
+
+def build_local_llm(settings: Any) -> LocalChatModel:
+    """Build the model from settings, raising RuntimeError for a bad latency spec or script.
+
+    RuntimeError is what `get_llm` callers already fall back on, so a typo picked up on
+    reload degrades to the no-LLM path instead of failing requests with a ValueError.
+    """
+    try:
+        return LocalChatModel(
+            rules=load_script(settings.local_llm_script),
+            latency=Latency.parse(settings.local_llm_latency),
+            token_latency=Latency.parse(settings.local_llm_token_latency),
+            seed=settings.local_llm_seed,
+        )
+    except (OSError, ValueError, re.error) as exc:
+        raise RuntimeError(f"Invalid local LLM settings: {exc}") from exc
+
+
+_CALL_IDS = iter(range(1, 1 << 62))
+_SELECTOR = KeywordConfidenceModel()
+
+
+def _tool_call_message(name: str, args: Dict[str, Any]) -> AIMessage:
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": f"call_local_{next(_CALL_IDS)}"}])
+
+
+def _keyword_tool_call(text: str, tool_names: List[str]) -> Optional[AIMessage]:
+    tools = [tool for tool in current_tools() if tool.name in tool_names]
+    result = _SELECTOR.score(text, tools)
+    tool = next((tool for tool in tools if tool.name == result.tool_name), None)
+    if tool is None:
+        return None
+    return _tool_call_message(tool.name, extract_parameters(tool, text))
+
+
+def _chunks(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+    if message.tool_calls:
+        yield ChatGenerationChunk(
+            message=AIMessageChunk(
+                content="",
+                tool_call_chunks=[
+                    {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": index}
+                    for index, call in enumerate(message.tool_calls)
+                ],
+            )
+        )
+        return
+    words = message.content.split(" ")
+    for index, word in enumerate(words):
+        yield ChatGenerationChunk(message=AIMessageChunk(content=word if index == len(words) - 1 else word + " "))
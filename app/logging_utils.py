@@ -1,43 +1,211 @@
 from __future__ import annotations
 
+import atexit
 import json
-import logging
 import os
-from datetime import datetime
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
+from app.profiling import add_timing
 
-_LOGGER: logging.Logger | None = None
 
+_Record = Tuple[float, str, Dict[str, Any]]
 
-def get_logger() -> logging.Logger:
-    global _LOGGER
-    if _LOGGER is not None:
-        return _LOGGER
 
-    log_path = os.getenv("SAK_LOG_PATH", "logs/agent.log")
-    path = Path(log_path)
-    path.parent.mkdir(parents=True, exist_ok=True)
+class _EventWriter:
+    """Serializes and appends events on a daemon thread.
 
-    logger = logging.getLogger("sak")
-    logger.setLevel(logging.INFO)
-    handler = logging.FileHandler(path, encoding="utf-8")
-    formatter = logging.Formatter("%(message)s")
-    handler.setFormatter(formatter)
+    `log_event` only samples and enqueues; JSON encoding and file I/O happen here,
+    in batches of up to `batch_size` lines or every `flush_interval` seconds. When
+    the queue is full the record is dropped (and counted) unless `block` is set.
+    """
 
-    if not logger.handlers:
-        logger.addHandler(handler)
+    def __init__(
+        self,
+        path: Path,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 0.5,
+        block: bool = False,
+        sample: Optional[Dict[str, float]] = None,
+    ) -> None:
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.block = block
+        self.sample = sample or {}
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._counters = {"written": 0, "dropped": 0, "sampled_out": 0, "errors": 0}
 
-    _LOGGER = logger
-    return logger
+    def submit(self, event: str, payload: Dict[str, Any]) -> None:
+        rate = self.sample.get(event, self.sample.get("*", 1.0))
+        if rate < 1.0 and random.random() >= rate:
+            self._counters["sampled_out"] += 1
+            return
+        self._ensure_thread()
+        record = (time.time(), event, payload)
+        try:
+            self._queue.put(record, block=self.block)
+        except queue.Full:
+            self._counters["dropped"] += 1
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until everything queued before this call is on disk."""
+        if self._thread is None:
+            return True
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return False
+        return done.wait(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        return {"queued": self._queue.qsize(), **self._counters}
+
+    def _ensure_thread(self) -> None:
+        # A forked worker inherits the writer but not its thread; start a fresh one.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name="sak-log-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        # Nothing may end this loop: a dead writer would silently drop (or, in block
+        # mode, hang) every later event, and `_ensure_thread` only restarts after a fork.
+        handle = None
+        while True:
+            batch, markers = self._next_batch()
+            try:
+                if batch:
+                    if handle is None:
+                        self.path.parent.mkdir(parents=True, exist_ok=True)
+                        handle = self.path.open("a", encoding="utf-8")
+                    self._write(handle, batch)
+            except Exception:
+                # The log file can't be opened; count the batch and try again next time.
+                self._counters["errors"] += len(batch)
+            finally:
+                for marker in markers:
+                    marker.set()
+
+    def _next_batch(self) -> Tuple[List[_Record], List[threading.Event]]:
+        batch: List[_Record] = []
+        markers: List[threading.Event] = []
+        item = self._queue.get()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if isinstance(item, threading.Event):
+                # Flush request: write what we have now instead of waiting out the interval.
+                markers.append(item)
+                return batch, markers
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                return batch, markers
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, markers
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, markers
+
+    def _write(self, handle, batch: List[_Record]) -> None:
+        lines = []
+        for ts, event, payload in batch:
+            try:
+                record = {"ts": _format_ts(ts), "event": event, **payload}
+                lines.append(json.dumps(record, ensure_ascii=False, default=str))
+            except Exception:
+                # E.g. the caller mutated the payload while it was being encoded.
+                self._counters["errors"] += 1
+        if not lines:
+            return
+        try:
+            handle.write("\n".join(lines) + "\n")
+            handle.flush()
+            self._counters["written"] += len(lines)
+        except Exception:
+            self._counters["errors"] += len(lines)
+
+
+_WRITER: _EventWriter | None = None
+_WRITER_LOCK = threading.Lock()
+
+
+def get_writer() -> _EventWriter:
+    global _WRITER
+    if _WRITER is not None:
+        return _WRITER
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            _WRITER = _EventWriter(
+                Path(os.getenv("SAK_LOG_PATH", "logs/agent.log")),
+                queue_size=int(_env_number("SAK_LOG_QUEUE_SIZE", 10000)),
+                batch_size=int(_env_number("SAK_LOG_BATCH_SIZE", 256)),
+                flush_interval=_env_number("SAK_LOG_FLUSH_INTERVAL", 0.5),
+                block=os.getenv("SAK_LOG_QUEUE_FULL", "drop").strip().lower() == "block",
+                sample=_parse_sample(os.getenv("SAK_LOG_SAMPLE", "")),
+            )
+            atexit.register(_WRITER.flush)
+    return _WRITER
 
 
 def log_event(event: str, payload: Dict[str, Any]) -> None:
-    logger = get_logger()
-    record = {
-        "ts": datetime.utcnow().isoformat() + "Z",
-        "event": event,
-        **payload,
-    }
-    logger.info(json.dumps(record, ensure_ascii=False))
+    """Queue an event for the background writer.
+
+    The payload is serialized later on the writer thread, so callers must not mutate
+    it (or anything it references) after logging.
+    """
+    started = time.perf_counter()
+    get_writer().submit(event, payload)
+    add_timing("log", time.perf_counter() - started)
+
+
+def flush_logs(timeout: float = 5.0) -> bool:
+    if _WRITER is None:
+        return True
+    return _WRITER.flush(timeout)
+
+
+def logging_stats() -> Dict[str, int]:
+    return get_writer().stats()
+
+
+def _format_ts(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).replace(tzinfo=None).isoformat() + "Z"
+
+
+def _parse_sample(raw: str) -> Dict[str, float]:
+    """Parse `event=rate` pairs, e.g. `tool_selection=0.1,*=1`."""
+    rates: Dict[str, float] = {}
+    for part in raw.split(","):
+        name, sep, value = part.partition("=")
+        if not sep or not name.strip():
+            continue
+        try:
+            rates[name.strip()] = min(1.0, max(0.0, float(value)))
+        except ValueError:
+            continue
+    return rates
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
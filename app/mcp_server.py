@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from typing import Any, Dict, Iterable, List
 
 from fastmcp import FastMCP
@@ -7,8 +9,10 @@ from fastmcp.tools.tool import Tool, ToolResult
 from pydantic import Field
 
 from app.config import get_confidence_threshold
-from app.confidence import get_confidence_model
-from app.tools import TOOLS, ToolHandler
+from app.confidence import ConfidenceResult, get_confidence_model, get_conversation_scorer
+from app.metrics import CONFIDENCE_SECONDS, call_tool_handler, observe
+from app.profiling import run_profiled
+from app.tools import ToolHandler, ToolSnapshot, current_tools
 
 
 mcp = FastMCP("ServiceOS Tools", stateless_http=True, json_response=True)
@@ -16,9 +20,10 @@ mcp = FastMCP("ServiceOS Tools", stateless_http=True, json_response=True)
 
 class WorkflowTool(Tool):
     handler: ToolHandler = Field(exclude=True)
+    tool_name: str = Field(default="", exclude=True)
 
     async def run(self, arguments: dict[str, Any]) -> ToolResult:
-        result = self.handler(arguments)
+        result = await asyncio.to_thread(run_profiled, call_tool_handler, self.tool_name or self.name, self.handler, arguments)
         return ToolResult(structured_content=result)
 
 
@@ -29,54 +34,103 @@ class ConfidenceEvalTool(Tool):
         top_k = _coerce_int(arguments.get("top_k"), default=5)
 
         messages = _normalize_messages(raw_messages)
-        text = _messages_to_text(messages, mode=mode)
+        session_id = arguments.get("session_id")
+        tools = current_tools()
 
-        model = get_confidence_model()
-        result = model.score(text, TOOLS)
-
-        scores = {tool.name: float(result.scores.get(tool.name, 0.0)) for tool in TOOLS}
-        ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
-        tools_payload = [
-            {
-                "name": name,
-                "mcp_name": f"tool-{name}",
-                "confidence": score,
+        # Full transcripts grow every turn; the incremental scorer only scans new messages.
+        scorer = get_conversation_scorer() if mode != "last_user" else None
+        started = time.perf_counter()
+        if scorer is not None:
+            result = scorer.score(messages, tools, session_id=session_id if isinstance(session_id, str) else None)
+        else:
+            model = get_confidence_model()
+            result = await model.ascore(_messages_to_text(messages, mode=mode), tools)
+        observe(CONFIDENCE_SECONDS, time.perf_counter() - started, source=result.source)
+
+        return ToolResult(
+            structured_content={
+                "threshold": get_confidence_threshold(),
+                **_confidence_payload(result, tools, top_k=top_k, mode=mode),
             }
-            for name, score in ordered
+        )
+
+
+class ConfidenceEvalBatchTool(Tool):
+    """Score many conversations with one `score_batch` call."""
+
+    async def run(self, arguments: dict[str, Any]) -> ToolResult:
+        raw_conversations = arguments.get("conversations")
+        mode = arguments.get("mode", "full_conversation")
+        top_k = _coerce_int(arguments.get("top_k"), default=5)
+
+        conversations = raw_conversations if isinstance(raw_conversations, list) else []
+        texts = [
+            _messages_to_text(_normalize_messages(_conversation_messages(conversation)), mode=mode)
+            for conversation in conversations
         ]
 
-        selected = None
-        if result.tool_name:
-            selected_score = scores.get(result.tool_name, float(result.confidence))
-            selected = {
-                "name": result.tool_name,
-                "mcp_name": f"tool-{result.tool_name}",
-                "confidence": selected_score,
-            }
+        tools = current_tools()
+        model = get_confidence_model()
+        started = time.perf_counter()
+        results = await model.ascore_batch(texts, tools)
+        # One shared round-trip: each conversation is charged an equal share of it.
+        share = (time.perf_counter() - started) / max(1, len(results))
+        for result in results:
+            observe(CONFIDENCE_SECONDS, share, source=result.source)
 
         return ToolResult(
             structured_content={
                 "threshold": get_confidence_threshold(),
-                "selected": selected,
-                "tools": tools_payload,
-                "top_k": max(1, min(top_k, len(TOOLS))),
-                "mode": "last_user" if mode == "last_user" else "full_conversation",
+                "results": [
+                    {
+                        "id": conversation.get("id") if isinstance(conversation, dict) else None,
+                        **_confidence_payload(result, tools, top_k=top_k, mode=mode),
+                    }
+                    for conversation, result in zip(conversations, results)
+                ],
             }
         )
 
 
 def register_workflow_tools() -> None:
-    for tool in TOOLS:
+    for tool in current_tools():
         mcp.add_tool(
             WorkflowTool(
                 name=f"tool-{tool.name}",
                 description=tool.description,
                 parameters=tool.parameters,
                 handler=tool.handler,
+                tool_name=tool.name,
             )
         )
 
 
+_MESSAGES_SCHEMA: Dict[str, Any] = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "role": {"type": "string"},
+            "content": {"type": "string"},
+        },
+        "required": ["role", "content"],
+    },
+}
+
+_MODE_SCHEMA: Dict[str, Any] = {
+    "type": "string",
+    "enum": ["full_conversation", "last_user"],
+    "default": "full_conversation",
+}
+
+_TOP_K_SCHEMA: Dict[str, Any] = {
+    "type": "integer",
+    "minimum": 1,
+    "maximum": 20,
+    "default": 5,
+}
+
+
 def register_meta_tools() -> None:
     mcp.add_tool(
         ConfidenceEvalTool(
@@ -87,35 +141,83 @@ def register_meta_tools() -> None:
             parameters={
                 "type": "object",
                 "properties": {
-                    "messages": {
+                    "messages": _MESSAGES_SCHEMA,
+                    "mode": _MODE_SCHEMA,
+                    "top_k": _TOP_K_SCHEMA,
+                    "session_id": {
+                        "type": "string",
+                        "description": "Stable conversation id; lets full_conversation scoring reuse earlier turns.",
+                    },
+                },
+                "required": ["messages"],
+            },
+        )
+    )
+    mcp.add_tool(
+        ConfidenceEvalBatchTool(
+            name="meta-confidence-eval-batch",
+            description=(
+                "Evaluate tool confidence scores for many conversations in one call "
+                "and return a ranked list per conversation."
+            ),
+            parameters={
+                "type": "object",
+                "properties": {
+                    "conversations": {
                         "type": "array",
                         "items": {
                             "type": "object",
                             "properties": {
-                                "role": {"type": "string"},
-                                "content": {"type": "string"},
+                                "id": {"type": "string"},
+                                "messages": _MESSAGES_SCHEMA,
                             },
-                            "required": ["role", "content"],
+                            "required": ["messages"],
                         },
                     },
-                    "mode": {
-                        "type": "string",
-                        "enum": ["full_conversation", "last_user"],
-                        "default": "full_conversation",
-                    },
-                    "top_k": {
-                        "type": "integer",
-                        "minimum": 1,
-                        "maximum": 20,
-                        "default": 5,
-                    },
+                    "mode": _MODE_SCHEMA,
+                    "top_k": _TOP_K_SCHEMA,
                 },
-                "required": ["messages"],
+                "required": ["conversations"],
             },
         )
     )
 
 
+def _confidence_payload(result: ConfidenceResult, tools: ToolSnapshot, top_k: int, mode: str) -> Dict[str, Any]:
+    scores = {tool.name: float(result.scores.get(tool.name, 0.0)) for tool in tools}
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    tools_payload = [
+        {
+            "name": name,
+            "mcp_name": f"tool-{name}",
+            "confidence": score,
+        }
+        for name, score in ordered
+    ]
+
+    selected = None
+    if result.tool_name:
+        selected_score = scores.get(result.tool_name, float(result.confidence))
+        selected = {
+            "name": result.tool_name,
+            "mcp_name": f"tool-{result.tool_name}",
+            "confidence": selected_score,
+        }
+
+    return {
+        "selected": selected,
+        "tools": tools_payload,
+        "top_k": max(1, min(top_k, len(tools))),
+        "mode": "last_user" if mode == "last_user" else "full_conversation",
+    }
+
+
+def _conversation_messages(conversation: Any) -> Any:
+    if isinstance(conversation, dict):
+        return conversation.get("messages")
+    return conversation
+
+
 def _normalize_messages(messages: Any) -> List[Dict[str, str]]:
     if not isinstance(messages, list):
         return []
@@ -0,0 +1,289 @@
+"""Process-local runtime metrics in the Prometheus text exposition format (0.0.4).
+
+Counters and histograms are plain in-memory objects guarded by a lock, so
+recording one costs a dict lookup and a few additions; nothing is exported until
+`/metrics` is scraped. Values that other modules already keep (session store,
+event log, routing tiers) are read at scrape time through `register_collector`
+instead of being counted twice.
+
+    with timed(TOOL_SECONDS, tool=tool.name):
+        result = tool.handler(parameters)
+
+Histograms created with a `timing` name also feed the per-request Server-Timing
+collector in `app.profiling`, whatever `SAK_METRICS` says.
+
+Set `SAK_METRICS=false` to turn recording off and make `/metrics` return 404; the
+variable is read once at start-up.
+With several workers each process reports its own values; scrape every worker
+or aggregate per instance.
+"""
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+from app.profiling import add_timing
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans in-process stages (tens of microseconds) up to slow LLM round-trips.
+DEFAULT_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_LabelValues = Tuple[str, ...]
+Sample = Tuple[Dict[str, str], float]
+
+
+_ENABLED = os.getenv("SAK_METRICS", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def metrics_enabled() -> bool:
+    """Whether recording and `/metrics` are on; `SAK_METRICS` is read once, at import."""
+    return _ENABLED
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> _LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: _LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: Dict[_LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self._labels(key), value
+
+
+class Histogram(_Metric):
+    """Cumulative-bucket histogram; `observe` takes seconds.
+
+    `timing` names the Server-Timing entry the `observe`/`timed` helpers report to;
+    the first label value, if any, is appended (`llm.summary`, `store.get`).
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        timing: str = "",
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.timing = timing
+        # Per label set: one count per bucket plus +Inf, then the running sum.
+        self._values: Dict[_LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            entry[0][index] += 1
+            entry[1][0] += value
+
+    def samples(self) -> Iterator[Tuple[str, Dict[str, str], float]]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket", {**labels, "le": "+Inf"}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]] = []
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]) -> None:
+        """Add a scrape-time source yielding `(name, kind, help, [(labels, value), ...])` families."""
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            _family_header(lines, metric.name, metric.kind, metric.help)
+            for name, labels, value in metric.samples():
+                lines.append(_sample_line(name, labels, value))
+        for collector in collectors:
+            for name, kind, help, samples in collector():
+                _family_header(lines, name, kind, help)
+                for labels, value in samples:
+                    lines.append(_sample_line(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+
+def histogram(
+    name: str,
+    help: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+    timing: str = "",
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labelnames, buckets, timing))  # type: ignore[return-value]
+
+
+def register_collector(collector: Callable[[], Iterable[Tuple[str, str, str, Iterable[Sample]]]]) -> None:
+    REGISTRY.register_collector(collector)
+
+
+def render() -> str:
+    return REGISTRY.render()
+
+
+@contextmanager
+def timed(metric: Histogram, **labels: object) -> Iterator[None]:
+    """Observe the wall time of the block, including when it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(metric, time.perf_counter() - started, **labels)
+
+
+def observe(metric: Histogram, seconds: float, **labels: object) -> None:
+    if metric.timing:
+        add_timing(f"{metric.timing}.{next(iter(labels.values()))}" if labels else metric.timing, seconds)
+    if _ENABLED:
+        metric.observe(seconds, **labels)
+
+
+def count(metric: Counter, amount: float = 1.0, **labels: object) -> None:
+    if _ENABLED:
+        metric.inc(amount, **labels)
+
+
+# Per-stage latency of a turn. Each stage has its own family so dashboards can
+# compare like with like; labels stay low-cardinality (tool names, fixed enums).
+TURN_SECONDS = histogram("sak_turn_duration_seconds", "Wall time of one chat turn.", ["action"])
+TURNS = counter("sak_turns_total", "Chat turns by resulting action and tool.", ["action", "tool"])
+CONFIDENCE_SECONDS = histogram(
+    "sak_confidence_duration_seconds",
+    "Confidence scoring time by where the score came from (keyword, remote, fallback, cache).",
+    ["source"],
+    timing="confidence",
+)
+LLM_SECONDS = histogram(
+    "sak_llm_duration_seconds",
+    "LLM round-trip time by purpose (tool_selection, summary, context_summary).",
+    ["call"],
+    timing="llm",
+)
+EXTRACTION_SECONDS = histogram(
+    "sak_extraction_duration_seconds", "Parameter extraction time per call.", timing="extraction"
+)
+TOOL_SECONDS = histogram("sak_tool_duration_seconds", "Tool handler execution time.", ["tool"], timing="tool")
+TOOL_CALLS = counter("sak_tool_calls_total", "Tool handler calls by outcome (ok, error).", ["tool", "outcome"])
+SESSION_STORE_SECONDS = histogram(
+    "sak_session_store_duration_seconds", "Session store operation time (get, save).", ["op"], timing="store"
+)
+
+
+def call_tool_handler(tool: str, handler: Callable[[Dict[str, Any]], Any], parameters: Dict[str, Any]) -> Any:
+    """Run a tool handler, recording its duration and whether it raised."""
+    started = time.perf_counter()
+    try:
+        result = handler(parameters)
+    except Exception:
+        count(TOOL_CALLS, tool=tool, outcome="error")
+        raise
+    finally:
+        observe(TOOL_SECONDS, time.perf_counter() - started, tool=tool)
+    count(TOOL_CALLS, tool=tool, outcome="ok")
+    return result
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _family_header(lines: List[str], name: str, kind: str, help: str) -> None:
+    help = help.replace("\\", "\\\\").replace("\n", "\\n")
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+
+
+def _sample_line(name: str, labels: Dict[str, str], value: float) -> str:
+    if not labels:
+        return f"{name} {_format_value(value)}"
+    rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+    return f"{name}{{{rendered}}} {_format_value(value)}"
@@ -14,6 +14,10 @@ class ChatRequest(BaseModel):
     messages: List[ChatMessage]
     provided_parameters: Optional[Dict[str, Any]] = None
     force_tool: Optional[str] = None
+    stream: bool = False
+    # Leave the `tools` array out of the response, always or when the client already has this version.
+    include_tools: bool = True
+    tools_etag: Optional[str] = None
 
 
 class ToolDecision(BaseModel):
@@ -23,6 +27,8 @@ class ToolDecision(BaseModel):
     missing_parameters: List[str] = Field(default_factory=list)
     collected_parameters: Dict[str, Any] = Field(default_factory=dict)
     action: str = "none"  # none|need_parameters|need_approval|executed|no_tool
+    control_intent: Optional[str] = None  # approve|deny|cancel|provide|none, set while a tool is pending
+    control_confidence: Optional[float] = None
 
 
 class ChatResponse(BaseModel):
@@ -31,4 +37,5 @@ class ChatResponse(BaseModel):
     session_id: str
     choices: List[Dict[str, Any]]
     tool_decision: ToolDecision
-    tools: List[Dict[str, Any]]
+    tools_etag: str
+    tools: Optional[List[Dict[str, Any]]] = None
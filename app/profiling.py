@@ -0,0 +1,238 @@
+"""Per-request diagnostics: Server-Timing breakdowns and sampled cProfile captures.
+
+`RequestDiagnosticsMiddleware` gives every HTTP request a timing collector in a
+context variable. Instrumented stages (`app.metrics.observe`/`timed` on histograms
+that name a timing, plus `add_timing` calls) add their durations to it, and the
+totals go out in a `Server-Timing` header when the response starts:
+
+    Server-Timing: confidence.keyword;dur=0.41, llm.tool_selection;dur=812.3, store.save;dur=0.05, total;dur=815.9
+
+Streamed responses send their headers before the turn runs, so their header only
+carries `total` (time to first byte); the final chunk repeats the full breakdown.
+
+With `SAK_PROFILE_RATE` above zero, that fraction of chat and MCP requests also
+runs under cProfile and the stats are written to `SAK_PROFILE_DIR` as `.prof`
+files (`python -m pstats` or snakeviz read them). cProfile sees the whole
+event-loop thread while the request runs, so concurrent requests show up in the
+same capture; at most one request per process is profiled at a time. Work the
+request hands to worker threads (MCP tool handlers, keyword scoring) is only
+captured when it goes through `run_profiled`, which profiles it in the worker and
+merges the result into the request's file.
+"""
+from __future__ import annotations
+
+import cProfile
+import os
+import pstats
+import random
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+
+_TIMINGS: ContextVar[Optional[Dict[str, float]]] = ContextVar("sak_timings", default=None)
+# Worker-thread captures of the request being profiled; None when it is not.
+_THREAD_PROFILES: ContextVar[Optional[List[cProfile.Profile]]] = ContextVar("sak_thread_profiles", default=None)
+
+_T = TypeVar("_T")
+
+PROFILED_PATHS = ("/v1/chat/completions", "/mcp")
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Add `seconds` to stage `name` of the current request, if one is being timed."""
+    timings = _TIMINGS.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+
+
+def current_timings() -> Dict[str, float]:
+    """Stage durations (seconds) recorded so far for the current request."""
+    return dict(_TIMINGS.get() or {})
+
+
+def server_timing_header(timings: Dict[str, float], total: Optional[float] = None) -> str:
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+
+def run_profiled(func: Callable[..., _T], *args: Any) -> _T:
+    """Call `func(*args)`, profiling it when the calling request is being profiled.
+
+    Meant for the target of `asyncio.to_thread`, which copies the request's
+    context: the request-level capture only hooks the event-loop thread.
+    """
+    captures = _THREAD_PROFILES.get()
+    if captures is None:
+        return func(*args)
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+    except ValueError:  # another profiler owns this thread
+        return func(*args)
+    try:
+        return func(*args)
+    finally:
+        profile.disable()
+        captures.append(profile)
+
+
+class RequestProfiler:
+    """Profiles a random `rate` of requests and writes their stats off the request path.
+
+    Captures shorter than `min_ms` are discarded, and only the newest `max_files`
+    profiles are kept in `directory`.
+    """
+
+    def __init__(self, rate: float, directory: str, min_ms: float = 0.0, max_files: int = 200) -> None:
+        self.rate = max(0.0, min(1.0, rate))
+        self.directory = Path(directory).expanduser()
+        self.min_ms = min_ms
+        self.max_files = max_files
+        self._active = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sak-profile")
+        self._counters = {"sampled": 0, "written": 0, "skipped_busy": 0, "discarded_fast": 0}
+        self._counters_lock = threading.Lock()
+
+    def start(self) -> Optional[cProfile.Profile]:
+        if self.rate <= 0.0 or random.random() >= self.rate:
+            return None
+        # cProfile hooks the whole thread, so overlapping captures would clobber each other.
+        if not self._active.acquire(blocking=False):
+            self._bump("skipped_busy")
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # another profiler owns this thread
+            self._active.release()
+            self._bump("skipped_busy")
+            return None
+        self._bump("sampled")
+        return profile
+
+    def finish(
+        self,
+        profile: cProfile.Profile,
+        label: str,
+        seconds: float,
+        threads: Optional[List[cProfile.Profile]] = None,
+    ) -> None:
+        """Stop the capture and queue it, merged with any worker-thread `threads` captures."""
+        profile.disable()
+        self._active.release()
+        if seconds * 1000 < self.min_ms:
+            self._bump("discarded_fast")
+            return
+        self._writer.submit(self._write, profile, label, seconds, list(threads or ()))
+
+    def stats(self) -> Dict[str, int]:
+        with self._counters_lock:
+            return dict(self._counters)
+
+    def _bump(self, counter: str) -> None:
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def _write(self, profile: cProfile.Profile, label: str, seconds: float, threads: List[cProfile.Profile]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime())
+        name = f"{stamp}-{label}-{seconds * 1000:.0f}ms-{uuid.uuid4().hex[:6]}.prof"
+        stats = pstats.Stats(profile)
+        for capture in threads:
+            capture.create_stats()
+            if capture.stats:
+                stats.add(capture)
+        stats.dump_stats(str(self.directory / name))
+        self._bump("written")
+        if self.max_files > 0:
+            files = sorted(self.directory.glob("*.prof"), key=lambda path: path.stat().st_mtime)
+            for stale in files[: max(0, len(files) - self.max_files)]:
+                stale.unlink(missing_ok=True)
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def profiler_from_env() -> Optional[RequestProfiler]:
+    rate = _env_number("SAK_PROFILE_RATE", 0.0)
+    if rate <= 0:
+        return None
+    return RequestProfiler(
+        rate=rate,
+        directory=os.getenv("SAK_PROFILE_DIR", "").strip() or os.path.join(tempfile.gettempdir(), "sak-profiles"),
+        min_ms=_env_number("SAK_PROFILE_MIN_MS", 0.0),
+        max_files=int(_env_number("SAK_PROFILE_MAX_FILES", 200)),
+    )
+
+
+def server_timing_enabled() -> bool:
+    return os.getenv("SAK_SERVER_TIMING", "true").lower() in {"1", "true", "yes", "on"}
+
+
+_Scope = Dict[str, Any]
+_Message = Dict[str, Any]
+_ASGIApp = Callable[[_Scope, Callable[[], Awaitable[_Message]], Callable[[_Message], Awaitable[None]]], Awaitable[None]]
+
+
+class RequestDiagnosticsMiddleware:
+    """ASGI middleware: per-request timing collector, Server-Timing header, sampled profiling."""
+
+    def __init__(
+        self,
+        app: _ASGIApp,
+        profiler: Optional[RequestProfiler] = None,
+        server_timing: bool = True,
+    ) -> None:
+        self.app = app
+        self.profiler = profiler
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: _Scope, receive: Callable[[], Awaitable[_Message]], send: Callable[[_Message], Awaitable[None]]) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings: Dict[str, float] = {}
+        token = _TIMINGS.set(timings)
+        started = time.perf_counter()
+        profile = None
+        threads: List[cProfile.Profile] = []
+        path = scope.get("path", "")
+        if self.profiler is not None and path.startswith(PROFILED_PATHS):
+            profile = self.profiler.start()
+        threads_token = _THREAD_PROFILES.set(threads if profile is not None else None)
+
+        async def send_with_timing(message: _Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                header = server_timing_header(timings, time.perf_counter() - started)
+                message = {**message, "headers": [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _THREAD_PROFILES.reset(threads_token)
+            _TIMINGS.reset(token)
+            if profile is not None:
+                self.profiler.finish(profile, _profile_label(scope), time.perf_counter() - started, threads)
+
+
+def _profile_label(scope: _Scope) -> str:
+    slug = re.sub(r"[^a-z0-9]+", "-", scope.get("path", "").lower()).strip("-") or "root"
+    return f"{scope.get('method', 'GET').lower()}-{slug}"
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+
+# (body, endpoint_fault): body is None on failure; endpoint_fault says whether it counts against the breaker.
+_Outcome = Tuple[Optional[Dict[str, Any]], bool]
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker: closed -> open -> half-open (one probe) -> closed."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = max(0.0, reset_timeout)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._probing or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Cool-down elapsed: let exactly one request through to probe the endpoint.
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Give up a half-open probe that ended without a verdict (e.g. it was cancelled)."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class RemoteScoringClient:
+    """Keep-alive JSON client for the remote confidence endpoint.
+
+    Sync and async calls share one breaker. Connection errors and 5xx responses are
+    retried; timeouts are not, since a retry would only stretch the tail further. Only
+    failures that say something about the endpoint (connect/read timeouts, transport
+    errors, 5xx, unreadable bodies) count toward the breaker; a saturated local pool
+    or a 4xx rejection of the request leaves it alone. The
+    async path can also hedge: if the first attempt has not answered within
+    `hedge_delay` seconds a second one is started and whichever succeeds first wins.
+    Every method returns None instead of raising so callers can fall back.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        timeout: float,
+        max_connections: int = 10,
+        retries: int = 1,
+        hedge_delay: float = 0.0,
+        breaker: Optional[CircuitBreaker] = None,
+    ) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.hedge_delay = max(0.0, hedge_delay)
+        self.breaker = breaker or CircuitBreaker()
+        self._limits = httpx.Limits(
+            max_connections=max(1, max_connections),
+            max_keepalive_connections=max(1, max_connections),
+        )
+        self._client: Optional[httpx.Client] = None
+        self._async_client_for: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+        self._lock = threading.Lock()
+
+    def post(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.breaker.allow():
+            return None
+        try:
+            body, fault = self._sync_attempts(payload)
+        except Exception:
+            body, fault = None, True
+        except BaseException:
+            self.breaker.release_probe()
+            raise
+        return self._settle(body, fault)
+
+    async def apost(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.breaker.allow():
+            return None
+        # Every exit must settle the breaker, or a half-open probe would keep it open for good.
+        try:
+            if self.hedge_delay:
+                body, fault = await self._hedged(payload)
+            else:
+                body, fault = await self._attempts(payload)
+        except Exception:
+            body, fault = None, True
+        except BaseException:  # cancelled: no verdict on the endpoint
+            self.breaker.release_probe()
+            raise
+        return self._settle(body, fault)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            current, self._async_client_for = self._async_client_for, None
+        if current is not None:
+            _close_on_loop(*current)
+
+    def _sync_attempts(self, payload: Dict[str, Any]) -> _Outcome:
+        client = self._sync_client()
+        body: Optional[Dict[str, Any]] = None
+        fault = False
+        for attempt in range(self.retries + 1):
+            try:
+                body, retryable, fault = _read(client.post(self.endpoint, json=payload))
+            except httpx.PoolTimeout:
+                body, retryable, fault = None, False, False
+            except httpx.TimeoutException:
+                body, retryable, fault = None, False, True
+            except httpx.HTTPError:
+                body, retryable, fault = None, True, True
+            if body is not None or not retryable or attempt == self.retries:
+                break
+            time.sleep(_backoff(attempt))
+        return body, fault
+
+    async def _attempts(self, payload: Dict[str, Any]) -> _Outcome:
+        client = self._async_client()
+        for attempt in range(self.retries + 1):
+            try:
+                body, retryable, fault = _read(await client.post(self.endpoint, json=payload))
+            except httpx.PoolTimeout:
+                body, retryable, fault = None, False, False
+            except httpx.TimeoutException:
+                body, retryable, fault = None, False, True
+            except httpx.HTTPError:
+                body, retryable, fault = None, True, True
+            if body is not None or not retryable or attempt == self.retries:
+                return body, fault
+            await asyncio.sleep(_backoff(attempt))
+        return None, False
+
+    async def _hedged(self, payload: Dict[str, Any]) -> _Outcome:
+        first = asyncio.ensure_future(self._attempts(payload))
+        done, _ = await asyncio.wait({first}, timeout=self.hedge_delay)
+        if done:
+            return first.result()
+
+        pending = {first, asyncio.ensure_future(self._attempts(payload))}
+        fault = False
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    body, task_fault = task.result()
+                    if body is not None:
+                        return body, False
+                    fault = fault or task_fault
+            return None, fault
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _settle(self, body: Optional[Dict[str, Any]], fault: bool) -> Optional[Dict[str, Any]]:
+        if body is not None:
+            self.breaker.record_success()
+        elif fault:
+            self.breaker.record_failure()
+        else:
+            self.breaker.release_probe()  # the endpoint was never judged
+        return body
+
+    def _sync_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(timeout=self.timeout, limits=self._limits)
+        return self._client
+
+    def _async_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        current = self._async_client_for
+        if current is not None and current[0] is loop:
+            return current[1]
+        with self._lock:
+            stale = self._async_client_for
+            if stale is not None and stale[0] is loop:
+                return stale[1]
+            current = (loop, httpx.AsyncClient(timeout=self.timeout, limits=self._limits))
+            self._async_client_for = current
+        if stale is not None:
+            _close_on_loop(*stale)
+        return current[1]
+
+
+def _close_on_loop(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close an async client's pool on the loop that owns it."""
+    if loop.is_closed() or not loop.is_running():
+        return  # nothing can await on that loop any more; the sockets go with the client
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(client.aclose())
+    else:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+def _read(response: httpx.Response) -> Tuple[Optional[Dict[str, Any]], bool, bool]:
+    """Decode a response into (body, retryable, endpoint_fault); body is None on any failure.
+
+    A 4xx rejects this request, not the endpoint, so it is not a fault.
+    """
+    if response.status_code >= 500:
+        return None, True, True
+    if response.status_code >= 400:
+        return None, False, False
+    try:
+        body = response.json()
+    except ValueError:
+        return None, False, True
+    if not isinstance(body, dict):
+        return None, False, True
+    return body, False, False
+
+
+def _backoff(attempt: int) -> float:
+    return min(0.05 * (2 ** attempt), 0.5)
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+if TYPE_CHECKING:
+    from app.store import PendingTool
+
+
+@dataclass
+class SessionDelta:
+    """What changed in a stored session since a cursor.
+
+    `cursor` is opaque and is passed back to `load`/`append`. When `reset` is true,
+    `messages` is the whole history rather than just the new tail.
+    """
+
+    cursor: Any
+    messages: List[Dict[str, str]] = field(default_factory=list)
+    pending_tool: Optional[PendingTool] = None
+    awaiting_approval: bool = False
+    count: int = 0
+    reset: bool = False
+
+
+class SessionBackend:
+    """Durable session storage shared by every worker.
+
+    Messages are append-only: `append` writes the new tail plus the small mutable
+    header (pending tool, approval flag) and never rewrites earlier history.
+    """
+
+    def cursor(self, session_id: str) -> Any:
+        """Cheap current position of a session, or None if it isn't stored."""
+        raise NotImplementedError
+
+    def load(self, session_id: str, since: Any = None) -> Optional[SessionDelta]:
+        raise NotImplementedError
+
+    def append(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        pending_tool: Optional[PendingTool],
+        awaiting_approval: bool,
+        expected: Any,
+    ) -> Any:
+        """Persist a turn and return the new cursor.
+
+        Returns None if another writer got there first (the stored cursor was not
+        `expected`), which forces a full reload on the next read.
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> None:
+        raise NotImplementedError
+
+    def expire(self, idle_ttl: float) -> int:
+        """Remove sessions untouched for `idle_ttl` seconds; returns how many."""
+        raise NotImplementedError
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a SQLite file in WAL mode, safe to share between processes on one host."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions "
+                "(id TEXT PRIMARY KEY, revision INTEGER NOT NULL, count INTEGER NOT NULL, "
+                "header TEXT NOT NULL, updated REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_messages "
+                "(session_id TEXT NOT NULL, seq INTEGER NOT NULL, revision INTEGER NOT NULL, "
+                "body TEXT NOT NULL, PRIMARY KEY (session_id, seq)) WITHOUT ROWID"
+            )
+
+    def cursor(self, session_id: str) -> Any:
+        with self._lock:
+            row = self._conn.execute("SELECT revision FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row[0] if row else None
+
+    def load(self, session_id: str, since: Any = None) -> Optional[SessionDelta]:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                row = self._conn.execute(
+                    "SELECT revision, count, header FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                if row is None:
+                    return None
+                floor = since if since is not None else -1
+                bodies = self._conn.execute(
+                    "SELECT body FROM session_messages WHERE session_id = ? AND revision > ? ORDER BY seq",
+                    (session_id, floor),
+                ).fetchall()
+            finally:
+                self._conn.execute("COMMIT")
+        revision, count, header = row
+        pending_tool, awaiting_approval = decode_header(header)
+        return SessionDelta(
+            cursor=revision,
+            messages=[decode_message(body) for (body,) in bodies],
+            pending_tool=pending_tool,
+            awaiting_approval=awaiting_approval,
+            count=count,
+            reset=since is None,
+        )
+
+    def append(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        pending_tool: Optional[PendingTool],
+        awaiting_approval: bool,
+        expected: Any,
+    ) -> Any:
+        header = encode_header(pending_tool, awaiting_approval)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT revision, count FROM sessions WHERE id = ?", (session_id,)
+                ).fetchone()
+                revision, count = row if row else (0, 0)
+                new_revision = revision + 1
+                self._conn.executemany(
+                    "INSERT INTO session_messages (session_id, seq, revision, body) VALUES (?, ?, ?, ?)",
+                    [
+                        (session_id, count + offset, new_revision, encode_message(message))
+                        for offset, message in enumerate(messages)
+                    ],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sessions (id, revision, count, header, updated) VALUES (?, ?, ?, ?, ?)",
+                    (session_id, new_revision, count + len(messages), header, time.time()),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+        current = revision if row else None
+        return new_revision if current == expected else None
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM session_messages WHERE session_id = ?", (session_id,))
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
+            self._conn.execute("COMMIT")
+
+    def expire(self, idle_ttl: float) -> int:
+        cutoff = time.time() - idle_ttl
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute(
+                "DELETE FROM session_messages WHERE session_id IN (SELECT id FROM sessions WHERE updated < ?)",
+                (cutoff,),
+            )
+            removed = self._conn.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,)).rowcount
+            self._conn.execute("COMMIT")
+        return removed
+
+
+class FileSessionBackend(SessionBackend):
+    """One append-only JSONL log per session; the cursor is the log's byte size.
+
+    Each turn appends its new messages and a header line in a single write, so
+    readers can resume from the byte offset they last saw.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def cursor(self, session_id: str) -> Any:
+        try:
+            return self._path(session_id).stat().st_size
+        except FileNotFoundError:
+            return None
+
+    def load(self, session_id: str, since: Any = None) -> Optional[SessionDelta]:
+        try:
+            with self._path(session_id).open("rb") as handle:
+                size = os.fstat(handle.fileno()).st_size
+                if since is not None and since > size:
+                    # Log was replaced underneath us; read it from the start.
+                    since = None
+                handle.seek(since or 0)
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+
+        # Only consume whole lines so a concurrent append is picked up next time.
+        complete = data.rfind(b"\n") + 1
+        delta = SessionDelta(cursor=(since or 0) + complete, reset=since is None)
+        header = None
+        for line in data[:complete].splitlines():
+            record = json.loads(line)
+            if record[0] == "m":
+                delta.messages.append({"role": record[1], "content": record[2]})
+            else:
+                header = record
+        if header is None and since is not None:
+            # A turn is still being written; report no progress until its header lands.
+            return SessionDelta(cursor=since)
+        if header is not None:
+            delta.count = header[1]
+            delta.pending_tool, delta.awaiting_approval = decode_header(header[2])
+        return delta
+
+    def append(
+        self,
+        session_id: str,
+        messages: List[Dict[str, str]],
+        pending_tool: Optional[PendingTool],
+        awaiting_approval: bool,
+        expected: Any,
+    ) -> Any:
+        path = self._path(session_id)
+        with path.open("ab") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                before = os.fstat(handle.fileno()).st_size
+                count = self._count_at(path, before)
+                lines = [
+                    json.dumps(["m", message.get("role", ""), message.get("content", "")], separators=(",", ":"))
+                    for message in messages
+                ]
+                lines.append(
+                    json.dumps(
+                        ["h", count + len(messages), encode_header(pending_tool, awaiting_approval)],
+                        separators=(",", ":"),
+                    )
+                )
+                handle.write(("\n".join(lines) + "\n").encode("utf-8"))
+                handle.flush()
+                after = handle.tell()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+        current = before if before else None
+        return after if current == expected else None
+
+    def delete(self, session_id: str) -> None:
+        try:
+            self._path(session_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def expire(self, idle_ttl: float) -> int:
+        cutoff = time.time() - idle_ttl
+        removed = 0
+        for path in self.directory.glob("*.jsonl"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _path(self, session_id: str) -> Path:
+        return self.directory / f"{hashlib.sha1(session_id.encode('utf-8')).hexdigest()}.jsonl"
+
+    @staticmethod
+    def _count_at(path: Path, size: int) -> int:
+        """Message count recorded in the last header line before `size`."""
+        if size == 0:
+            return 0
+        with path.open("rb") as handle:
+            handle.seek(max(0, size - 65536))
+            tail = handle.read(size - handle.tell())
+        for line in reversed(tail.splitlines()):
+            if line.startswith(b'["h",'):
+                return json.loads(line)[1]
+        return sum(1 for line in path.read_bytes()[:size].splitlines() if line.startswith(b'["m",'))
+
+
+def encode_message(message: Dict[str, str]) -> str:
+    return json.dumps([message.get("role", ""), message.get("content", "")], separators=(",", ":"))
+
+
+def decode_message(body: str) -> Dict[str, str]:
+    role, content = json.loads(body)
+    return {"role": role, "content": content}
+
+
+def encode_header(pending_tool: Optional[PendingTool], awaiting_approval: bool) -> str:
+    pending = None
+    if pending_tool is not None:
+        pending = [pending_tool.name, pending_tool.parameters, pending_tool.missing, pending_tool.confidence]
+    return json.dumps([pending, int(awaiting_approval)], separators=(",", ":"))
+
+
+def decode_header(header: str) -> Tuple[Optional[PendingTool], bool]:
+    pending, awaiting_approval = json.loads(header)
+    pending_tool = None
+    if pending is not None:
+        name, parameters, missing, confidence = pending
+        from app.store import PendingTool  # app.store builds the default store from this module
+
+        pending_tool = PendingTool(name=name, parameters=parameters, missing=missing, confidence=confidence)
+    return pending_tool, bool(awaiting_approval)
+
+
+def backend_from_env() -> Optional[SessionBackend]:
+    kind = os.getenv("SAK_SESSION_BACKEND", "memory").strip().lower()
+    path = os.getenv("SAK_SESSION_PATH", "").strip()
+    if kind == "sqlite":
+        return SQLiteSessionBackend(path or os.path.join(tempfile.gettempdir(), "sak-sessions.sqlite"))
+    if kind == "file":
+        return FileSessionBackend(path or os.path.join(tempfile.gettempdir(), "sak-sessions"))
+    return None
@@ -2,12 +2,17 @@ from __future__ import annotations
 
 import json
 import os
+import signal
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
 
 DEFAULT_SETTINGS_PATH = "settings.json"
+DEFAULT_CHECK_INTERVAL = 1.0
+DEFAULT_LOCAL_LLM_SEED = 0
 
 
 @dataclass(frozen=True)
@@ -15,6 +20,11 @@ class AppSettings:
     openai_api_key: str | None
     openai_model: str
     system_prompt: str
+    llm_provider: str = "openai"  # openai|local
+    local_llm_script: str | None = None
+    local_llm_latency: str = ""
+    local_llm_token_latency: str = ""
+    local_llm_seed: int | None = DEFAULT_LOCAL_LLM_SEED  # None draws latencies unseeded
 
 
 DEFAULT_SYSTEM_PROMPT = (
@@ -27,28 +37,170 @@ DEFAULT_SYSTEM_PROMPT = (
 
 
 def load_settings() -> AppSettings:
-    data = _read_settings_file()
-    openai_api_key = (
-        os.getenv("OPENAI_API_KEY")
-        or os.getenv("SAK_OPENAI_API_KEY")
-        or data.get("openai_api_key")
-    )
-    openai_model = os.getenv("SAK_OPENAI_MODEL") or data.get("openai_model") or "gpt-4o-mini"
-    system_prompt = os.getenv("SAK_SYSTEM_PROMPT") or data.get("system_prompt") or DEFAULT_SYSTEM_PROMPT
+    """Return the current settings, re-reading the file only when it has changed.
+
+    The file is stat()ed at most once per `SAK_SETTINGS_CHECK_INTERVAL` seconds and only
+    re-parsed when its mtime, inode or size differ from the last read.
+    """
+    return _CACHE.get()
+
+
+def reload_settings() -> AppSettings:
+    """Drop the cached file contents and re-read settings immediately."""
+    _CACHE.invalidate()
+    return _CACHE.get()
+
+
+def settings_version() -> int:
+    """Counter that increases whenever the effective settings change."""
+    _CACHE.get()
+    return _CACHE.version
+
+
+def install_reload_signal() -> bool:
+    """Re-read settings on SIGHUP. Returns False where signals can't be installed.
+
+    Call it from the server's start-up: the handler only flags the cache, since a
+    signal can land on the main thread while `get()` holds its lock.
+    """
+    if not hasattr(signal, "SIGHUP"):
+        return False
+    try:
+        signal.signal(signal.SIGHUP, lambda signum, frame: _CACHE.invalidate())
+    except ValueError:
+        # Not the main thread (e.g. embedded in another server).
+        return False
+    return True
+
+
+class _SettingsCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._path: Optional[str] = None
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        self._data: Dict[str, Any] = {}
+        self._generation = 0
+        self._checked_at = float("-inf")
+        self._key: Optional[Tuple[Any, ...]] = None
+        self._settings: Optional[AppSettings] = None
+        self._reload = False
+        self.version = 0
+
+    def invalidate(self) -> None:
+        # Lock-free so it is safe from a signal handler; the next get() does the work.
+        self._reload = True
+
+    def get(self) -> AppSettings:
+        path = os.getenv("SAK_SETTINGS_PATH", DEFAULT_SETTINGS_PATH)
+        env = (
+            os.getenv("OPENAI_API_KEY"),
+            os.getenv("SAK_OPENAI_API_KEY"),
+            os.getenv("SAK_OPENAI_MODEL"),
+            os.getenv("SAK_SYSTEM_PROMPT"),
+            os.getenv("SAK_LLM_PROVIDER"),
+            os.getenv("SAK_LOCAL_LLM_SCRIPT"),
+            os.getenv("SAK_LOCAL_LLM_LATENCY"),
+            os.getenv("SAK_LOCAL_LLM_TOKEN_LATENCY"),
+            os.getenv("SAK_LOCAL_LLM_SEED"),
+        )
+        now = time.monotonic()
+        settings = self._settings
+        if (
+            settings is not None
+            and path == self._path
+            and now - self._checked_at < _check_interval()
+            and self._key == (self._generation, env)
+            and not self._reload
+        ):
+            return settings
+
+        with self._lock:
+            if self._reload:
+                self._reload = False
+                self._path = None  # forces _refresh_file to re-read even if the stamp matches
+            if path != self._path or now - self._checked_at >= _check_interval():
+                self._refresh_file(path)
+                self._checked_at = now
+            key = (self._generation, env)
+            if self._settings is None or key != self._key:
+                built = _build_settings(self._data, env)
+                if built != self._settings:
+                    self.version += 1
+                self._settings = built
+                self._key = key
+            return self._settings
+
+    def _refresh_file(self, path: str) -> None:
+        file_path = Path(path).expanduser()
+        try:
+            stat = file_path.stat()
+        except OSError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_ino, stat.st_size)
+        if path == self._path and stamp == self._stamp:
+            return
+        self._path = path
+        self._stamp = stamp
+        self._data = _read_settings_file(file_path) if stamp is not None else {}
+        self._generation += 1
+
+
+_CACHE = _SettingsCache()
+
+
+def _build_settings(data: Dict[str, Any], env: Tuple[Optional[str], ...]) -> AppSettings:
+    (
+        env_api_key,
+        env_sak_api_key,
+        env_model,
+        env_prompt,
+        env_provider,
+        env_script,
+        env_latency,
+        env_token_latency,
+        env_seed,
+    ) = env
+    openai_api_key = env_api_key or env_sak_api_key or data.get("openai_api_key")
+    openai_model = env_model or data.get("openai_model") or "gpt-4o-mini"
+    system_prompt = env_prompt or data.get("system_prompt") or DEFAULT_SYSTEM_PROMPT
+    llm_provider = (env_provider or data.get("llm_provider") or "openai").strip().lower()
 
     return AppSettings(
         openai_api_key=openai_api_key,
         openai_model=openai_model,
         system_prompt=system_prompt,
+        llm_provider=llm_provider if llm_provider in {"openai", "local"} else "openai",
+        local_llm_script=env_script or data.get("local_llm_script"),
+        local_llm_latency=env_latency or data.get("local_llm_latency") or "",
+        local_llm_token_latency=env_token_latency or data.get("local_llm_token_latency") or "",
+        local_llm_seed=_seed(env_seed if env_seed else data.get("local_llm_seed")),
     )
 
 
-def _read_settings_file() -> Dict[str, Any]:
-    path = os.getenv("SAK_SETTINGS_PATH", DEFAULT_SETTINGS_PATH)
-    file_path = Path(path).expanduser()
-    if not file_path.exists():
-        return {}
+def _seed(raw: Any) -> Optional[int]:
+    if raw is None or raw == "":
+        return DEFAULT_LOCAL_LLM_SEED
+    if str(raw).strip().lower() in {"none", "random"}:
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_LOCAL_LLM_SEED
+
+
+def _check_interval() -> float:
+    raw = os.getenv("SAK_SETTINGS_CHECK_INTERVAL")
+    if not raw:
+        return DEFAULT_CHECK_INTERVAL
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return DEFAULT_CHECK_INTERVAL
+
+
+def _read_settings_file(file_path: Path) -> Dict[str, Any]:
     try:
         return json.loads(file_path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
+    except (OSError, json.JSONDecodeError):
         return {}
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import os
+import sys
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from app.metrics import SESSION_STORE_SECONDS, observe
+
+if TYPE_CHECKING:
+    from app.session_backend import SessionBackend, SessionDelta
 
 
 @dataclass
@@ -19,18 +29,259 @@ class ConversationState:
     messages: List[Dict[str, str]] = field(default_factory=list)
     pending_tool: Optional[PendingTool] = None
     awaiting_approval: bool = False
+    # Per-session LLM context (app.context.ConversationContext); derived, never persisted.
+    context: Any = field(default=None, repr=False, compare=False)
+    # Messages dropped from the front of `messages` to respect the byte limit; in-memory only.
+    trimmed: int = field(default=0, repr=False, compare=False)
+
+
+@dataclass
+class _Entry:
+    state: ConversationState
+    last_seen: float
+    bytes: int = 0
+    measured: int = 0
+    # Backend bookkeeping: `persisted` is the absolute count already written (trimmed
+    # messages included), `cursor` is the backend position last seen.
+    persisted: int = 0
+    cursor: Any = None
 
 
 class SessionStore:
-    def __init__(self) -> None:
-        self._store: Dict[str, ConversationState] = {}
+    """In-memory sessions with idle expiry, LRU eviction and approximate byte accounting.
+
+    Sessions are kept in least-recently-used order, so expiry and eviction only ever look
+    at the front of the map. `get` expires idle sessions inline; a daemon reaper thread
+    also sweeps every `reap_interval` seconds so an idle process gives memory back.
+    Byte counts are refreshed by `save`, which the caller invokes after each turn; a
+    session over `max_session_bytes` loses its oldest messages.
+
+    With a `backend`, memory is a cache in front of shared storage: `get` pulls in
+    whatever other workers appended since this process last looked, and `save`
+    appends only the messages this process added.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 10000,
+        idle_ttl: float = 3600.0,
+        max_session_bytes: int = 1_048_576,
+        max_total_bytes: int = 0,
+        reap_interval: float = 60.0,
+        backend: Optional["SessionBackend"] = None,
+    ) -> None:
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl = idle_ttl
+        self.max_session_bytes = max_session_bytes
+        self.max_total_bytes = max_total_bytes
+        self.reap_interval = reap_interval
+        self.backend = backend
+        self._store: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._total_bytes = 0
+        self._counters = {
+            "created": 0,
+            "evicted_idle": 0,
+            "evicted_lru": 0,
+            "evicted_bytes": 0,
+            "trimmed_messages": 0,
+        }
+        self._reaper: Optional[threading.Thread] = None
 
     def get(self, session_id: Optional[str] = None) -> ConversationState:
+        started = time.perf_counter()
         if not session_id:
             session_id = str(uuid.uuid4())
-        if session_id not in self._store:
-            self._store[session_id] = ConversationState(session_id=session_id)
-        return self._store[session_id]
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            entry = self._store.get(session_id)
+            if entry is None:
+                entry = _Entry(state=ConversationState(session_id=session_id), last_seen=now)
+                self._store[session_id] = entry
+                self._counters["created"] += 1
+                self._evict_over_capacity(keep=session_id)
+            else:
+                entry.last_seen = now
+                self._store.move_to_end(session_id)
+        if self.backend is not None:
+            self._sync(entry)
+        self._ensure_reaper()
+        observe(SESSION_STORE_SECONDS, time.perf_counter() - started, op="get")
+        return entry.state
+
+    def save(self, state: ConversationState) -> None:
+        """Record a finished turn: refresh the byte count and enforce the byte limits."""
+        started = time.perf_counter()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._store.get(state.session_id)
+            if entry is None or entry.state is not state:
+                # Expired while the turn was running; it is active again.
+                entry = _Entry(state=state, last_seen=now, persisted=state.trimmed)
+                self._store[state.session_id] = entry
+                if self.backend is not None:
+                    stored = self.backend.load(state.session_id)
+                    if stored is not None:
+                        # The trim offset travels with the state, so a history trimmed before
+                        # the eviction still lines up with the stored count.
+                        entry.persisted = max(state.trimmed, min(stored.count, state.trimmed + len(state.messages)))
+                        entry.cursor = stored.cursor
+            entry.last_seen = now
+            self._store.move_to_end(state.session_id)
+        if self.backend is not None:
+            new = state.messages[entry.persisted - state.trimmed:]
+            entry.cursor = self.backend.append(
+                state.session_id, new, state.pending_tool, state.awaiting_approval, expected=entry.cursor
+            )
+            entry.persisted += len(new)
+        with self._lock:
+            self._measure(entry)
+            self._evict_over_capacity(keep=state.session_id)
+        observe(SESSION_STORE_SECONDS, time.perf_counter() - started, op="save")
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            entry = self._store.pop(session_id, None)
+            if entry is not None:
+                self._total_bytes -= entry.bytes
+        if self.backend is not None:
+            self.backend.delete(session_id)
+
+    def reap(self) -> int:
+        """Expire idle sessions now; returns how many were removed from memory."""
+        with self._lock:
+            removed = self._expire(time.monotonic())
+        if self.backend is not None and self.idle_ttl > 0:
+            self.backend.expire(self.idle_ttl)
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"sessions": len(self._store), "bytes": self._total_bytes, **self._counters}
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    def _sync(self, entry: _Entry) -> None:
+        session_id = entry.state.session_id
+        cursor = self.backend.cursor(session_id)
+        if cursor is None or (entry.cursor is not None and cursor == entry.cursor):
+            return
+        delta = self.backend.load(session_id, entry.cursor)
+        if delta is None or (not delta.reset and delta.cursor == entry.cursor):
+            return
+        with self._lock:
+            self._apply(entry, delta)
+
+    def _apply(self, entry: _Entry, delta: "SessionDelta") -> None:
+        state = entry.state
+        if delta.reset:
+            self._total_bytes -= entry.bytes
+            entry.bytes = entry.measured = state.trimmed = 0
+            state.messages[:] = delta.messages
+            entry.persisted = len(delta.messages)
+        else:
+            state.messages.extend(delta.messages)
+            entry.persisted += len(delta.messages)
+        state.pending_tool = delta.pending_tool
+        state.awaiting_approval = delta.awaiting_approval
+        entry.cursor = delta.cursor
+        self._measure(entry)
+
+    def _expire(self, now: float) -> int:
+        if self.idle_ttl <= 0:
+            return 0
+        removed = 0
+        while self._store:
+            session_id, entry = next(iter(self._store.items()))
+            if now - entry.last_seen < self.idle_ttl:
+                break
+            self._drop(session_id, "evicted_idle")
+            removed += 1
+        return removed
+
+    def _evict_over_capacity(self, keep: str) -> None:
+        while len(self._store) > self.max_sessions:
+            self._drop(next(iter(self._store)), "evicted_lru")
+        if self.max_total_bytes > 0:
+            while self._total_bytes > self.max_total_bytes and len(self._store) > 1:
+                oldest = next(iter(self._store))
+                if oldest == keep:
+                    break
+                self._drop(oldest, "evicted_bytes")
+
+    def _drop(self, session_id: str, reason: str) -> None:
+        entry = self._store.pop(session_id)
+        self._total_bytes -= entry.bytes
+        self._counters[reason] += 1
+
+    def _measure(self, entry: _Entry) -> None:
+        messages = entry.state.messages
+        if len(messages) < entry.measured:
+            # History was replaced or trimmed elsewhere; start over.
+            self._total_bytes -= entry.bytes
+            entry.bytes, entry.measured = 0, 0
+        added = sum(_message_bytes(message) for message in messages[entry.measured:])
+        entry.bytes += added
+        entry.measured = len(messages)
+        self._total_bytes += added
+
+        if self.max_session_bytes <= 0 or entry.bytes <= self.max_session_bytes:
+            return
+        trimmed = 0
+        while entry.bytes > self.max_session_bytes and len(messages) > 1:
+            size = _message_bytes(messages[trimmed])
+            entry.bytes -= size
+            self._total_bytes -= size
+            trimmed += 1
+            if trimmed == len(messages) - 1:
+                break
+        del messages[:trimmed]
+        entry.measured = len(messages)
+        entry.state.trimmed += trimmed
+        self._counters["trimmed_messages"] += trimmed
+
+    def _ensure_reaper(self) -> None:
+        if self._reaper is not None or self.reap_interval <= 0 or self.idle_ttl <= 0:
+            return
+        with self._lock:
+            if self._reaper is None:
+                self._reaper = threading.Thread(target=self._reap_forever, name="sak-session-reaper", daemon=True)
+                self._reaper.start()
+
+    def _reap_forever(self) -> None:
+        while True:
+            time.sleep(self.reap_interval)
+            self.reap()
+
+
+def _message_bytes(message: Dict[str, str]) -> int:
+    # Rough CPython footprint: the dict plus its two strings.
+    return sys.getsizeof(message) + sum(sys.getsizeof(value) for value in message.values())
+
+
+def _env_number(name: str, default: float) -> float:
+    raw = os.getenv(name)
+    if not raw:
+        return default
+    try:
+        return float(raw)
+    except ValueError:
+        return default
+
+
+def session_store_from_env() -> SessionStore:
+    from app.session_backend import backend_from_env
+
+    return SessionStore(
+        max_sessions=int(_env_number("SAK_SESSION_MAX", 10000)),
+        idle_ttl=_env_number("SAK_SESSION_TTL", 3600.0),
+        max_session_bytes=int(_env_number("SAK_SESSION_MAX_BYTES", 1_048_576)),
+        max_total_bytes=int(_env_number("SAK_SESSION_MAX_TOTAL_BYTES", 0)),
+        reap_interval=_env_number("SAK_SESSION_REAP_INTERVAL", 60.0),
+        backend=backend_from_env(),
+    )
 
 
-SESSION_STORE = SessionStore()
+SESSION_STORE = session_store_from_env()
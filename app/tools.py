@@ -1,7 +1,14 @@
 from __future__ import annotations
 
+import hashlib
+import json
+import string
+import threading
+from collections.abc import Sequence
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 
 ToolHandler = Callable[[Dict[str, Any]], Dict[str, Any]]
@@ -15,6 +22,20 @@ class ToolDefinition:
     required: List[str]
     keywords: List[str]
     handler: ToolHandler
+    # Rendered locally after execution, e.g. "Status: {data[status]}"; `params` holds the call arguments.
+    response_template: Optional[str] = None
+    # Opt in to an LLM-phrased reply after execution (see SAK_TOOL_SUMMARY).
+    summarize: bool = False
+    # Undoes or replaces something the user already has; free-text replies never fill its parameters.
+    destructive: bool = False
+
+    def render_response(self, parameters: Dict[str, Any], result: Dict[str, Any]) -> str:
+        if self.response_template:
+            try:
+                return _TEMPLATE_FORMATTER.vformat(self.response_template, (), {**result, "params": parameters})
+            except (KeyError, IndexError, AttributeError, TypeError, ValueError):
+                pass
+        return f"Tool `{self.name}` executed successfully."
 
     def openai_schema(self) -> Dict[str, Any]:
         return {
@@ -27,17 +48,148 @@ class ToolDefinition:
         }
 
 
+class _TemplateFormatter(string.Formatter):
+    """str.format that prints lists as comma-separated text and booleans as yes/no."""
+
+    def format_field(self, value: Any, format_spec: str) -> str:
+        if isinstance(value, bool):
+            value = "yes" if value else "no"
+        elif isinstance(value, (list, tuple)):
+            value = ", ".join(str(item) for item in value)
+        return super().format_field(value, format_spec)
+
+
+_TEMPLATE_FORMATTER = _TemplateFormatter()
+
 
 def _ok(payload: Dict[str, Any]) -> Dict[str, Any]:
     return {"status": "ok", "data": payload}
 
 
-TOOLS: List[ToolDefinition] = []
+def build_keyword_index(tools: Sequence[ToolDefinition]) -> Dict[str, Tuple[int, ...]]:
+    """Keyword -> positions of the tools listing it, once per occurrence, in first-seen keyword order."""
+    index: Dict[str, List[int]] = {}
+    for position, tool in enumerate(tools):
+        for keyword in tool.keywords:
+            index.setdefault(keyword, []).append(position)
+    return {keyword: tuple(positions) for keyword, positions in index.items()}
+
+
+class ToolSnapshot(tuple):
+    """Immutable, versioned view of the registered tools.
+
+    A snapshot is a plain tuple of `ToolDefinition`s, so it can be passed anywhere a
+    tool sequence is expected, plus an O(1) name lookup, a keyword -> tool-positions
+    inverted index and a lazily computed fingerprint. `derive` memoizes per-snapshot
+    artifacts (compiled matchers, serialized schemas, bound LLM tools) so they are
+    built once per registry version and dropped along with the snapshot.
+    """
+
+    version: int
+
+    def __new__(cls, tools: Sequence[ToolDefinition] = (), version: int = 0) -> "ToolSnapshot":
+        snapshot = super().__new__(cls, tools)
+        snapshot.version = version
+        snapshot.by_name = MappingProxyType({tool.name: tool for tool in snapshot})
+        snapshot.keyword_tools = MappingProxyType(build_keyword_index(snapshot))
+        snapshot._derived = {}
+        snapshot._lock = threading.Lock()
+        return snapshot
+
+    def get(self, name: str) -> ToolDefinition | None:
+        return self.by_name.get(name)
+
+    def tools_for_keyword(self, keyword: str) -> Tuple[ToolDefinition, ...]:
+        return tuple(self[position] for position in dict.fromkeys(self.keyword_tools.get(keyword, ())))
+
+    @cached_property
+    def fingerprint(self) -> str:
+        return _fingerprint(self)
+
+    def derive(self, key: str, factory: Callable[["ToolSnapshot"], Any]) -> Any:
+        """Return `factory(self)`, computed once per snapshot and cached under `key`."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self)
+            return self._derived[key]
+
+
+class ToolRegistry:
+    """Tool catalog published as immutable snapshots.
+
+    Registration builds a new `ToolSnapshot` and swaps it in with a single reference
+    assignment, so readers never see a half-updated catalog and never need a lock.
+    Registering a name that already exists replaces that tool in place.
+    """
+
+    def __init__(self, tools: Sequence[ToolDefinition] = ()) -> None:
+        self._lock = threading.Lock()
+        self._snapshot = ToolSnapshot(tuple(tools), 0)
+
+    def snapshot(self) -> ToolSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, name: str) -> ToolDefinition | None:
+        return self._snapshot.by_name.get(name)
+
+    def register(self, tool: ToolDefinition) -> ToolDefinition:
+        self.register_many([tool])
+        return tool
+
+    def register_many(self, tools: Sequence[ToolDefinition]) -> ToolSnapshot:
+        """Add or replace several tools as one new version (cheaper than one swap per tool)."""
+        with self._lock:
+            current = self._snapshot
+            merged = {tool.name: tool for tool in current}
+            for tool in tools:
+                merged[tool.name] = tool
+            self._snapshot = ToolSnapshot(tuple(merged.values()), current.version + 1)
+            return self._snapshot
+
+
+class _ToolsView(Sequence):
+    """Read-only list-like view of the registry's current snapshot (the legacy `TOOLS`)."""
+
+    def __init__(self, registry: ToolRegistry) -> None:
+        self._registry = registry
+
+    def __getitem__(self, index):
+        return self._registry.snapshot()[index]
+
+    def __len__(self) -> int:
+        return len(self._registry.snapshot())
+
+    def __iter__(self) -> Iterator[ToolDefinition]:
+        return iter(self._registry.snapshot())
+
+    def __repr__(self) -> str:
+        return f"TOOLS({list(self._registry.snapshot())!r})"
+
+
+REGISTRY = ToolRegistry()
+# Prefer `current_tools()` in new code: a snapshot keeps its derived caches, the view does not.
+TOOLS: Sequence[ToolDefinition] = _ToolsView(REGISTRY)
 
 
 def register(tool: ToolDefinition) -> ToolDefinition:
-    TOOLS.append(tool)
-    return tool
+    return REGISTRY.register(tool)
+
+
+def current_tools() -> ToolSnapshot:
+    return REGISTRY.snapshot()
+
+
+def tools_version() -> int:
+    """Registry version, bumped by every registration; caches derived from the tools key on it."""
+    return REGISTRY.version
 
 
 register(
@@ -57,6 +209,7 @@ register(
         required=["query"],
         keywords=["service", "catalog", "find service", "visit type"],
         handler=lambda params: _ok({"results": ["Primary Care Visit", "Dermatology", "Therapy"]}),
+        response_template="Services matching your search: {data[results]}.",
     )
 )
 
@@ -79,6 +232,7 @@ register(
         required=["specialty"],
         keywords=["provider", "doctor", "clinician", "specialist"],
         handler=lambda params: _ok({"providers": ["Dr. Patel", "Dr. Nguyen", "Dr. Chen"]}),
+        response_template="I found these providers: {data[providers]}.",
     )
 )
 
@@ -101,6 +255,7 @@ register(
         required=["provider_id", "service_id"],
         keywords=["availability", "openings", "slots", "schedule"],
         handler=lambda params: _ok({"slots": ["2026-02-12T10:00:00", "2026-02-12T14:30:00"]}),
+        response_template="Available times: {data[slots]}.",
     )
 )
 
@@ -124,6 +279,7 @@ register(
         required=["patient_id", "provider_id", "service_id", "start_time", "location_id"],
         keywords=["book", "schedule appointment", "set up appointment"],
         handler=lambda params: _ok({"appointment_id": "apt_123", "status": "confirmed"}),
+        response_template="Your appointment is {data[status]} (ID {data[appointment_id]}).",
     )
 )
 
@@ -143,6 +299,8 @@ register(
         required=["appointment_id", "new_start_time"],
         keywords=["reschedule", "move appointment", "change appointment"],
         handler=lambda params: _ok({"appointment_id": params.get("appointment_id"), "status": "rescheduled"}),
+        response_template="Appointment {data[appointment_id]} has been {data[status]}.",
+        destructive=True,
     )
 )
 
@@ -162,6 +320,8 @@ register(
         required=["appointment_id"],
         keywords=["cancel appointment", "cancel visit", "cancel"],
         handler=lambda params: _ok({"appointment_id": params.get("appointment_id"), "status": "cancelled"}),
+        response_template="Appointment {data[appointment_id]} has been {data[status]}.",
+        destructive=True,
     )
 )
 
@@ -185,6 +345,7 @@ register(
         required=["primary_patient_id", "dependent_first_name", "dependent_last_name", "dob", "relationship"],
         keywords=["add dependent", "add child", "add spouse"],
         handler=lambda params: _ok({"dependent_id": "dep_456", "status": "added"}),
+        response_template="Your dependent has been {data[status]} (ID {data[dependent_id]}).",
     )
 )
 
@@ -205,6 +366,7 @@ register(
         required=["patient_id", "insurance_id"],
         keywords=["insurance", "coverage", "eligibility", "verify"],
         handler=lambda params: _ok({"eligible": True, "copay": "$25"}),
+        response_template="Insurance check complete. Eligible: {data[eligible]}. Copay: {data[copay]}.",
     )
 )
 
@@ -228,6 +390,8 @@ register(
         required=["patient_id", "symptoms", "duration"],
         keywords=["symptom", "triage", "not feeling well", "sick"],
         handler=lambda params: _ok({"recommendation": "Primary care visit within 48 hours"}),
+        response_template="Recommendation: {data[recommendation]}.",
+        summarize=True,
     )
 )
 
@@ -249,6 +413,7 @@ register(
         required=["patient_id", "service_id", "insurance_id", "location_id"],
         keywords=["estimate", "cost", "billing", "price"],
         handler=lambda params: _ok({"estimate": "$120", "breakdown": {"copay": "$25", "coinsurance": "$95"}}),
+        response_template="Estimated cost: {data[estimate]} (copay {data[breakdown][copay]}, coinsurance {data[breakdown][coinsurance]}).",
     )
 )
 
@@ -271,6 +436,7 @@ register(
         required=["patient_id", "medication_name"],
         keywords=["refill", "prescription", "medication"],
         handler=lambda params: _ok({"refill_status": "submitted"}),
+        response_template="Your refill request for {params[medication_name]} has been {data[refill_status]}.",
     )
 )
 
@@ -291,6 +457,7 @@ register(
         required=["patient_id"],
         keywords=["lab results", "labs", "test results"],
         handler=lambda params: _ok({"results": [{"test": "A1C", "value": "6.1%", "date": "2026-01-10"}]}),
+        response_template="Latest result: {data[results][0][test]} {data[results][0][value]} ({data[results][0][date]}).",
     )
 )
 
@@ -312,6 +479,7 @@ register(
         required=["patient_id", "referral_id"],
         keywords=["referral", "authorization", "prior auth"],
         handler=lambda params: _ok({"authorization_status": "pending"}),
+        response_template="Referral authorization status: {data[authorization_status]}.",
     )
 )
 
@@ -332,16 +500,52 @@ register(
         required=["patient_id", "summary"],
         keywords=["human", "representative", "agent", "help"],
         handler=lambda params: _ok({"handoff_id": "handoff_789", "status": "queued"}),
+        response_template="A human agent will pick this up shortly (reference {data[handoff_id]}).",
     )
 )
 
 
 def get_tool(name: str) -> ToolDefinition | None:
-    for tool in TOOLS:
-        if tool.name == name:
-            return tool
-    return None
+    return REGISTRY.get(name)
+
+
+_FINGERPRINTS: Dict[Tuple[int, ...], Tuple[Tuple[ToolDefinition, ...], str]] = {}
+
+
+def tool_set_fingerprint(tools: Sequence[ToolDefinition]) -> str:
+    """Stable digest of the routing-relevant fields of a tool set, equal across processes."""
+    if isinstance(tools, ToolSnapshot):
+        return tools.fingerprint
+    key = tuple(map(id, tools))
+    cached = _FINGERPRINTS.get(key)
+    if cached is not None:
+        return cached[1]
+    fingerprint = _fingerprint(tools)
+    if len(_FINGERPRINTS) >= 8:
+        _FINGERPRINTS.clear()
+    # Keep the tools alive alongside their ids so the key can't be reused by new objects.
+    _FINGERPRINTS[key] = (tuple(tools), fingerprint)
+    return fingerprint
+
+
+def _fingerprint(tools: Sequence[ToolDefinition]) -> str:
+    material = json.dumps(
+        [[tool.name, tool.description, list(tool.keywords)] for tool in tools],
+        separators=(",", ":"),
+    )
+    return hashlib.sha1(material.encode("utf-8")).hexdigest()
 
 
 def openai_tools_schema() -> List[Dict[str, Any]]:
-    return [tool.openai_schema() for tool in TOOLS]
+    return [tool.openai_schema() for tool in current_tools()]
+
+
+def tools_schema_payload() -> Tuple[bytes, str]:
+    """`openai_tools_schema()` serialized once per tool-set version, with an ETag for it."""
+    return current_tools().derive("schema_payload", _schema_payload)
+
+
+def _schema_payload(tools: ToolSnapshot) -> Tuple[bytes, str]:
+    schema = [tool.openai_schema() for tool in tools]
+    body = json.dumps(schema, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return body, f'"{hashlib.sha1(body).hexdigest()[:16]}"'
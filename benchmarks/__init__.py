@@ -0,0 +1 @@
+"""Offline micro-benchmarks for swiss-army-knife hot paths."""
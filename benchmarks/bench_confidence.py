@@ -0,0 +1,106 @@
+"""KeywordConfidenceModel latency against tool-catalog size.
+
+Compares the compiled keyword index (per message and via `score_batch`) with the
+original per-keyword substring scan, kept here as `legacy_score`, on synthetic
+catalogs, and checks they agree.
+Run with `python -m benchmarks.bench_confidence`.
+"""
+from __future__ import annotations
+
+import math
+import random
+import timeit
+from typing import Dict, List
+
+from app.confidence import ConfidenceResult, KeywordConfidenceModel
+from app.tools import TOOLS, ToolDefinition
+
+CATALOG_SIZES = (14, 100, 500, 2000)
+KEYWORDS_PER_TOOL = 8
+
+
+def legacy_score(message: str, tools: List[ToolDefinition], temperature: float = 1.0) -> ConfidenceResult:
+    text = message.lower()
+    raw_scores: Dict[str, float] = {}
+    for tool in tools:
+        matches = sum(1 for kw in tool.keywords if kw in text)
+        raw_scores[tool.name] = matches / max(1, len(tool.keywords)) if matches else 0.0
+    if all(score == 0.0 for score in raw_scores.values()):
+        return ConfidenceResult(tool_name=None, confidence=0.0, scores=raw_scores)
+    max_score = max(raw_scores.values())
+    exp_values = {k: math.exp((v - max_score) / temperature) for k, v in raw_scores.items()}
+    total = sum(exp_values.values())
+    scores = {k: v / total for k, v in exp_values.items()}
+    tool_name = max(scores, key=scores.get)
+    return ConfidenceResult(tool_name=tool_name, confidence=scores[tool_name], scores=scores)
+
+
+def synthetic_catalog(size: int, rng: random.Random) -> List[ToolDefinition]:
+    vocabulary = [f"term{i}" for i in range(size * 2)]
+    tools = list(TOOLS[:size])
+    for i in range(len(tools), size):
+        words = rng.sample(vocabulary, KEYWORDS_PER_TOOL)
+        keywords = words[:4] + [f"{a} {b}" for a, b in zip(words[4::2], words[5::2])]
+        tools.append(
+            ToolDefinition(
+                name=f"synthetic_{i}",
+                description="Synthetic tool.",
+                parameters={"type": "object", "properties": {}, "required": []},
+                required=[],
+                keywords=keywords,
+                handler=lambda params: {},
+            )
+        )
+    return tools
+
+
+def synthetic_messages(tools: List[ToolDefinition], rng: random.Random, count: int = 50) -> List[str]:
+    keywords = [kw for tool in tools for kw in tool.keywords]
+    filler = "please could you help me with this thing today".split()
+    return [
+        " ".join(rng.sample(keywords, 3) + rng.sample(filler, 6)).title()
+        for _ in range(count)
+    ]
+
+
+def check_agreement(model: KeywordConfidenceModel, messages: List[str], tools: List[ToolDefinition]) -> None:
+    batch = model.score_batch(messages, tools)
+    for message, batched in zip(messages, batch):
+        old = legacy_score(message, tools, model.temperature)
+        for new in (model.score(message, tools), batched):
+            assert new.tool_name == old.tool_name, (message, new.tool_name, old.tool_name)
+            assert all(abs(new.scores[k] - v) < 1e-12 for k, v in old.scores.items()), message
+
+
+def main(number: int = 20) -> None:
+    rng = random.Random(7)
+    model = KeywordConfidenceModel()
+    print(f"{'tools':>6} {'legacy us/msg':>14} {'indexed us/msg':>15} {'batch us/msg':>13} {'speedup':>8}")
+    for size in CATALOG_SIZES:
+        tools = synthetic_catalog(size, rng)
+        messages = synthetic_messages(tools, rng)
+        check_agreement(model, messages, tools)
+
+        def run_legacy() -> None:
+            for message in messages:
+                legacy_score(message, tools)
+
+        def run_indexed() -> None:
+            for message in messages:
+                model.score(message, tools)
+
+        def run_batch() -> None:
+            model.score_batch(messages, tools)
+
+        legacy, indexed, batch = (
+            min(timeit.repeat(func, number=number, repeat=3)) / (number * len(messages))
+            for func in (run_legacy, run_indexed, run_batch)
+        )
+        print(
+            f"{size:>6} {legacy * 1e6:>14.1f} {indexed * 1e6:>15.1f} {batch * 1e6:>13.1f}"
+            f" {legacy / batch:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Per-turn LLM setup cost: fresh client + tool binding vs the process-wide cache.
+
+Run with `python -m benchmarks.bench_llm_cache`. No network access is needed; the
+client is constructed but never called.
+"""
+from __future__ import annotations
+
+import os
+import timeit
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+
+from app.llm import _build_llm, build_langchain_tools, clear_llm_cache, get_llm, get_llm_with_tools
+from app.settings import load_settings
+from app.tools import TOOLS
+
+
+def uncached_turn() -> None:
+    # What every turn paid before: a new client, 14 pydantic models and a fresh binding,
+    # plus a second client for the summary call.
+    llm = _build_llm(load_settings())
+    llm.bind_tools(build_langchain_tools(TOOLS))
+    _build_llm(load_settings())
+
+
+def cached_turn() -> None:
+    get_llm_with_tools()
+    get_llm()
+
+
+def main(number: int = 20) -> None:
+    clear_llm_cache()
+    cached_turn()
+    for label, func in (("uncached", uncached_turn), ("cached", cached_turn)):
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print(f"{label:>9}: {seconds * 1e6:10.1f} us/turn")
+
+
+if __name__ == "__main__":
+    main()
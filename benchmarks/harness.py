@@ -0,0 +1,130 @@
+"""Shared runner for the benchmark suite: timing, allocation tracking and baselines.
+
+Each case is a zero-argument callable. `measure` times individual calls to get
+throughput and p50/p99 latency, then replays a few calls under tracemalloc to
+report allocated bytes and blocks per call. Only allocations made beneath
+`measure` are counted, so the log writer and session reaper threads running in
+the background don't leak into a case's numbers. Results are plain dicts so they can be
+written to and compared against the JSON baselines in `benchmarks/baselines/`.
+"""
+from __future__ import annotations
+
+import gc
+import json
+import platform
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+
+# Frames kept per allocation; deep enough that `measure` stays on every stack it owns.
+_TRACE_FRAMES = 128
+_CALLER_ONLY = [tracemalloc.Filter(True, __file__, all_frames=True)]
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def measure(
+    name: str,
+    func: Callable[[], Any],
+    iterations: int = 1000,
+    warmup: int = 20,
+    alloc_iterations: int = 50,
+    min_seconds: float = 0.0,
+) -> Dict[str, Any]:
+    """Time `func` call by call and sample its allocations."""
+    for _ in range(warmup):
+        func()
+
+    gc.collect()
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    samples: List[float] = []
+    clock = time.perf_counter
+    started = clock()
+    try:
+        while len(samples) < iterations or clock() - started < min_seconds:
+            t0 = clock()
+            func()
+            samples.append(clock() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    elapsed = clock() - started
+
+    tracemalloc.start(_TRACE_FRAMES)
+    try:
+        before = tracemalloc.take_snapshot()
+        for _ in range(alloc_iterations):
+            func()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    stats = after.filter_traces(_CALLER_ONLY).compare_to(before.filter_traces(_CALLER_ONLY), "filename")
+    alloc_bytes = sum(max(0, stat.size_diff) for stat in stats)
+    alloc_blocks = sum(max(0, stat.count_diff) for stat in stats)
+
+    samples.sort()
+    return {
+        "name": name,
+        "iterations": len(samples),
+        "ops_per_sec": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_us": round(percentile(samples, 0.50) * 1e6, 2),
+        "p99_us": round(percentile(samples, 0.99) * 1e6, 2),
+        "alloc_bytes_per_op": round(alloc_bytes / max(1, alloc_iterations), 1),
+        "alloc_blocks_per_op": round(alloc_blocks / max(1, alloc_iterations), 1),
+    }
+
+
+def print_results(results: List[Dict[str, Any]]) -> None:
+    print(f"{'case':<44} {'ops/s':>11} {'p50 us':>10} {'p99 us':>10} {'B/op':>10} {'blk/op':>8}")
+    for result in results:
+        print(
+            f"{result['name']:<44} {result['ops_per_sec']:>11,.1f} {result['p50_us']:>10.1f}"
+            f" {result['p99_us']:>10.1f} {result['alloc_bytes_per_op']:>10.0f} {result['alloc_blocks_per_op']:>8.1f}"
+        )
+
+
+def save_baseline(suite: str, results: List[Dict[str, Any]], directory: Path = BASELINE_DIR) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / f"{suite}.json"
+    payload = {
+        "suite": suite,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {result["name"]: result for result in results},
+    }
+    path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    return path
+
+
+def load_baseline(suite: str, directory: Path = BASELINE_DIR) -> Optional[Dict[str, Dict[str, Any]]]:
+    path = directory / f"{suite}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8")).get("results", {})
+
+
+def compare(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.25,
+) -> List[str]:
+    """Regressions beyond `tolerance` (0.25 = 25% slower or larger) against the baseline."""
+    regressions: List[str] = []
+    for result in results:
+        previous = baseline.get(result["name"])
+        if not previous:
+            continue
+        for key in ("p50_us", "p99_us", "alloc_bytes_per_op"):
+            old, new = previous.get(key, 0.0), result.get(key, 0.0)
+            if old > 0 and new > old * (1 + tolerance):
+                regressions.append(f"{result['name']}: {key} {old:.1f} -> {new:.1f} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
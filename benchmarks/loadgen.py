@@ -0,0 +1,282 @@
+"""Replay JSONL conversation traces against the chat API and the MCP endpoint.
+
+Each trace line is one conversation:
+
+    {"id": "refill", "turns": [{"message": "refill my prescription"}, {"message": "yes"}]}
+    {"id": "mcp", "mcp": [{"tool": "tool-prescription_refill", "arguments": {...}}]}
+
+Turns may also set `provided_parameters`, `force_tool`, `include_tools` and `stream`.
+Every replay of a conversation gets a fresh `session_id`, and its turns are sent in
+order, so pending-parameter and approval state build up as in real traffic.
+
+Load is either closed-loop (`--concurrency N` workers replay conversations back to
+back) or open-loop (`--rate R` conversations started per second with Poisson
+arrivals, capped by `--max-in-flight`). The target is the app in-process over ASGI
+(default) or a running server (`--url http://127.0.0.1:8000`). Latencies are grouped
+by `chat:<action>` (from `tool_decision.action`) and `mcp:<tool>`.
+
+    python -m benchmarks.loadgen --duration 20 --concurrency 16
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --rate 50 --duration 60
+    python -m benchmarks.loadgen --sweep 1,2,4,8,16,32 --duration 10   # find saturation
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from benchmarks.harness import percentile
+
+DEFAULT_TRACE = Path(__file__).resolve().parent / "traces" / "sample.jsonl"
+MCP_HEADERS = {"accept": "application/json, text/event-stream"}
+
+
+@dataclass
+class Stats:
+    latencies: Dict[str, List[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    conversations: int = 0
+
+    def record(self, label: str, seconds: float) -> None:
+        self.latencies[label].append(seconds)
+
+    def fail(self, label: str) -> None:
+        self.errors[label] += 1
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        rows = {}
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            samples = sorted(self.latencies.get(label, []))
+            errors = self.errors.get(label, 0)
+            total = len(samples) + errors
+            rows[label] = {
+                "count": len(samples),
+                "errors": errors,
+                "error_rate": round(errors / total, 4) if total else 0.0,
+                "p50_ms": round(percentile(samples, 0.50) * 1e3, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1e3, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1e3, 2),
+            }
+        requests = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        every = sorted(s for v in self.latencies.values() for s in v)
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "conversations": self.conversations,
+            "requests": requests + errors,
+            "throughput_rps": round(requests / elapsed, 1) if elapsed else 0.0,
+            "error_rate": round(errors / (requests + errors), 4) if requests + errors else 0.0,
+            "p50_ms": round(percentile(every, 0.50) * 1e3, 2),
+            "p95_ms": round(percentile(every, 0.95) * 1e3, 2),
+            "p99_ms": round(percentile(every, 0.99) * 1e3, 2),
+            "by_action": rows,
+        }
+
+
+def load_traces(path: Path) -> List[Dict[str, Any]]:
+    traces = []
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                traces.append(json.loads(line))
+    if not traces:
+        raise SystemExit(f"no conversations in {path}")
+    return traces
+
+
+async def replay(client: httpx.AsyncClient, trace: Dict[str, Any], stats: Stats) -> None:
+    session_id = f"{trace.get('id', 'conv')}-{uuid.uuid4().hex[:12]}"
+    for turn in trace.get("turns", []):
+        body: Dict[str, Any] = {"session_id": session_id, "messages": [{"role": "user", "content": turn["message"]}]}
+        for key in ("provided_parameters", "force_tool", "include_tools", "stream"):
+            if key in turn:
+                body[key] = turn[key]
+        started = time.perf_counter()
+        try:
+            if body.get("stream"):
+                action = await _send_stream(client, body)
+            else:
+                response = await client.post("/v1/chat/completions", json=body)
+                response.raise_for_status()
+                action = response.json().get("tool_decision", {}).get("action", "none")
+        except (httpx.HTTPError, ValueError):
+            stats.fail("chat:error")
+            return  # later turns depend on this one
+        stats.record(f"chat:{action}", time.perf_counter() - started)
+
+    for call in trace.get("mcp", []):
+        body = {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {"name": call["tool"], "arguments": call.get("arguments", {})},
+        }
+        label = f"mcp:{call['tool']}"
+        started = time.perf_counter()
+        try:
+            response = await client.post("/mcp/", json=body, headers=MCP_HEADERS)
+            response.raise_for_status()
+            if "error" in response.json():
+                raise ValueError("JSON-RPC error")
+        except (httpx.HTTPError, ValueError):
+            stats.fail(label)
+            continue
+        stats.record(label, time.perf_counter() - started)
+    stats.conversations += 1
+
+
+async def _send_stream(client: httpx.AsyncClient, body: Dict[str, Any]) -> str:
+    action = "none"
+    async with client.stream("POST", "/v1/chat/completions", json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.startswith("data: {") and '"tool_decision"' in line:
+                action = json.loads(line[6:]).get("tool_decision", {}).get("action", action)
+    return f"{action}(stream)"
+
+
+async def run_closed(client: httpx.AsyncClient, traces: List[Dict[str, Any]], args: argparse.Namespace, concurrency: int) -> Stats:
+    stats = Stats()
+    deadline = time.perf_counter() + args.duration
+    rng = random.Random(args.seed)
+    remaining = [args.conversations] if args.conversations else None
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            if remaining is not None:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            await replay(client, rng.choice(traces), stats)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return stats
+
+
+async def run_open(client: httpx.AsyncClient, traces: List[Dict[str, Any]], args: argparse.Namespace) -> Stats:
+    stats = Stats()
+    rng = random.Random(args.seed)
+    slots = asyncio.Semaphore(args.max_in_flight)
+    tasks = set()
+    deadline = time.perf_counter() + args.duration
+    started = 0
+    while time.perf_counter() < deadline and (not args.conversations or started < args.conversations):
+        await asyncio.sleep(rng.expovariate(args.rate))
+        if slots.locked():
+            # The server can't keep up; count the arrival we had to shed.
+            stats.fail("client:shed")
+            continue
+        await slots.acquire()
+        started += 1
+        task = asyncio.create_task(replay(client, rng.choice(traces), stats))
+        task.add_done_callback(lambda t: (slots.release(), tasks.discard(t)))
+        tasks.add(task)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return stats
+
+
+@asynccontextmanager
+async def open_client(args: argparse.Namespace, pool: int) -> AsyncIterator[httpx.AsyncClient]:
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        limits = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+        async with httpx.AsyncClient(base_url=args.url.rstrip("/"), timeout=timeout, limits=limits) as client:
+            yield client
+        return
+
+    os.environ.setdefault("SAK_LOG_PATH", os.path.join(tempfile.gettempdir(), "sak-bench", "agent.log"))
+    from app.api import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=timeout) as client:
+            yield client
+
+
+async def run_levels(
+    traces: List[Dict[str, Any]],
+    args: argparse.Namespace,
+    levels: List[Optional[int]],
+) -> List[Dict[str, Any]]:
+    """One run per level (None = open loop), sharing one client and one app lifespan."""
+    pool = max([level or args.max_in_flight for level in levels])
+    reports = []
+    async with open_client(args, pool) as client:
+        for level in levels:
+            started = time.perf_counter()
+            if level is None:
+                stats = await run_open(client, traces, args)
+            else:
+                stats = await run_closed(client, traces, args, level)
+            report = stats.report(time.perf_counter() - started)
+            report["mode"] = f"rate={args.rate}/s" if level is None else f"concurrency={level}"
+            print_report(report)
+            reports.append(report)
+    return reports
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"\n{report['mode']}: {report['requests']} requests, {report['conversations']} conversations in"
+        f" {report['elapsed_s']}s -> {report['throughput_rps']} req/s, errors {report['error_rate']:.2%},"
+        f" p50 {report['p50_ms']}ms p95 {report['p95_ms']}ms p99 {report['p99_ms']}ms"
+    )
+    print(f"{'action':<40} {'count':>7} {'err%':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, row in report["by_action"].items():
+        print(
+            f"{label:<40} {row['count']:>7} {row['error_rate'] * 100:>6.1f}% {row['p50_ms']:>9.1f}"
+            f" {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", type=Path, default=DEFAULT_TRACE, help="JSONL conversations to replay")
+    parser.add_argument("--url", help="base URL of a running server; default is in-process ASGI")
+    parser.add_argument("--concurrency", type=int, default=8, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, help="open-loop conversations per second (overrides --concurrency)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="open-loop cap on active conversations")
+    parser.add_argument("--sweep", help="comma-separated concurrency levels to run in turn, e.g. 1,4,16,64")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per run")
+    parser.add_argument("--conversations", type=int, default=0, help="stop after this many conversations")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", type=Path, help="also write the report(s) here")
+    args = parser.parse_args(argv)
+
+    traces = load_traces(args.trace)
+    if args.sweep:
+        levels: List[Optional[int]] = [int(level) for level in args.sweep.split(",") if level.strip()]
+    elif args.rate:
+        levels = [None]
+    else:
+        levels = [args.concurrency]
+
+    reports = asyncio.run(run_levels(traces, args, levels))
+
+    if len(reports) > 1:
+        print(f"\n{'run':<20} {'req/s':>9} {'p99 ms':>9} {'err%':>7}")
+        for report in reports:
+            print(f"{report['mode']:<20} {report['throughput_rps']:>9.1f} {report['p99_ms']:>9.1f} {report['error_rate'] * 100:>6.1f}%")
+    if args.json:
+        args.json.write_text(json.dumps(reports if len(reports) > 1 else reports[0], indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+"""Deterministic stand-in for the chat model so the LLM routing paths run offline.
+
+Uses `app.local_llm.LocalChatModel` with no latency: tool-selection turns get a tool
+call for the best keyword match, summary turns a fixed sentence, anything else a
+canned reply. `install` patches the module-level `get_llm`/`get_llm_with_tools`
+lookups that the agent and context window use, so no settings change is needed.
+"""
+from __future__ import annotations
+
+from app.llm import get_langchain_tools
+from app.local_llm import Latency, LocalChatModel
+
+
+def install(latency: str = "") -> LocalChatModel:
+    import app.agent
+    import app.context
+
+    model = LocalChatModel(latency=Latency.parse(latency), seed=0)
+    bound = model.bind_tools(get_langchain_tools())
+    app.agent.get_llm = lambda: model
+    app.agent.get_llm_with_tools = lambda: bound
+    app.context.get_llm = lambda: model
+    return model
@@ -0,0 +1,268 @@
+"""Offline benchmark suite for the selector, extractor, agent, session store and API.
+
+Every LLM call goes to the deterministic stub in `benchmarks.stub_llm` and the HTTP
+cases run in-process through httpx's ASGI transport, so no key or network is
+needed. Each case reports throughput, p50/p99 latency and allocations per call.
+
+    python -m benchmarks.suite                       # all groups
+    python -m benchmarks.suite --only agent,api      # some groups
+    python -m benchmarks.suite --sessions 1000000    # bigger session store
+    python -m benchmarks.suite --save-baseline       # write benchmarks/baselines/<group>.json
+    python -m benchmarks.suite --check               # exit 1 on regressions vs the baselines
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import sys
+import tempfile
+import uuid
+from typing import Any, Callable, Dict, List
+
+os.environ.setdefault("SAK_LOG_PATH", os.path.join(tempfile.gettempdir(), "sak-bench", "agent.log"))
+os.environ.setdefault("SAK_SESSION_REAP_INTERVAL", "0")
+
+from benchmarks import stub_llm
+from benchmarks.bench_confidence import synthetic_catalog, synthetic_messages
+from benchmarks.harness import compare, load_baseline, measure, print_results, save_baseline
+
+from app.agent import process_message
+from app.confidence import KeywordConfidenceModel
+from app.extraction import extract_parameters
+from app.store import ConversationState, PendingTool, SessionStore
+from app.tools import get_tool
+
+GROUPS = ("selector", "extraction", "agent", "store", "api")
+MESSAGE_LENGTHS = (8, 64, 512)
+
+Result = Dict[str, Any]
+
+
+def _scaled(iterations: int, quick: bool) -> int:
+    return max(10, iterations // 10) if quick else iterations
+
+
+def bench_selector(args: argparse.Namespace) -> List[Result]:
+    rng = random.Random(11)
+    model = KeywordConfidenceModel()
+    results = []
+    for size in (14, 500, 2000):
+        tools = synthetic_catalog(size, rng)
+        base = synthetic_messages(tools, rng, count=20)
+        for words in MESSAGE_LENGTHS:
+            messages = [" ".join(itertools.islice(itertools.cycle(m.split()), words)) for m in base]
+            cycle = itertools.cycle(messages)
+            results.append(
+                measure(
+                    f"selector.score tools={size} words={words}",
+                    lambda: model.score(next(cycle), tools),
+                    iterations=_scaled(2000, args.quick),
+                )
+            )
+    return results
+
+
+def bench_extraction(args: argparse.Namespace) -> List[Result]:
+    reschedule = get_tool("appointment_reschedule")
+    triage = get_tool("symptom_triage")
+    cases = {
+        "extract.relative_time": (reschedule, "Please move my appointment apt_123 to tomorrow at 2pm", None),
+        "extract.labeled_pairs": (
+            reschedule,
+            "appointment_id: apt_77, reason: feeling better, new_start_time = 2025-01-02T10:00",
+            None,
+        ),
+        "extract.no_match_long": (triage, "I have been feeling a bit off lately " * 20, None),
+        "extract.pending_bare_answer": (triage, "severe", ["severity"]),
+    }
+    return [
+        measure(name, lambda t=tool, m=text, g=targets: extract_parameters(t, m, g), iterations=_scaled(5000, args.quick))
+        for name, (tool, text, targets) in cases.items()
+    ]
+
+
+def bench_agent(args: argparse.Namespace) -> List[Result]:
+    stub_llm.install()
+    iterations = _scaled(1000, args.quick)
+
+    def turn(message: str, llm: bool, **kwargs: Any) -> Callable[[], Any]:
+        def run() -> Any:
+            os.environ["SAK_USE_LLM"] = "true" if llm else "false"
+            return process_message(ConversationState(session_id="bench"), message, **kwargs)
+
+        return run
+
+    def pending(message: str, awaiting_approval: bool) -> Callable[[], Any]:
+        def run() -> Any:
+            state = ConversationState(session_id="bench")
+            if awaiting_approval:
+                state.pending_tool = PendingTool("appointment_cancel", {"appointment_id": "apt_9"}, [], 0.1)
+                state.awaiting_approval = True
+            else:
+                state.pending_tool = PendingTool(
+                    "prescription_refill", {"patient_id": "p1"}, ["medication_name"], 0.1
+                )
+            return process_message(state, message)
+
+        return run
+
+    cases = {
+        "agent.direct.no_tool": turn("hello there", llm=False),
+        "agent.direct.need_parameters": turn("refill my prescription", llm=False),
+        "agent.direct.need_approval": turn("I need to cancel appointment id apt_9", llm=False),
+        "agent.direct.executed_forced": turn(
+            "refill", llm=False, force_tool="prescription_refill",
+            provided_parameters={"patient_id": "p1", "medication_name": "lisinopril"},
+        ),
+        "agent.pending.approve": pending("yes please", awaiting_approval=True),
+        "agent.pending.deny": pending("no thanks", awaiting_approval=True),
+        "agent.pending.parameter_reply": pending("lisinopril", awaiting_approval=False),
+        "agent.llm.no_tool": turn("hello there", llm=True),
+        "agent.llm.tool_call": turn("refill my prescription medication_name: x patient_id: p1", llm=True),
+    }
+    try:
+        return [measure(name, func, iterations=iterations) for name, func in cases.items()]
+    finally:
+        os.environ.pop("SAK_USE_LLM", None)
+
+
+def bench_store(args: argparse.Namespace) -> List[Result]:
+    count = args.sessions
+    store = SessionStore(max_sessions=count, idle_ttl=3600.0, reap_interval=0)
+    ids = [f"s{i}" for i in range(count)]
+    for session_id in ids:
+        store.save(store.get(session_id))
+    rng = random.Random(3)
+    iterations = _scaled(20000, args.quick)
+
+    def hit() -> None:
+        store.get(ids[rng.randrange(count)])
+
+    def turn() -> None:
+        state = store.get(ids[rng.randrange(count)])
+        state.messages.append({"role": "user", "content": "hello"})
+        store.save(state)
+        state.messages.clear()
+
+    def churn() -> None:
+        # A new session at capacity: create plus LRU eviction.
+        store.save(store.get(uuid.uuid4().hex))
+
+    label = f"sessions={count:.0e}".replace("+0", "")
+    return [
+        measure(f"store.get_hit {label}", hit, iterations=iterations),
+        measure(f"store.get_save {label}", turn, iterations=iterations),
+        measure(f"store.create_evict {label}", churn, iterations=iterations),
+    ]
+
+
+def bench_api(args: argparse.Namespace) -> List[Result]:
+    import httpx
+
+    from app.api import app
+
+    stub_llm.install()
+    os.environ["SAK_USE_LLM"] = "false"
+    loop = asyncio.new_event_loop()
+    started, stop = asyncio.Event(), asyncio.Event()
+
+    async def hold_lifespan() -> None:
+        # The MCP lifespan sets context vars, so it must be entered and left by one task.
+        async with app.router.lifespan_context(app):
+            started.set()
+            await stop.wait()
+
+    holder = loop.create_task(hold_lifespan())
+    loop.run_until_complete(started.wait())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    mcp_headers = {"accept": "application/json, text/event-stream"}
+
+    def call(method: str, path: str, **kwargs: Any) -> Callable[[], Any]:
+        def run() -> Any:
+            response = loop.run_until_complete(client.request(method, path, **kwargs))
+            assert response.status_code < 400, (path, response.status_code, response.text[:200])
+            return response
+
+        return run
+
+    def chat(content: str, **extra: Any) -> Callable[[], Any]:
+        def run() -> Any:
+            body = {"session_id": uuid.uuid4().hex, "messages": [{"role": "user", "content": content}], **extra}
+            return call("POST", "/v1/chat/completions", json=body)()
+
+        return run
+
+    def mcp(name: str, arguments: Dict[str, Any]) -> Callable[[], Any]:
+        body = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": name, "arguments": arguments}}
+        return call("POST", "/mcp/", json=body, headers=mcp_headers)
+
+    cases = {
+        "api.chat.need_parameters": chat("refill my prescription"),
+        "api.chat.need_parameters_no_tools": chat("refill my prescription", include_tools=False),
+        "api.chat.stream": chat("hello there", stream=True),
+        "api.tools": call("GET", "/v1/tools"),
+        "api.mcp.tools_list": call(
+            "POST", "/mcp/", json={"jsonrpc": "2.0", "id": 1, "method": "tools/list"}, headers=mcp_headers
+        ),
+        "api.mcp.tool_call": mcp("tool-prescription_refill", {"patient_id": "p1", "medication_name": "x"}),
+        "api.mcp.confidence_eval": mcp(
+            "meta-confidence-eval", {"messages": [{"role": "user", "content": "refill my prescription"}]}
+        ),
+    }
+    iterations = _scaled(500, args.quick)
+    try:
+        return [measure(name, func, iterations=iterations, alloc_iterations=20) for name, func in cases.items()]
+    finally:
+        loop.run_until_complete(client.aclose())
+        stop.set()
+        loop.run_until_complete(holder)
+        loop.close()
+        os.environ.pop("SAK_USE_LLM", None)
+
+
+RUNNERS: Dict[str, Callable[[argparse.Namespace], List[Result]]] = {
+    "selector": bench_selector,
+    "extraction": bench_extraction,
+    "agent": bench_agent,
+    "store": bench_store,
+    "api": bench_api,
+}
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", default=",".join(GROUPS), help="comma-separated groups: " + ", ".join(GROUPS))
+    parser.add_argument("--sessions", type=int, default=100_000, help="session count for the store group")
+    parser.add_argument("--quick", action="store_true", help="a tenth of the iterations, for smoke runs")
+    parser.add_argument("--save-baseline", action="store_true", help="write results as the new baselines")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a case regressed past --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown/growth, 0.25 = 25%%")
+    args = parser.parse_args(argv)
+
+    regressions: List[str] = []
+    for group in [g.strip() for g in args.only.split(",") if g.strip()]:
+        if group not in RUNNERS:
+            parser.error(f"unknown group {group!r}")
+        print(f"\n== {group}")
+        results = RUNNERS[group](args)
+        print_results(results)
+        baseline = load_baseline(group)
+        if baseline:
+            found = compare(results, baseline, args.tolerance)
+            regressions.extend(found)
+            for line in found:
+                print(f"  REGRESSION {line}")
+        if args.save_baseline:
+            print(f"  baseline written to {save_baseline(group, results)}")
+
+    if args.check and regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
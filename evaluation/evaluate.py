@@ -3,11 +3,14 @@
 import os
 import json
 from pprint import pprint
-from typing import List, Dict, Any
+import uuid
+from typing import List, Dict, Any, Optional
 
 from app.agent import process_message
+from app.settings import load_settings
 from app.store import ConversationState
-from app.tools import get_tool, TOOLS
+from app.tools import current_tools, get_tool
+from evaluation.judge_cache import JudgeCache
 
 # Optional: LangChain LLM for judgment
 from app.llm import get_llm
@@ -65,27 +68,22 @@ TEST_SCENARIOS = [
 # -------------------------
 # LLM Judge
 # -------------------------
-def llm_judge_parameters(
+def _tools_catalog(tools) -> str:
+    return "\n".join([f"- {t.name}: {t.description}" for t in tools])
+
+
+def build_judge_prompt(
     tool_name: str,
     collected: Dict[str, Any],
-    required: List[str],
     user_message: str = ""
-) -> bool:
+) -> str:
     """
-    Use LLM to judge a single tool call using enhanced LLM-as-judge prompt.
-    Returns True if all required params are present and plausible.
+    Build the LLM-as-judge prompt. The tool catalog is rendered once per tool snapshot,
+    and parameters are sorted so identical judgments produce identical prompts.
     """
-    try:
-        llm = get_llm()
-        tool = get_tool(tool_name)
-        if not tool:
-            return False
-
-        # Build tools catalog for prompt
-        tools_catalog = "\n".join([f"- {t.name}: {t.description}" for t in TOOLS])
-
-        # Enhanced judge prompt
-        JUDGE_PROMPT = f"""
+    tools_catalog = current_tools().derive("judge_catalog", _tools_catalog)
+    parameters = dict(sorted(collected.items()))
+    return f"""
 You are an expert evaluator for a virtual care assistant. The assistant can call specific tools
 to perform tasks like booking, rescheduling, canceling appointments, checking availability,
 verifying insurance, adding dependents, retrieving lab results, symptom triage, prescription refills, 
@@ -98,7 +96,7 @@ Your task is to evaluate a single step where the assistant chose a tool.
 
 User message: {user_message}
 Agent tool called: {tool_name}
-Parameters passed: {collected}
+Parameters passed: {parameters}
 Tool execution result: success
 
 Answer in EXACT JSON format with these keys:
@@ -109,9 +107,42 @@ Answer in EXACT JSON format with these keys:
   "comments": str
 }}
 """
-        messages = [HumanMessage(content=JUDGE_PROMPT)]
+
+
+def llm_judge_parameters(
+    tool_name: str,
+    collected: Dict[str, Any],
+    required: List[str],
+    user_message: str = "",
+    cache: Optional[JudgeCache] = None,
+) -> bool:
+    """
+    Use LLM to judge a single tool call using enhanced LLM-as-judge prompt.
+    Returns True if all required params are present and plausible.
+    With a cache, verdicts are looked up by prompt hash before calling the LLM.
+    """
+    try:
+        tool = get_tool(tool_name)
+        if not tool:
+            return False
+
+        prompt = build_judge_prompt(tool_name, collected, user_message)
+        settings = load_settings()
+        if settings.llm_provider == "local":
+            # The offline model's canned verdicts must never be served to a real run.
+            cache = None
+        key = JudgeCache.key(f"{settings.llm_provider}:{settings.openai_model}", prompt) if cache else None
+        if cache:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached.get("parameters_correct", False)
+
+        llm = get_llm()
+        messages = [HumanMessage(content=prompt)]
         response = llm.invoke(messages)
         result_json = json.loads(response.content)
+        if cache:
+            cache.put(key, result_json)
         return result_json.get("parameters_correct", False)
 
     except Exception as e:
@@ -145,11 +176,16 @@ def add_scores_to_evaluation(evaluation: dict) -> dict:
 
 
 # -------------------------
-def evaluate_scenario(scenario: Dict[str, Any], use_llm_judge: bool = True) -> Dict[str, Any]:
+def evaluate_scenario(
+    scenario: Dict[str, Any],
+    use_llm_judge: bool = True,
+    judge_cache: Optional[JudgeCache] = None,
+) -> Dict[str, Any]:
     """
     Evaluate a single local scenario using process_message.
+    Each call gets its own ConversationState, so scenarios can run concurrently.
     """
-    state = ConversationState(session_id="test_session")
+    state = ConversationState(session_id=f"eval_{uuid.uuid4().hex}")
     scenario_result = {
         "description": scenario["description"],
         "tool_selected": None,
@@ -187,7 +223,8 @@ def evaluate_scenario(scenario: Dict[str, Any], use_llm_judge: bool = True) -> D
             scenario_result["tool_selected"],
             provided_params,
             scenario["required_params"],
-            user_message=scenario["messages"][-1]
+            user_message=scenario["messages"][-1],
+            cache=judge_cache,
         )
     else:
         scenario_result["parameters_correct"] = len(scenario_result["missing_parameters"]) == 0
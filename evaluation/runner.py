@@ -0,0 +1,147 @@
+# evaluation/runner.py
+"""
+Run evaluation scenarios concurrently and write per-scenario results plus aggregate timing.
+
+    python -m evaluation.runner --workers 16 --jsonl results.jsonl --csv results.csv
+    python -m evaluation.runner --scenarios suite.jsonl --no-judge
+    SAK_LLM_PROVIDER=local python -m evaluation.runner --repeat 200   # offline smoke run
+
+Scenarios are JSON objects with description, messages, expected_tool and
+required_params (a JSON list or one object per line); the default is TEST_SCENARIOS.
+Judge verdicts are cached on disk (SAK_EVAL_CACHE_PATH, default .eval-cache/judge.sqlite).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent folder to sys.path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluation.evaluate import TEST_SCENARIOS, add_scores_to_evaluation, evaluate_scenario
+from evaluation.judge_cache import JudgeCache, judge_cache_from_env
+
+CSV_FIELDS = [
+    "index",
+    "description",
+    "expected_tool",
+    "tool_selected",
+    "tool_correct",
+    "parameters_correct",
+    "task_completed",
+    "overall_score",
+    "elapsed_ms",
+    "errors",
+]
+
+
+def load_scenarios(path: Optional[Path]) -> List[Dict[str, Any]]:
+    if path is None:
+        return list(TEST_SCENARIOS)
+    text = path.read_text(encoding="utf-8").strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def _run_one(index: int, scenario: Dict[str, Any], use_llm_judge: bool, cache: Optional[JudgeCache]) -> Dict[str, Any]:
+    started = time.perf_counter()
+    try:
+        result = evaluate_scenario(scenario, use_llm_judge, judge_cache=cache)
+    except Exception as e:
+        result = {"description": scenario.get("description"), "errors": [str(e)]}
+    result = add_scores_to_evaluation(result)
+    result["index"] = index
+    result["expected_tool"] = scenario.get("expected_tool")
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 2)
+    return result
+
+
+def run_parallel(
+    scenarios: List[Dict[str, Any]],
+    workers: int = 8,
+    use_llm_judge: bool = True,
+    cache: Optional[JudgeCache] = None,
+) -> Dict[str, Any]:
+    """
+    Evaluate scenarios on a bounded thread pool. Results come back in scenario order.
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="sak-eval") as pool:
+        results = list(
+            pool.map(lambda item: _run_one(item[0], item[1], use_llm_judge, cache), enumerate(scenarios))
+        )
+    wall = time.perf_counter() - started
+    return {"results": results, "summary": summarize(results, wall, workers, cache)}
+
+
+def summarize(results: List[Dict[str, Any]], wall: float, workers: int, cache: Optional[JudgeCache]) -> Dict[str, Any]:
+    count = len(results)
+    elapsed = sorted(r["elapsed_ms"] for r in results)
+
+    def rate(key: str) -> float:
+        return round(sum(1 for r in results if r.get(key)) / count, 4) if count else 0.0
+
+    return {
+        "scenarios": count,
+        "workers": workers,
+        "wall_seconds": round(wall, 2),
+        "scenarios_per_second": round(count / wall, 2) if wall else 0.0,
+        "scenario_ms_p50": elapsed[len(elapsed) // 2] if elapsed else 0.0,
+        "scenario_ms_p95": elapsed[min(len(elapsed) - 1, int(len(elapsed) * 0.95))] if elapsed else 0.0,
+        "scenario_ms_total": round(sum(elapsed), 2),
+        "tool_accuracy": rate("tool_correct"),
+        "parameters_accuracy": rate("parameters_correct"),
+        "task_completion": rate("task_completed"),
+        "mean_overall_score": round(sum(r.get("overall_score", 0.0) for r in results) / count, 4) if count else 0.0,
+        "errors": sum(len(r.get("errors", [])) for r in results),
+        "judge_cache": cache.stats() if cache else None,
+    }
+
+
+def write_jsonl(path: Path, results: List[Dict[str, Any]]) -> None:
+    with path.open("w", encoding="utf-8") as handle:
+        for result in results:
+            handle.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+
+
+def write_csv(path: Path, results: List[Dict[str, Any]]) -> None:
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        writer = csv.DictWriter(handle, fieldnames=CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        for result in results:
+            writer.writerow({**result, "errors": "; ".join(result.get("errors", []))})
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=Path, help="JSON list or JSONL of scenarios (default: TEST_SCENARIOS)")
+    parser.add_argument("--repeat", type=int, default=1, help="run the scenario list this many times")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent scenarios")
+    parser.add_argument("--no-judge", action="store_true", help="score parameters from missing_parameters only")
+    parser.add_argument("--no-cache", action="store_true", help="always call the LLM judge")
+    parser.add_argument("--jsonl", type=Path, help="write one result per line here")
+    parser.add_argument("--csv", type=Path, help="write a CSV summary row per scenario here")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("SAK_USE_LLM", "true")
+    scenarios = load_scenarios(args.scenarios) * max(1, args.repeat)
+    cache = None if args.no_cache or args.no_judge else judge_cache_from_env()
+    report = run_parallel(scenarios, args.workers, use_llm_judge=not args.no_judge, cache=cache)
+
+    if args.jsonl:
+        write_jsonl(args.jsonl, report["results"])
+    if args.csv:
+        write_csv(args.csv, report["results"])
+    print(json.dumps(report["summary"], indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Keep test runs offline and out of the repo's logs/ directory.
+os.environ.setdefault("SAK_LOG_PATH", os.path.join(tempfile.mkdtemp(prefix="sak-tests-"), "agent.log"))
+os.environ["SAK_USE_LLM"] = "false"
@@ -0,0 +1,84 @@
+import pytest
+
+from app.confidence import (
+    CachedConfidenceModel,
+    ConfidenceModel,
+    ConfidenceResult,
+    KeywordConfidenceModel,
+    RemoteConfidenceModel,
+    _model_config,
+)
+from app.tools import current_tools
+
+
+class Scripted(ConfidenceModel):
+    def __init__(self, source="remote"):
+        self.calls = 0
+        self.source = source
+
+    def score(self, message, tools):
+        self.calls += 1
+        return ConfidenceResult(tool_name="lab_results", confidence=0.9, scores={"lab_results": 0.9}, source=self.source)
+
+
+class Dead:
+    def post(self, payload):
+        return None
+
+
+@pytest.fixture
+def tools():
+    return list(current_tools())
+
+
+@pytest.fixture(autouse=True)
+def clean_env(monkeypatch):
+    for name in ("SAK_CONFIDENCE_MODEL", "SAK_MODEL_ENDPOINT", "SAK_CONFIDENCE_CACHE_SIZE"):
+        monkeypatch.delenv(name, raising=False)
+
+
+def test_keyword_model_is_not_cached_by_default():
+    assert _model_config().cache_size == 0
+
+
+def test_remote_model_is_cached_by_default(monkeypatch):
+    monkeypatch.setenv("SAK_CONFIDENCE_MODEL", "remote")
+    monkeypatch.setenv("SAK_MODEL_ENDPOINT", "http://remote/score")
+    assert _model_config().cache_size == 1024
+
+
+def test_explicit_size_wins(monkeypatch):
+    monkeypatch.setenv("SAK_CONFIDENCE_CACHE_SIZE", "64")
+    assert _model_config().cache_size == 64
+
+
+def test_hits_skip_the_inner_model(tools):
+    inner = Scripted()
+    model = CachedConfidenceModel(inner, max_size=8)
+    first = model.score("Lab results?", tools)
+    second = model.score("  lab results? ", tools)
+    assert first.source == "remote"
+    assert second.source == "cache"
+    assert second.tool_name == first.tool_name
+    assert inner.calls == 1
+    assert model.stats()["hits"] == 1
+
+
+def test_fallback_results_are_not_cached(tools):
+    model = CachedConfidenceModel(RemoteConfidenceModel("http://remote", 1.0, KeywordConfidenceModel(), client=Dead()))
+    assert model.score("refill my prescription", tools).source == "fallback"
+    assert model.score("refill my prescription", tools).source == "fallback"
+    assert model.stats()["size"] == 0
+
+
+def test_shared_cache_keeps_the_original_source(tmp_path, tools):
+    path = str(tmp_path / "cache.sqlite")
+    CachedConfidenceModel(Scripted(), shared_path=path).score("lab results", tools)
+
+    reader_inner = Scripted()
+    reader = CachedConfidenceModel(reader_inner, shared_path=path)
+    assert reader.score("lab results", tools).source == "cache"
+    assert reader_inner.calls == 0
+    assert reader.stats()["shared_hits"] == 1
+    key = next(iter(reader._entries))
+    assert reader._entries[key][1].source == "remote"
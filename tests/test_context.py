@@ -0,0 +1,56 @@
+import pytest
+
+from app import context as context_module
+from app.context import ConversationContext
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    calls = []
+
+    def fake_summarize(previous, messages):
+        calls.append([message.content for message in messages])
+        return f"summary {len(calls)}"
+
+    monkeypatch.setattr(context_module, "_summarize", fake_summarize)
+    return calls
+
+
+def make_history(count, start=0):
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message {i}"} for i in range(start, start + count)
+    ]
+
+
+def build(ctx, history, summarize=True):
+    messages = ctx.build("s1", history, "system", max_tokens=10_000, max_messages=4, summarize=summarize)
+    if ctx._future is not None:
+        ctx._future.result()
+    return [message.content for message in messages]
+
+
+def test_front_trim_keeps_the_summary_in_step(summaries):
+    ctx = ConversationContext()
+    history = make_history(10)
+    build(ctx, history)
+    assert summaries == [[f"message {i}" for i in range(6)]]
+    assert ctx.summary == "summary 1"
+
+    del history[:3]  # what SessionStore does when a session goes over its byte limit
+    history.extend(make_history(2, start=10))
+    sent = build(ctx, history)
+
+    assert sent[1] == "Summary of the earlier conversation: summary 1"
+    assert sent[2:] == [f"message {i}" for i in range(8, 12)]
+    # Only the messages that newly left the window are summarized, never 0-5 again.
+    assert summaries[1] == ["message 6", "message 7"]
+
+
+def test_reloaded_history_drops_the_stale_summary(summaries):
+    ctx = ConversationContext()
+    build(ctx, make_history(10))
+    assert ctx.summary
+
+    sent = build(ctx, make_history(3, start=100), summarize=False)
+    assert ctx.summary == ""
+    assert sent == ["system", "message 100", "message 101", "message 102"]
@@ -0,0 +1,56 @@
+import pytest
+
+from app.confidence import IncrementalConversationScorer, KeywordConfidenceModel, KeywordIndex
+from app.tools import current_tools
+
+
+TRANSCRIPT = [
+    {"role": "user", "content": "hi there"},
+    {"role": "assistant", "content": "How can I help?"},
+    {"role": "user", "content": "I need to refill my prescription"},
+    {"role": "assistant", "content": "Which medication?"},
+    {"role": "user", "content": "the blood pressure one"},
+]
+
+
+@pytest.fixture
+def tools():
+    return list(current_tools())
+
+
+@pytest.fixture
+def scorer():
+    return IncrementalConversationScorer(KeywordConfidenceModel())
+
+
+def full_scan(scorer, messages, tools):
+    return IncrementalConversationScorer(scorer.model).score(messages, tools)
+
+
+def test_incremental_matches_a_full_scan(scorer, tools):
+    for end in range(1, len(TRANSCRIPT) + 1):
+        incremental = scorer.score(TRANSCRIPT[:end], tools, session_id="chat-1")
+        expected = full_scan(scorer, TRANSCRIPT[:end], tools)
+        assert incremental.tool_name == expected.tool_name
+        assert incremental.scores == pytest.approx(expected.scores)
+
+
+def test_session_state_skips_seen_messages(scorer, tools, monkeypatch):
+    scorer.score(TRANSCRIPT[:4], tools, session_id="chat-1")
+    scanned = []
+    original = KeywordIndex.matches
+    monkeypatch.setattr(KeywordIndex, "matches", lambda self, text: scanned.append(text) or original(self, text))
+    scorer.score(TRANSCRIPT, tools, session_id="chat-1")
+    assert scanned == ["user: the blood pressure one"]
+
+
+def test_edited_history_is_rescanned(scorer, tools):
+    scorer.score(TRANSCRIPT[:3], tools, session_id="chat-1")
+    edited = [*TRANSCRIPT[:2], {"role": "user", "content": "show my lab results"}]
+    result = scorer.score(edited, tools, session_id="chat-1")
+    assert result.tool_name == full_scan(scorer, edited, tools).tool_name
+
+
+def test_without_session_id_nothing_is_kept(scorer, tools):
+    scorer.score(TRANSCRIPT, tools)
+    assert len(scorer._states) == 0
@@ -0,0 +1,109 @@
+import pytest
+
+from app.agent import process_message
+from app.extraction import extract_parameters
+from app.store import ConversationState
+from app.tools import get_tool
+
+
+@pytest.fixture
+def reschedule():
+    return get_tool("appointment_reschedule")
+
+
+@pytest.fixture
+def refill():
+    return get_tool("prescription_refill")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Move my apt_123 to 2pm tomorrow", {"appointment_id": "apt_123", "new_start_time": "tomorrow 2pm"}),
+        ("appointment id apt_9", {"appointment_id": "apt_9"}),
+        ("new time 2025-03-04T09:30", {"new_start_time": "2025-03-04T09:30"}),
+        (
+            "appointment_id: APT_77, reason: feeling better, new_start_time = 2025-01-02T10:00",
+            {"appointment_id": "APT_77", "reason": "feeling better", "new_start_time": "2025-01-02T10:00"},
+        ),
+        ("hello there", {}),
+    ],
+)
+def test_extracts_from_free_text(reschedule, text, expected):
+    assert extract_parameters(reschedule, text) == expected
+
+
+def test_labeled_iso_datetime_is_not_truncated(reschedule):
+    extracted = extract_parameters(reschedule, "new_start_time: 2025-01-02T10:00 reason: moved")
+    assert extracted["new_start_time"] == "2025-01-02T10:00"
+
+
+def test_bare_answer_fills_the_single_missing_field(reschedule):
+    assert extract_parameters(reschedule, "apt_5", targets=["appointment_id"]) == {"appointment_id": "apt_5"}
+
+
+def test_bare_answer_only_when_targeted(reschedule):
+    assert extract_parameters(reschedule, "apt5") == {}
+
+
+def test_bare_answer_can_be_disabled(reschedule):
+    assert extract_parameters(reschedule, "cancel", targets=["appointment_id"], bare_answer=False) == {}
+
+
+def test_unlabeled_values_only_fill_targets(reschedule):
+    assert extract_parameters(reschedule, "tomorrow at 9am", targets=["appointment_id"]) == {}
+    assert extract_parameters(reschedule, "tomorrow at 9am", targets=["new_start_time"]) == {
+        "new_start_time": "tomorrow 9am"
+    }
+
+
+@pytest.mark.parametrize("reply", ["12345", "apt_12", "APT-7"])
+def test_bare_id_must_look_like_an_id(reschedule, reply):
+    assert extract_parameters(reschedule, reply, targets=["appointment_id"]) == {"appointment_id": reply}
+
+
+@pytest.mark.parametrize("reply", ["hmm", "wait", "soon", "the usual one"])
+def test_bare_words_are_not_ids(reschedule, reply):
+    assert extract_parameters(reschedule, reply, targets=["appointment_id"]) == {}
+
+
+def test_free_text_is_not_a_bare_answer_for_destructive_tools():
+    assert extract_parameters(get_tool("appointment_cancel"), "feeling better", targets=["reason"]) == {}
+
+
+def test_free_text_bare_answer(refill):
+    assert extract_parameters(refill, "lisinopril", targets=["medication_name"]) == {"medication_name": "lisinopril"}
+
+
+def test_a_new_request_is_not_a_bare_answer(refill):
+    assert extract_parameters(refill, "book a doctor instead", targets=["medication_name"]) == {}
+
+
+def _collecting(tool, message, **provided):
+    state = ConversationState(session_id=f"collect-{tool}")
+    payload = process_message(state, message, provided_parameters=provided, force_tool=tool)
+    assert payload["action"] == "need_parameters"
+    return state
+
+
+@pytest.mark.parametrize("reply", ["hmm", "wait", "soon"])
+def test_unclear_reply_to_a_pending_cancel_asks_again(reply):
+    state = _collecting("appointment_cancel", "cancel my appointment")
+    payload = process_message(state, reply)
+    assert payload["action"] == "need_parameters"
+    assert state.pending_tool.parameters == {}
+
+
+def test_new_request_while_collecting_asks_again():
+    state = _collecting("prescription_refill", "refill my prescription", patient_id="p1")
+    payload = process_message(state, "book a doctor instead")
+    assert payload["action"] == "need_parameters"
+    assert payload["missing_parameters"] == ["medication_name"]
+    assert payload["control_intent"] == "none"
+
+
+def test_pending_payload_reports_the_classifier_result():
+    state = _collecting("appointment_cancel", "cancel my appointment")
+    payload = process_message(state, "apt_12")
+    assert payload["action"] == "executed"
+    assert (payload["control_intent"], payload["control_confidence"]) == ("none", 0.0)
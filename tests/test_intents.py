@@ -0,0 +1,114 @@
+import pytest
+
+from app.agent import process_message
+from app.intents import classify_control
+from app.store import ConversationState
+
+
+@pytest.mark.parametrize(
+    "text, intent",
+    [
+        ("yes", "approve"),
+        ("Yes please!", "approve"),
+        ("go ahead", "approve"),
+        ("no", "deny"),
+        ("no thanks", "deny"),
+        ("not now", "deny"),
+        ("don't do it", "deny"),
+        ("cancel", "cancel"),
+        ("never mind", "cancel"),
+        ("forget it", "cancel"),
+    ],
+)
+def test_clear_replies(text, intent):
+    result = classify_control(text)
+    assert result.intent == intent
+    assert result.confidence == 1.0
+
+
+@pytest.mark.parametrize("text", ["not sure", "I'm not sure", "I don't know", "no idea", "maybe", "yes, not sure"])
+def test_hesitation_is_unsure(text):
+    result = classify_control(text)
+    assert result.intent == "unsure"
+    assert not result.negative
+
+
+@pytest.mark.parametrize("text", ["don't cancel", "do not stop", "never cancel it"])
+def test_negated_cancel_is_not_cancel(text):
+    assert classify_control(text).intent == "unsure"
+
+
+@pytest.mark.parametrize("text", ["nothing", "know what", "cannot", "notes", "yesterday"])
+def test_words_containing_control_words_do_not_match(text):
+    assert classify_control(text).intent == "none"
+
+
+def test_partial_reply_has_low_confidence():
+    result = classify_control("yes but use 3pm instead")
+    assert result.intent == "approve"
+    assert result.confidence < 0.5
+
+
+@pytest.mark.parametrize("text", ["forget it, I'll call the office", "do it for my mother's appointment"])
+def test_filler_inside_a_phrase_is_counted_once(text):
+    assert classify_control(text).confidence < 0.5
+
+
+def test_mixed_signals_are_discounted():
+    assert classify_control("yes, no wait").confidence < 0.5
+
+
+def _collecting_appointment_id() -> ConversationState:
+    state = ConversationState(session_id="collect")
+    payload = process_message(state, "I want to cancel my appointment", force_tool="appointment_cancel")
+    assert payload["action"] == "need_parameters"
+    assert payload["missing_parameters"] == ["appointment_id"]
+    return state
+
+
+@pytest.mark.parametrize("reply", ["cancel apt_12", "please cancel apt_12"])
+def test_cancel_with_a_value_fills_the_parameter(reply):
+    state = _collecting_appointment_id()
+    payload = process_message(state, reply)
+    assert payload["action"] == "executed"
+    assert payload["tool_parameters"] == {"appointment_id": "apt_12"}
+
+
+def test_bare_cancel_drops_the_pending_tool():
+    state = _collecting_appointment_id()
+    payload = process_message(state, "cancel")
+    assert payload["action"] == "no_tool"
+    assert state.pending_tool is None
+
+
+@pytest.mark.parametrize("reply", ["don't cancel", "not sure"])
+def test_unsure_reply_keeps_collecting(reply):
+    state = _collecting_appointment_id()
+    payload = process_message(state, reply)
+    assert payload["action"] == "need_parameters"
+    assert state.pending_tool is not None
+    assert state.pending_tool.parameters == {}
+
+
+def _awaiting_approval() -> ConversationState:
+    state = ConversationState(session_id="approve")
+    payload = process_message(state, "I need to cancel appointment id apt_9")
+    assert payload["action"] == "need_approval"
+    return state
+
+
+def test_not_sure_asks_for_approval_again():
+    state = _awaiting_approval()
+    payload = process_message(state, "not sure")
+    assert payload["action"] == "need_approval"
+    assert payload["control_intent"] == "unsure"
+    assert state.pending_tool is not None
+
+
+def test_approval_executes_and_denial_drops():
+    state = _awaiting_approval()
+    assert process_message(state, "yes please")["action"] == "executed"
+
+    state = _awaiting_approval()
+    assert process_message(state, "no")["action"] == "no_tool"
+    assert state.pending_tool is None
@@ -0,0 +1,61 @@
+import pytest
+
+from app.agent import process_message, routing_stats
+from app.llm import clear_llm_cache, get_llm
+from app.local_llm import Latency, build_local_llm
+from app.settings import AppSettings, load_settings, reload_settings
+from app.store import ConversationState
+
+
+def local_settings(**overrides):
+    values = {"openai_api_key": None, "openai_model": "unused", "system_prompt": "", "llm_provider": "local"}
+    values.update(overrides)
+    return AppSettings(**values)
+
+
+@pytest.fixture
+def local_env(tmp_path, monkeypatch):
+    monkeypatch.setenv("SAK_SETTINGS_PATH", str(tmp_path / "missing.json"))
+    monkeypatch.setenv("SAK_LLM_PROVIDER", "local")
+    for name in ("SAK_LOCAL_LLM_SCRIPT", "SAK_LOCAL_LLM_LATENCY", "SAK_LOCAL_LLM_TOKEN_LATENCY", "SAK_LOCAL_LLM_SEED"):
+        monkeypatch.delenv(name, raising=False)
+    reload_settings()
+    clear_llm_cache()
+    yield monkeypatch
+    clear_llm_cache()
+
+
+def delays(model, count=5):
+    latency = Latency.parse("uniform:0,1")
+    return [model._delay(latency) for _ in range(count)]
+
+
+def test_seed_defaults_to_a_fixed_value(local_env):
+    assert load_settings().local_llm_seed == 0
+    assert delays(build_local_llm(load_settings())) == delays(build_local_llm(load_settings()))
+
+
+@pytest.mark.parametrize("raw, seed", [("7", 7), ("none", None), ("not-a-number", 0)])
+def test_seed_comes_from_the_environment(local_env, raw, seed):
+    local_env.setenv("SAK_LOCAL_LLM_SEED", raw)
+    assert reload_settings().local_llm_seed == seed
+    assert build_local_llm(load_settings()).seed == seed
+
+
+@pytest.mark.parametrize("field", ["local_llm_latency", "local_llm_token_latency"])
+def test_malformed_latency_fails_when_the_model_is_built(field):
+    with pytest.raises(RuntimeError, match="Invalid local LLM settings"):
+        build_local_llm(local_settings(**{field: "gamma:1,2"}))
+
+
+def test_malformed_latency_falls_back_instead_of_failing_the_turn(local_env):
+    local_env.setenv("SAK_USE_LLM", "true")
+    local_env.setenv("SAK_LOCAL_LLM_LATENCY", "fixed:soon")
+    reload_settings()
+    with pytest.raises(RuntimeError):
+        get_llm()
+
+    before = routing_stats().get("fallback", 0)
+    payload = process_message(ConversationState(session_id="s1"), "hello, can you help me with something")
+    assert payload["action"]
+    assert routing_stats()["fallback"] == before + 1
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.remote_client import CircuitBreaker, RemoteScoringClient
+
+
+def make_client(handler, **kwargs):
+    kwargs.setdefault("retries", 0)
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=2, reset_timeout=60.0))
+    client = RemoteScoringClient("http://remote/score", timeout=1.0, **kwargs)
+    client._client = httpx.Client(transport=httpx.MockTransport(handler))
+    return client
+
+
+def respond(status, body=None):
+    return lambda request: httpx.Response(status, json=body if body is not None else {})
+
+
+def fail_with(exc_type):
+    def handler(request):
+        raise exc_type("boom", request=request)
+
+    return handler
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60.0)
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure()
+    time.sleep(0.02)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()  # the probe is in flight
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.02)
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_released_probe_can_be_retried():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release_probe()
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("handler", [respond(500), fail_with(httpx.ReadTimeout), fail_with(httpx.ConnectError)])
+def test_endpoint_failures_open_the_breaker(handler):
+    client = make_client(handler)
+    assert client.post({}) is None
+    assert client.post({}) is None
+    assert client.breaker.state == "open"
+    assert client.post({}) is None  # short-circuited
+
+
+@pytest.mark.parametrize("handler", [respond(400), respond(422), fail_with(httpx.PoolTimeout)])
+def test_local_and_request_errors_leave_the_breaker_closed(handler):
+    client = make_client(handler)
+    for _ in range(5):
+        assert client.post({}) is None
+    assert client.breaker.state == "closed"
+
+
+def test_success_resets_the_failure_count():
+    responses = iter([500, 200, 500])
+    client = make_client(lambda request: httpx.Response(next(responses), json={"score": 1}))
+    client.post({})
+    assert client.post({}) == {"score": 1}
+    client.post({})
+    assert client.breaker.state == "closed"
+
+
+def test_async_pool_timeout_releases_a_half_open_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    client = RemoteScoringClient("http://remote/score", timeout=1.0, retries=0, breaker=breaker)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        client._async_client_for = (loop, httpx.AsyncClient(transport=httpx.MockTransport(fail_with(httpx.PoolTimeout))))
+        assert await client.apost({}) is None
+        assert not breaker._probing
+        await client._async_client_for[1].aclose()
+
+    asyncio.run(run())
+    assert breaker.allow()
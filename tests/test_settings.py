@@ -0,0 +1,55 @@
+import json
+import threading
+
+import pytest
+
+from app import settings as settings_module
+from app.settings import load_settings, reload_settings, settings_version
+
+
+@pytest.fixture
+def settings_file(tmp_path, monkeypatch):
+    path = tmp_path / "settings.json"
+    path.write_text(json.dumps({"openai_model": "model-a"}), encoding="utf-8")
+    monkeypatch.setenv("SAK_SETTINGS_PATH", str(path))
+    # Never re-check on our own; the tests drive reloads explicitly.
+    monkeypatch.setenv("SAK_SETTINGS_CHECK_INTERVAL", "3600")
+    for name in ("SAK_OPENAI_MODEL", "SAK_LLM_PROVIDER"):
+        monkeypatch.delenv(name, raising=False)
+    reload_settings()
+    return path
+
+
+def test_reload_picks_up_file_changes(settings_file):
+    assert load_settings().openai_model == "model-a"
+    version = settings_version()
+
+    settings_file.write_text(json.dumps({"openai_model": "model-b"}), encoding="utf-8")
+    assert load_settings().openai_model == "model-a"  # still inside the check interval
+
+    assert reload_settings().openai_model == "model-b"
+    assert settings_version() == version + 1
+
+
+def test_unchanged_file_keeps_version(settings_file):
+    version = settings_version()
+    reload_settings()
+    assert settings_version() == version
+
+
+def test_env_overrides_file(settings_file, monkeypatch):
+    monkeypatch.setenv("SAK_OPENAI_MODEL", "from-env")
+    assert load_settings().openai_model == "from-env"
+
+
+def test_invalidate_does_not_block_while_get_holds_the_lock(settings_file):
+    # A SIGHUP handler runs on the main thread, possibly in the middle of get().
+    cache = settings_module._CACHE
+    settings_file.write_text(json.dumps({"openai_model": "model-c"}), encoding="utf-8")
+    with cache._lock:
+        done = threading.Event()
+        worker = threading.Thread(target=lambda: (cache.invalidate(), done.set()))
+        worker.start()
+        assert done.wait(1.0)
+        worker.join()
+    assert load_settings().openai_model == "model-c"
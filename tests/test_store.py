@@ -0,0 +1,112 @@
+import time
+
+import pytest
+
+from app.session_backend import FileSessionBackend, SQLiteSessionBackend
+from app.store import PendingTool, SessionStore
+
+
+@pytest.fixture(params=["sqlite", "file"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteSessionBackend(str(tmp_path / "sessions.sqlite"))
+    return FileSessionBackend(str(tmp_path / "sessions"))
+
+
+def make_store(backend, **kwargs):
+    kwargs.setdefault("reap_interval", 0)
+    return SessionStore(backend=backend, **kwargs)
+
+
+def say(state, *contents):
+    for content in contents:
+        state.messages.append({"role": "user", "content": content})
+
+
+def test_eviction_mid_turn_after_a_trim_still_persists_the_turn(backend):
+    store = make_store(backend, max_sessions=1, max_session_bytes=2000)
+    state = store.get("a")
+    say(state, *(f"early message {i} " + "x" * 40 for i in range(20)))
+    store.save(state)
+    assert state.trimmed > 0
+
+    state = store.get("a")
+    say(state, "new question", "new answer")
+    store.get("b")  # evicts "a" while its turn is still running
+    store.save(state)
+
+    reloaded = make_store(backend, max_session_bytes=0).get("a")
+    assert len(reloaded.messages) == 22
+    assert [m["content"] for m in reloaded.messages[-2:]] == ["new question", "new answer"]
+
+
+def test_history_and_pending_tool_survive_a_restart(backend):
+    store = make_store(backend)
+    state = store.get("a")
+    say(state, "cancel my appointment")
+    state.pending_tool = PendingTool(name="appointment_cancel", missing=["appointment_id"], confidence=0.8)
+    store.save(state)
+
+    reloaded = make_store(backend).get("a")
+    assert [m["content"] for m in reloaded.messages] == ["cancel my appointment"]
+    assert reloaded.pending_tool == state.pending_tool
+    assert not reloaded.awaiting_approval
+
+
+def test_get_picks_up_another_workers_appends(backend):
+    first, second = make_store(backend), make_store(backend)
+    state = first.get("a")
+    say(state, "one")
+    first.save(state)
+    assert len(second.get("a").messages) == 1
+
+    say(state, "two", "three")
+    first.save(state)
+    assert [m["content"] for m in second.get("a").messages] == ["one", "two", "three"]
+
+
+def test_delete_removes_the_stored_session(backend):
+    store = make_store(backend)
+    state = store.get("a")
+    say(state, "hello")
+    store.save(state)
+    store.delete("a")
+
+    assert len(store) == 0
+    assert make_store(backend).get("a").messages == []
+
+
+def test_least_recently_used_session_is_evicted():
+    store = make_store(None, max_sessions=2)
+    store.get("a")
+    store.get("b")
+    store.get("a")
+    store.get("c")
+
+    assert store.stats()["evicted_lru"] == 1
+    assert store.get("a").session_id == "a"
+    assert store.stats()["created"] == 3  # "a" was kept, "b" went
+
+
+def test_idle_sessions_are_reaped():
+    store = make_store(None, idle_ttl=0.01)
+    store.get("a")
+    store.get("b")
+    time.sleep(0.02)
+
+    assert store.reap() == 2
+    assert len(store) == 0
+    assert store.stats()["evicted_idle"] == 2
+
+
+def test_oversized_history_is_trimmed_from_the_front():
+    store = make_store(None, max_session_bytes=500)
+    state = store.get("a")
+    say(state, *(f"message {i} " + "x" * 90 for i in range(10)))
+    store.save(state)
+
+    stats = store.stats()
+    assert stats["bytes"] <= 500
+    assert stats["trimmed_messages"] == state.trimmed > 0
+    assert state.messages[-1]["content"].startswith("message 9 ")
+    assert len(state.messages) + state.trimmed == 10
@@ -224,6 +224,7 @@ export async function POST(request: Request) {
           messages: confidenceMessages,
           mode: "full_conversation",
           top_k: 5,
+          session_id: id,
         });
         confidenceEval = extractConfidencePayload(confidenceResult);
       } catch (error) {